@@ -4,10 +4,12 @@ from starlette.status import HTTP_401_UNAUTHORIZED
 
 from app.db import get_db
 from app.exceptions import ApplicationException, ErrorCodes
+from app.models import User
 from app.repos import UserRepo
+from app.services.read_replicas import AUTHORIZATION_KEY, get_read_db
 
 
-async def get_current_user(db: Session = Depends(get_db), authorization: str = Header(None)):
+def _get_auth_token(authorization: str | None) -> str:
     auth_token = None
     if authorization and "bearer" in authorization.lower():
         auth_token = authorization.split(" ")[1]
@@ -17,6 +19,10 @@ async def get_current_user(db: Session = Depends(get_db), authorization: str = H
     if not auth_token:
         raise HTTPException(HTTP_401_UNAUTHORIZED, "You must be logged in")
 
+    return auth_token
+
+
+def authenticate(db: Session, auth_token: str) -> User:
     repo = UserRepo(db)
     user = repo.get_user_by_auth_token(auth_token)
     if not user:
@@ -37,3 +43,31 @@ async def get_current_user(db: Session = Depends(get_db), authorization: str = H
         )
 
     return user
+
+
+async def get_current_user(db: Session = Depends(get_db), authorization: str = Header(None)):
+    auth_token = _get_auth_token(authorization)
+
+    # writes made with this session keep the caller's reads on the primary for a while
+    db.info[AUTHORIZATION_KEY] = authorization
+
+    return authenticate(db, auth_token)
+
+
+async def get_read_current_user(
+    read_db: Session = Depends(get_read_db), db: Session = Depends(get_db), authorization: str = Header(None)
+):
+    """The current user for read-only routes, loaded with their session so the request only uses one connection
+
+    A replica may not have a user who has only just signed up or verified their email, so they're checked on the
+    primary before being turned away. The primary session doesn't connect unless it's used.
+    """
+    auth_token = _get_auth_token(authorization)
+
+    try:
+        return authenticate(read_db, auth_token)
+    except ApplicationException:
+        if read_db.get_bind() is db.get_bind():
+            raise
+
+    return authenticate(db, auth_token)
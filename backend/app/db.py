@@ -4,11 +4,12 @@ from typing import Any, AsyncGenerator
 
 from pydantic.alias_generators import to_snake
 from shortuuid import uuid
-from sqlalchemy import String, create_engine
+from sqlalchemy import Engine, String, create_engine
 from sqlalchemy.orm import DeclarativeBase, declared_attr, mapped_column, sessionmaker
 from sqlalchemy.orm.session import Session
 
 from app.env import settings
+from app.metrics import InstrumentedNullPool, InstrumentedQueuePool, instrument_engine
 
 
 def _default(val: Any) -> Any:
@@ -24,10 +25,45 @@ def serializer(val: Any) -> str:
 
 
 postgres_dsn = f"postgresql://{settings.DATABASE_USER}:{settings.DATABASE_PASSWORD}@{settings.DATABASE_HOST}:{settings.DATABASE_PORT}/{settings.DATABASE_NAME}"
-engine = create_engine(postgres_dsn, json_serializer=serializer, pool_size=100)
+
+
+def create_db_engine(dsn: str, name: str) -> Engine:
+    """Create an engine with the pool configured in settings, name is used to label its metrics"""
+    if settings.DATABASE_POOL_MODE == "null":
+        pool_options: dict[str, Any] = {"poolclass": InstrumentedNullPool}
+    elif settings.DATABASE_POOL_MODE == "queue":
+        pool_options = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.DATABASE_POOL_SIZE,
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+            "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        }
+    else:
+        raise ValueError(f"Unknown DATABASE_POOL_MODE {settings.DATABASE_POOL_MODE}")
+
+    engine = create_engine(
+        dsn, json_serializer=serializer, pool_pre_ping=settings.DATABASE_POOL_PRE_PING, **pool_options
+    )
+    instrument_engine(engine, name=name)
+    return engine
+
+
+engine = create_db_engine(postgres_dsn, name="primary")
 session_factory = sessionmaker(bind=engine)
 
 
+def _replica_dsn(host: str) -> str:
+    host, _, port = host.strip().partition(":")
+    return f"postgresql://{settings.DATABASE_USER}:{settings.DATABASE_PASSWORD}@{host}:{port or settings.DATABASE_PORT}/{settings.DATABASE_NAME}"
+
+
+replica_engines = [
+    create_db_engine(_replica_dsn(host), name=f"replica_{idx}")
+    for idx, host in enumerate(it for it in settings.DATABASE_REPLICA_HOSTS.split(",") if it.strip())
+]
+
+
 class Base(DeclarativeBase):
     __prefix__: str  # prefix used for record IDs
 
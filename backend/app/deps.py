@@ -1,20 +1,28 @@
+import json
 from typing import Annotated
 
-from fastapi import Depends, Header
+from fastapi import Depends, Form, Header, Query
 from sqlalchemy.orm import Session
 
-from app.auth import get_current_user
+from app.auth import get_current_user, get_read_current_user
 from app.db import get_db
 from app.exceptions import ApplicationException, NotPermittedError
-from app.models import Organisation, User
-from app.repos import OrganisationRepo
+from app.models import IncidentStatusCategoryEnum, Organisation, User
+from app.repos import OrganisationRepo, UserRepo
+from app.schemas.actions import IncidentSearchSchema
+from app.schemas.slack import SlackCommandDataSchema, SlackInteractionSchema
 from app.services.events import Events
+from app.services.read_replicas import get_read_db
 
 ORGANISATION_ID_HEADER = "x-organisation-id"
 
 OrganisationId = Annotated[str | None, Header(alias=ORGANISATION_ID_HEADER)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 DatabaseSession = Annotated[Session, Depends(get_db)]
+# for routes which never write, may be a replica that is a few seconds behind the primary
+ReadOnlyDatabaseSession = Annotated[Session, Depends(get_read_db)]
+# the user loaded with the read-only session, rather than holding a connection to the primary as well
+ReadOnlyCurrentUser = Annotated[User, Depends(get_read_current_user)]
 
 
 def get_organisation(organisation_id: OrganisationId, db: DatabaseSession, user: CurrentUser) -> Organisation:
@@ -33,6 +41,23 @@ def get_organisation(organisation_id: OrganisationId, db: DatabaseSession, user:
     return organisation
 
 
+def get_read_organisation(
+    organisation_id: OrganisationId, read_db: ReadOnlyDatabaseSession, db: DatabaseSession, user: ReadOnlyCurrentUser
+) -> Organisation:
+    """Get the organisation set in the request's header with the read-only session
+
+    A replica may not have a membership which has just been created, so it's checked on the primary before the user
+    is turned away.
+    """
+    try:
+        return get_organisation(organisation_id=organisation_id, db=read_db, user=user)
+    except ApplicationException:
+        if read_db.get_bind() is db.get_bind():
+            raise
+
+    return get_organisation(organisation_id=organisation_id, db=db, user=UserRepo(db).get_by_id_or_raise(user.id))
+
+
 def get_events():
     events = Events()
     yield events
@@ -40,4 +65,60 @@ def get_events():
 
 
 CurrentOrganisation = Annotated[Organisation, Depends(get_organisation)]
+ReadOnlyCurrentOrganisation = Annotated[Organisation, Depends(get_read_organisation)]
 EventsService = Annotated[Events, Depends(get_events)]
+
+
+# request parsers for schemas, these are kept out of app.schemas so celery workers don't need to import fastapi
+
+
+def get_incident_search_params(
+    page: int = Query(1),
+    size: int = Query(25),
+    q: str | None = Query(None),
+    status_category: Annotated[list[IncidentStatusCategoryEnum] | None, Query(alias="statusCategory")] = None,
+) -> IncidentSearchSchema:
+    return IncidentSearchSchema(
+        page=page,
+        size=size,
+        q=q,
+        status_category=status_category,
+    )
+
+
+def get_slack_command(
+    token: str = Form(...),
+    team_id: str = Form(...),
+    team_domain: str = Form(...),
+    enterprise_id: str | None = Form(None),
+    enterprise_name: str | None = Form(None),
+    channel_id: str = Form(...),
+    channel_name: str = Form(...),
+    user_id: str = Form(...),
+    user_name: str = Form(...),
+    command: str = Form(...),
+    text: str | None = Form(None),
+    response_url: str = Form(...),
+    trigger_id: str = Form(...),
+    api_app_id: str = Form(...),
+) -> SlackCommandDataSchema:
+    return SlackCommandDataSchema(
+        token=token,
+        team_id=team_id,
+        team_domain=team_domain,
+        enterprise_id=enterprise_id,
+        enterprise_name=enterprise_name,
+        channel_id=channel_id,
+        channel_name=channel_name,
+        user_id=user_id,
+        user_name=user_name,
+        command=command,
+        text=text,
+        response_url=response_url,
+        trigger_id=trigger_id,
+        api_app_id=api_app_id,
+    )
+
+
+def get_slack_interaction(payload: str = Form(...)) -> SlackInteractionSchema:
+    return SlackInteractionSchema(payload=json.loads(payload))
@@ -10,6 +10,23 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str = ""
     DATABASE_PORT: str = ""
     DATABASE_USER: str = ""
+    # connection pool, per process. "null" opens a connection per checkout and leaves pooling to pgbouncer, which must
+    # then run in transaction mode. psycopg2 never creates server side prepared statements, so that mode is safe
+    DATABASE_POOL_MODE: str = "queue"  # queue or null
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: int = 30
+    DATABASE_POOL_RECYCLE: int = 1800  # seconds, -1 to never recycle
+    DATABASE_POOL_PRE_PING: bool = False
+    # connections opened by each API process on startup, so the first requests don't wait for them
+    DATABASE_POOL_WARM_UP: int = 2
+    # read replicas, comma separated host or host:port, they use the primary's credentials and database name
+    DATABASE_REPLICA_HOSTS: str = ""
+    # replicas further behind than this are skipped, lag is checked at most every DATABASE_REPLICA_CHECK_SECONDS
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DATABASE_REPLICA_CHECK_SECONDS: float = 5.0
+    # reads go to the primary for this long after the same user has written
+    DATABASE_READ_YOUR_WRITES_SECONDS: int = 10
 
     FRONTEND_URL: str = ""
     STATUS_PAGE_DOMAIN: str = ""
@@ -24,11 +41,23 @@ class Settings(BaseSettings):
     SLACK_OPENID_TOKEN_URL: str = ""
     SLACK_OAUTH_AUTHORIZE_URL: str = ""
     SLACK_OAUTH_TOKEN_URL: str = ""
+    # web API base URL, the load test harness points this at a local stand-in
+    SLACK_API_URL: str = "https://slack.com/api/"
+    # how long event and submitted view ids are remembered, so retried deliveries are only handled once
+    SLACK_EVENT_DEDUPLICATION_SECONDS: int = 3600
+    # how long forms are cached for when checking submitted slack views
+    SLACK_FORM_CACHE_SECONDS: int = 60
+    # rendered slack forms are invalidated when changed, this only limits how long a missed change is shown for
+    SLACK_FORM_RENDER_CACHE_SECONDS: int = 3600
+    # selects with more options than this load them from /slack/options, slack allows at most 100
+    SLACK_EXTERNAL_SELECT_THRESHOLD: int = 100
 
     APP_SECRET: str = ""
 
     # celery
     CELERY_BROKER_URL: str = ""
+    # publish a task-sent event for every task queued, the load test harness uses them to measure time in the queue
+    CELERY_SEND_SENT_EVENTS: bool = False
 
     # redis
     REDIS_HOST: str = ""
@@ -36,14 +65,58 @@ class Settings(BaseSettings):
 
     LOG_FORMAT: str = "console"  # console or json
 
+    # metrics, /metrics requires this bearer token when it's set
+    METRICS_TOKEN: str = ""
+    # port celery workers expose their metrics on, 0 to disable
+    METRICS_WORKER_PORT: int = 0
+
+    # sql profiling, records every statement made by a request and logs requests with slow queries
+    SQL_PROFILING_ENABLED: bool = False
+    SQL_PROFILING_SLOW_REQUEST_MS: int = 500
+
     # sendgrid
     SENDGRID_API_KEY: str = ""
     SUPPORT_EMAIL: str = ""
     SUPPORT_EMAIL_NAME: str = ""
+    SENDGRID_API_URL: str = "https://api.sendgrid.com"
+
+    # email, sent through sendgrid, or written to a file or a local SMTP server to send without it
+    EMAIL_TRANSPORT: str = "sendgrid"  # sendgrid, file or smtp
+    EMAIL_FILE_PATH: str = "emails.jsonl"
+    EMAIL_SMTP_HOST: str = "localhost"
+    EMAIL_SMTP_PORT: int = 1025
+    # emails queued within this long of each other are sent together
+    EMAIL_BATCH_DELAY_SECONDS: int = 2
+    EMAIL_SEND_ATTEMPTS: int = 4
+    EMAIL_RETRY_MAX_SECONDS: int = 30
+    # flushes an email can fail to be sent in before it's dropped
+    EMAIL_MAX_FLUSH_ATTEMPTS: int = 10
 
     # vercel
     VERCEL_TOKEN: str = ""
     VERCEL_PROJECT_ID: str = ""
+    VERCEL_API_URL: str = "https://api.vercel.com"
+    # unverified custom domains are checked with exponential backoff between these intervals
+    CUSTOM_DOMAIN_CHECK_MIN_SECONDS: int = 300
+    CUSTOM_DOMAIN_CHECK_MAX_SECONDS: int = 86400
+    CUSTOM_DOMAIN_CHECK_CONCURRENCY: int = 10
+
+    # status pages, events older than this are moved into the archive table
+    STATUS_PAGE_EVENT_RETENTION_DAYS: int = 400
+    # current status served to pollers, cached per process until the page changes, then for up to max age by clients
+    STATUS_PAGE_STATUS_CACHE_SECONDS: int = 3600
+    STATUS_PAGE_STATUS_MAX_AGE_SECONDS: int = 10
+    # which status page is served on each host, unknown hosts are cached for less time
+    STATUS_PAGE_HOST_CACHE_SECONDS: int = 3600
+    STATUS_PAGE_HOST_NOT_FOUND_CACHE_SECONDS: int = 300
+    STATUS_PAGE_HOST_LOCAL_CACHE_SECONDS: int = 30
+
+    # live streams for status pages and incidents, connection limits are per channel per API process
+    LIVE_STREAM_MAX_CONNECTIONS: int = 5000
+    LIVE_STREAM_HEARTBEAT_SECONDS: int = 15
+    LIVE_STREAM_RETRY_MS: int = 3000
+    LIVE_STREAM_QUEUE_SIZE: int = 100
+    LIVE_STREAM_HISTORY: int = 200
 
 
 settings = Settings()
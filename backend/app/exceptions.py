@@ -16,6 +16,7 @@ class ErrorCodes(Enum):
     UNKNOWN = "UNKNOWN"
     VALIDATION = "VALIDATION"
     ALREADY_VERIFIED = "ALREADY_VERIFIED"
+    TOO_MANY_CONNECTIONS = "TOO_MANY_CONNECTIONS"
 
 
 class ApplicationException(Exception):
@@ -56,3 +57,13 @@ class NotPermittedError(ApplicationException):
 class ExternalApiError(ApplicationException):
     def __init__(self, detail: str, code: ErrorCodes):
         super().__init__(detail=detail, code=code)
+
+
+class TooManyConnectionsError(ApplicationException):
+    def __init__(
+        self,
+        detail: str = "Too many connections, please try again later",
+        code: ErrorCodes = ErrorCodes.TOO_MANY_CONNECTIONS,
+    ):
+        super().__init__(detail, code)
+        self.status_code = status.HTTP_429_TOO_MANY_REQUESTS
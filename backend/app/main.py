@@ -1,12 +1,22 @@
+import contextlib
+from typing import AsyncIterator
+
 import structlog
 from fastapi import FastAPI, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from sqlalchemy.exc import NoResultFound
+from redis import RedisError
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import NoResultFound, SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+from starlette.concurrency import run_in_threadpool
 
+from app.db import engine, replica_engines
 from app.exceptions import ApplicationException, ErrorCodes, FormFieldValidationError
+from app.metrics import MetricsMiddleware
+from app.profiling import SqlProfilingMiddleware, enable_sql_profiling
 from app.routes import (
     fields,
     forms,
@@ -15,6 +25,7 @@ from app.routes import (
     incidents,
     invites,
     lifecycle,
+    metrics,
     organisations,
     roles,
     severities,
@@ -26,6 +37,11 @@ from app.routes import (
     users,
     world,
 )
+from app.services.live_stream import register_publisher, warm_up_publisher
+from app.services.read_replicas import register_write_tracking
+from app.services.slack.renderer.cache import register_form_invalidation
+from app.services.status_page_hosts import register_host_invalidation
+from app.services.status_page_status import register_status_invalidation
 from app.utils import setup_logger
 
 from .env import settings
@@ -34,8 +50,49 @@ setup_logger()
 logger = structlog.get_logger(logger_name=__name__)
 
 
+def _warm_up_pool(warm_engine: Engine) -> None:
+    """Open connections now and return them to the pool"""
+    with contextlib.ExitStack() as stack:
+        for _ in range(settings.DATABASE_POOL_WARM_UP):
+            stack.enter_context(warm_engine.connect()).execute(text("SELECT 1"))
+
+
+def warm_up() -> None:
+    """Pay one-off costs on startup rather than during the first requests"""
+    # otherwise done by the first query, and it takes longer as more models are added
+    configure_mappers()
+
+    for warm_engine in [engine, *replica_engines]:
+        try:
+            _warm_up_pool(warm_engine)
+        except SQLAlchemyError as e:
+            logger.warning("Could not open database connections on startup", url=str(warm_engine.url), error=str(e))
+
+    try:
+        warm_up_publisher()
+    except RedisError as e:
+        logger.warning("Could not connect to redis on startup", error=str(e))
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await run_in_threadpool(warm_up)
+    yield
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(debug=settings.ENV == "development", title=settings.DOC_TITLE)
+    app = FastAPI(debug=settings.ENV == "development", title=settings.DOC_TITLE, lifespan=lifespan)
+
+    # push changes to live clients after they're committed
+    register_publisher()
+    # keep reads on the primary for callers who have just written
+    register_write_tracking()
+    # drop cached slack forms when what they show is changed
+    register_form_invalidation()
+    # drop the cached current status of status pages when it changes
+    register_status_invalidation()
+    # and which status page is served on a host when its slug or custom domain changes
+    register_host_invalidation()
 
     app.add_middleware(
         CORSMiddleware,
@@ -44,6 +101,12 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(MetricsMiddleware)
+
+    if settings.SQL_PROFILING_ENABLED:
+        for profiled_engine in [engine, *replica_engines]:
+            enable_sql_profiling(profiled_engine)
+        app.add_middleware(SqlProfilingMiddleware)
 
     app.include_router(users.router, prefix="/users")
     app.include_router(world.router, prefix="/world")
@@ -62,6 +125,7 @@ def create_app() -> FastAPI:
     app.include_router(status_pages.router, prefix="/status-pages")
     app.include_router(status_page_incidents.router, prefix="/status-page-incidents")
     app.include_router(invites.router, prefix="/invites")
+    app.include_router(metrics.router, prefix="/metrics")
 
     # exception handler for form field validation errors
     @app.exception_handler(FormFieldValidationError)
@@ -0,0 +1,321 @@
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    worker_process_shutdown,
+    worker_ready,
+)
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, ExceptionContext
+from sqlalchemy.pool import NullPool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.env import settings
+
+# when PROMETHEUS_MULTIPROC_DIR is set, every uvicorn/celery process writes its samples into that directory and
+# any one of them can expose the totals
+IS_MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SLOW_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response starts, by route template",
+    ["method", "route", "status"],
+    buckets=SLOW_BUCKETS,
+)
+db_query_duration = Histogram("db_query_duration_seconds", "Duration of each database query", buckets=FAST_BUCKETS)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "Number of database queries made by a request", ["route"], buckets=COUNT_BUCKETS
+)
+db_time_per_request = Histogram(
+    "db_time_per_request_seconds", "Time spent in database queries by a request", ["route"], buckets=SLOW_BUCKETS
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", buckets=FAST_BUCKETS
+)
+# pool gauges are reported per process, in multiprocess mode each series gets a pid label
+db_pool_size = Gauge("db_pool_size", "Connections kept open by the pool", ["database"], multiprocess_mode="all")
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out", "Connections currently in use", ["database"], multiprocess_mode="all"
+)
+db_pool_overflow = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ["database"], multiprocess_mode="all"
+)
+db_replica_lag_seconds = Gauge(
+    "db_replica_lag_seconds", "Replication lag last seen for a read replica", ["database"], multiprocess_mode="livemax"
+)
+celery_task_duration = Histogram(
+    "celery_task_duration_seconds", "Time taken to run a task", ["task", "state"], buckets=SLOW_BUCKETS
+)
+celery_task_queue_latency = Histogram(
+    "celery_task_queue_latency_seconds", "Time between a task being queued and starting", ["task"], buckets=SLOW_BUCKETS
+)
+celery_task_failures = Counter("celery_task_failures_total", "Tasks which raised an exception", ["task", "exception"])
+outbound_request_duration = Histogram(
+    "outbound_request_duration_seconds",
+    "Duration of calls to third party APIs",
+    ["service", "operation"],
+    buckets=SLOW_BUCKETS,
+)
+outbound_request_errors = Counter(
+    "outbound_request_errors_total", "Failed calls to third party APIs", ["service", "operation", "error"]
+)
+
+
+@dataclass
+class _RequestStats:
+    queries: int = 0
+    query_time: float = 0.0
+
+
+# shared by reference with the threadpool that runs sync endpoints, so query counts are seen by the middleware
+_request_stats: ContextVar[_RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _registry() -> CollectorRegistry:
+    """Every process's samples when in multiprocess mode, otherwise just this one's"""
+    if IS_MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+
+    return REGISTRY
+
+
+def generate_metrics() -> tuple[bytes, str]:
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Record request latency and database usage per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+
+        # measured when the response starts, streaming responses would otherwise count their whole lifetime
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._observe(scope, message["status"], time.perf_counter() - start, stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+
+    def _observe(self, scope: Scope, status: int, duration: float, stats: _RequestStats) -> None:
+        route = scope.get("route")
+        # unmatched paths are grouped together, so scanners can't create unbounded label values
+        route_name = getattr(route, "path", "unmatched")
+
+        http_request_duration.labels(method=scope["method"], route=route_name, status=str(status)).observe(duration)
+        db_queries_per_request.labels(route=route_name).observe(stats.queries)
+        db_time_per_request.labels(route=route_name).observe(stats.query_time)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    db_query_duration.observe(duration)
+
+    stats = _request_stats.get()
+    if stats:
+        stats.queries += 1
+        stats.query_time += duration
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # after_cursor_execute isn't called for a failed statement
+    if context.connection is not None and (pending := context.connection.info.get("query_start_time")):
+        pending.pop()
+
+
+def _instrument_pool(engine: Engine, name: str) -> None:
+    pool = engine.pool
+    checked_out = db_pool_checked_out.labels(database=name)
+    overflow = db_pool_overflow.labels(database=name)
+    db_pool_size.labels(database=name).set(pool.size() if isinstance(pool, QueuePool) else 0)
+
+    def update_overflow() -> None:
+        if isinstance(pool, QueuePool):
+            # negative until every connection in the pool has been opened
+            overflow.set(max(pool.overflow(), 0))
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        checked_out.inc()
+        update_overflow()
+
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        checked_out.dec()
+        update_overflow()
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+
+
+def instrument_engine(engine: Engine, name: str = "primary") -> None:
+    """Time every query made through the engine and report the usage of its pool"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _instrument_pool(engine, name=name)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start)
+
+
+class InstrumentedNullPool(NullPool):
+    """NullPool that records how long it takes to open a connection, usually to pgbouncer"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start)
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """Record latency and errors for calls to a third party API made with httpx"""
+
+    def __init__(self, service: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.service = service
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        # the path often contains IDs, so only the method is used to keep the number of series small
+        operation = request.method
+        start = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except httpx.HTTPError as e:
+            outbound_request_errors.labels(service=self.service, operation=operation, error=type(e).__name__).inc()
+            raise
+        finally:
+            outbound_request_duration.labels(service=self.service, operation=operation).observe(
+                time.perf_counter() - start
+            )
+
+        if response.status_code >= 400:
+            outbound_request_errors.labels(
+                service=self.service, operation=operation, error=str(response.status_code)
+            ).inc()
+
+        return response
+
+
+class InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+    """Same as InstrumentedTransport, for httpx's async client"""
+
+    def __init__(self, service: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.service = service
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        operation = request.method
+        start = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except httpx.HTTPError as e:
+            outbound_request_errors.labels(service=self.service, operation=operation, error=type(e).__name__).inc()
+            raise
+        finally:
+            outbound_request_duration.labels(service=self.service, operation=operation).observe(
+                time.perf_counter() - start
+            )
+
+        if response.status_code >= 400:
+            outbound_request_errors.labels(
+                service=self.service, operation=operation, error=str(response.status_code)
+            ).inc()
+
+        return response
+
+
+_task_start_times: dict[str, float] = {}
+
+
+def _on_before_task_publish(headers: dict | None = None, **kwargs: Any) -> None:
+    if headers is not None:
+        headers["enqueued_at"] = time.time()
+
+
+def _on_task_prerun(task_id: str, task: Any, **kwargs: Any) -> None:
+    _task_start_times[task_id] = time.perf_counter()
+
+    enqueued_at = getattr(task.request, "enqueued_at", None)
+    if enqueued_at:
+        celery_task_queue_latency.labels(task=task.name).observe(max(time.time() - enqueued_at, 0))
+
+
+def _on_task_postrun(task_id: str, task: Any, state: str | None = None, **kwargs: Any) -> None:
+    start = _task_start_times.pop(task_id, None)
+    if start is not None:
+        celery_task_duration.labels(task=task.name, state=state or "UNKNOWN").observe(time.perf_counter() - start)
+
+
+def _on_task_failure(sender: Any = None, exception: BaseException | None = None, **kwargs: Any) -> None:
+    name = getattr(sender, "name", "unknown")
+    celery_task_failures.labels(task=name, exception=type(exception).__name__).inc()
+
+
+def _on_worker_ready(**kwargs: Any) -> None:
+    if settings.METRICS_WORKER_PORT:
+        start_http_server(settings.METRICS_WORKER_PORT, registry=_registry())
+
+
+def _on_worker_process_shutdown(pid: int | None = None, **kwargs: Any) -> None:
+    if IS_MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def instrument_celery() -> None:
+    """Record queue latency and duration for tasks, workers expose them on METRICS_WORKER_PORT"""
+    before_task_publish.connect(_on_before_task_publish, weak=False)
+    task_prerun.connect(_on_task_prerun, weak=False)
+    task_postrun.connect(_on_task_postrun, weak=False)
+    task_failure.connect(_on_task_failure, weak=False)
+    worker_ready.connect(_on_worker_ready, weak=False)
+    worker_process_shutdown.connect(_on_worker_process_shutdown, weak=False)
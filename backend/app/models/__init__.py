@@ -24,7 +24,9 @@ from .status_page import (
     StatusPage,
     StatusPageComponent,
     StatusPageComponentAffected,
+    StatusPageComponentDailySummary,
     StatusPageComponentEvent,
+    StatusPageComponentEventArchive,
     StatusPageComponentGroup,
     StatusPageComponentUpdate,
     StatusPageIncident,
@@ -1,7 +1,7 @@
 import typing
 from typing import Optional
 
-from sqlalchemy import ForeignKey, Integer, String, UnicodeText, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Integer, String, UnicodeText, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db import Base
@@ -47,7 +47,7 @@ class Incident(Base, TimestampMixin, SoftDeleteMixin):
     description: Mapped[str] = mapped_column(UnicodeText, nullable=True)
 
     # slack specific
-    slack_channel_id: Mapped[str | None] = mapped_column(UnicodeText, nullable=True)
+    slack_channel_id: Mapped[str | None] = mapped_column(UnicodeText, nullable=True, index=True)
     slack_channel_name: Mapped[str | None] = mapped_column(UnicodeText, nullable=True)
 
     # relationships
@@ -66,6 +66,19 @@ class Incident(Base, TimestampMixin, SoftDeleteMixin):
 
     __table_args__ = (
         UniqueConstraint("reference_id", "organisation_id", name="ux_incident_reference_id_organisation_id"),
+        # incidents are searched by the start of their name or reference as it's typed
+        Index(
+            "ix_incident_organisation_id_name_lower",
+            "organisation_id",
+            text("lower(name) text_pattern_ops"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_incident_organisation_id_reference_lower",
+            "organisation_id",
+            text("lower(reference) text_pattern_ops"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
     )
 
     def get_user_for_role(self, kind: "IncidentRoleKind") -> Optional["User"]:
@@ -2,10 +2,23 @@
 
 import enum
 import typing
-from datetime import datetime
-from typing import Optional
-
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, String, UnicodeText, UniqueConstraint
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UnicodeText,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db import Base
@@ -47,6 +60,11 @@ class ComponentStatus(str, enum.Enum):
             cls.FULL_OUTAGE: 3,
         }[status]
 
+    @classmethod
+    def most_severe(cls, statuses: Iterable["ComponentStatus"]) -> "ComponentStatus":
+        """The worst of the given statuses, operational when there are none"""
+        return max((cls(status) for status in statuses), key=cls.ranked, default=cls.OPERATIONAL)
+
 
 class StatusPage(Base, TimestampMixin, SoftDeleteMixin):
     __prefix__ = "sp"
@@ -60,6 +78,9 @@ class StatusPage(Base, TimestampMixin, SoftDeleteMixin):
     slug: Mapped[str] = mapped_column(String, nullable=False)  # subdomain
     custom_domain: Mapped[str | None] = mapped_column(String, nullable=True)
     is_custom_domain_verified: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # unverified domains are checked again with exponential backoff, new ones are checked straight away
+    custom_domain_check_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    custom_domain_next_check_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     support_url: Mapped[str | None] = mapped_column(String, nullable=True)
     support_label: Mapped[str] = mapped_column(String, nullable=False)
@@ -67,7 +88,23 @@ class StatusPage(Base, TimestampMixin, SoftDeleteMixin):
     terms_of_service_url: Mapped[str | None] = mapped_column(String, nullable=True)
 
     # table properties
-    __table_args__ = (UniqueConstraint("slug", name="ux_status_page_slug"),)
+    __table_args__ = (
+        UniqueConstraint("slug", name="ux_status_page_slug"),
+        # public pages are looked up by the host they're served on, domains are compared case insensitively
+        Index(
+            "ix_status_page_custom_domain_lower",
+            text("lower(custom_domain)"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # domains which are due to be checked
+        Index(
+            "ix_status_page_custom_domain_next_check_at",
+            "custom_domain_next_check_at",
+            postgresql_where=text(
+                "custom_domain IS NOT NULL AND is_custom_domain_verified IS false AND deleted_at IS NULL"
+            ),
+        ),
+    )
 
     # relationships
     organisation: Mapped["Organisation"] = relationship("Organisation", back_populates="status_pages")
@@ -291,3 +328,64 @@ class StatusPageComponentEvent(Base, TimestampMixin, SoftDeleteMixin):
     status_page_component: Mapped["StatusPageComponent"] = relationship(
         "StatusPageComponent", back_populates="component_events"
     )
+
+    __table_args__ = (
+        # time range scans for the public status page
+        Index(
+            "ix_status_page_component_event_component_started_at",
+            "status_page_component_id",
+            "started_at",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # current status lookups only need events which are still open
+        Index(
+            "ix_status_page_component_event_open",
+            "status_page_component_id",
+            "status_page_incident_id",
+            postgresql_where=text("ended_at IS NULL AND deleted_at IS NULL"),
+        ),
+        # events which ended before the retention horizon, oldest first, for archiving
+        Index(
+            "ix_status_page_component_event_ended_at",
+            "ended_at",
+            postgresql_where=text("ended_at IS NOT NULL"),
+        ),
+    )
+
+
+class StatusPageComponentEventArchive(Base):
+    """Cold storage for component events older than the retention horizon"""
+
+    __prefix__ = "sp_com_evt"
+
+    status_page_incident_id: Mapped[str] = mapped_column(String(50), nullable=False)
+    status_page_component_id: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    status: Mapped[ComponentStatus] = mapped_column(Enum(ComponentStatus), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.now)
+
+
+class StatusPageComponentDailySummary(Base, TimestampMixin):
+    """Seconds spent in each non-operational status per component per day (UTC), kept after events are archived
+
+    Overlapping events are merged, so each moment is counted once in the worst status the component was in.
+    """
+
+    __prefix__ = "sp_com_sum"
+
+    status_page_component_id: Mapped[str] = mapped_column(
+        String(50), ForeignKey("status_page_component.id", ondelete="cascade"), nullable=False, index=True
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    degraded_performance_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    partial_outage_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    full_outage_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    worst_status: Mapped[ComponentStatus] = mapped_column(Enum(ComponentStatus), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("status_page_component_id", "day", name="ux_status_page_component_daily_summary_day"),
+    )
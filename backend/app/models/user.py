@@ -4,7 +4,7 @@ import typing
 from datetime import datetime
 
 import bcrypt
-from sqlalchemy import Boolean, DateTime, Integer, UnicodeText
+from sqlalchemy import Boolean, DateTime, Index, Integer, UnicodeText, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship, synonym
 from sqlalchemy.orm.attributes import flag_modified
@@ -47,6 +47,11 @@ class User(Base, TimestampMixin):
     received_invites = relationship("Invite", back_populates="invitee", foreign_keys="Invite.invitee_id")
     sent_invites = relationship("Invite", back_populates="inviter", foreign_keys="Invite.inviter_id")
 
+    __table_args__ = (
+        # users are searched by the start of their name as it's typed
+        Index("ix_user_name_lower", text("lower(name) text_pattern_ops")),
+    )
+
     # user specific settings
     def _set_settings(self, value):
         self._settings = value
@@ -0,0 +1,269 @@
+import hashlib
+import re
+import secrets
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, ExceptionContext
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db import engine, session_factory
+from app.env import settings
+from app.repos import UserRepo
+
+logger = structlog.get_logger(logger_name=__name__)
+
+# request header which asks for the profile, super admins only, a summary is returned in PROFILE_RESPONSE_HEADER
+# and the full profile is logged under the id in the summary
+PROFILE_REQUEST_HEADER = "x-sql-profile"
+PROFILE_RESPONSE_HEADER = "x-sql-profile"
+
+# modules which are never reported as the caller of a query
+_SKIPPED_MODULE_PREFIXES = ("sqlalchemy", "app.profiling", "app.db", "app.metrics")
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so the same query with different values is grouped together"""
+    normalised = _PLACEHOLDER.sub("?", statement)
+    normalised = _STRING.sub("?", normalised)
+    normalised = _NUMBER.sub("?", normalised)
+    # IN lists have a placeholder per value
+    normalised = _VALUE_LIST.sub("(?+)", normalised)
+    return _WHITESPACE.sub(" ", normalised).strip()
+
+
+@dataclass
+class ProfiledQuery:
+    statement: str
+    parameters: Any
+    fingerprint: str
+    caller: str
+    duration: float = 0.0
+    rows: int = 0
+
+
+@dataclass
+class RequestProfile:
+    queries: list[ProfiledQuery] = field(default_factory=list)
+    is_finished: bool = False
+
+    @property
+    def query_time(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def slowest(self) -> ProfiledQuery | None:
+        return max(self.queries, key=lambda query: query.duration, default=None)
+
+    def groups(self) -> list[dict[str, Any]]:
+        """Queries grouped by fingerprint and caller, slowest first"""
+        groups: dict[tuple[str, str], dict[str, Any]] = {}
+        for query in self.queries:
+            key = (query.fingerprint, query.caller)
+            group = groups.setdefault(
+                key,
+                {
+                    "id": hashlib.md5(query.fingerprint.encode()).hexdigest()[:12],
+                    "caller": query.caller,
+                    "fingerprint": query.fingerprint,
+                    "count": 0,
+                    "ms": 0.0,
+                    "rows": 0,
+                },
+            )
+            group["count"] += 1
+            group["ms"] += query.duration * 1000
+            group["rows"] += query.rows
+
+        results = sorted(groups.values(), key=lambda group: group["ms"], reverse=True)
+        for group in results:
+            group["ms"] = round(group["ms"], 2)
+
+        return results
+
+
+_profile: ContextVar[RequestProfile | None] = ContextVar("sql_profile", default=None)
+
+
+def _find_caller() -> str:
+    """The repo method which issued the query, or the closest application code when it wasn't a repo"""
+    fallback = "unknown"
+    frame = sys._getframe(2)
+
+    while frame:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and not module.startswith(_SKIPPED_MODULE_PREFIXES):
+            owner = frame.f_locals.get("self")
+            name = f"{type(owner).__name__}.{frame.f_code.co_name}" if owner else f"{module}.{frame.f_code.co_name}"
+            if module.startswith("app.repos."):
+                return name
+            if fallback == "unknown":
+                fallback = name
+        frame = frame.f_back  # type: ignore
+
+    return fallback
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _profile.get()
+    if not profile or profile.is_finished:
+        return
+
+    query = ProfiledQuery(
+        statement=statement, parameters=parameters, fingerprint=fingerprint(statement), caller=_find_caller()
+    )
+    conn.info.setdefault("profiled_queries", []).append((query, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _profile.get()
+    pending = conn.info.get("profiled_queries")
+    if not profile or profile.is_finished or not pending:
+        return
+
+    query, start = pending.pop()
+    query.duration = time.perf_counter() - start
+    query.rows = max(cursor.rowcount, 0)
+    profile.queries.append(query)
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # after_cursor_execute isn't called for a failed statement
+    if context.connection is not None and (pending := context.connection.info.get("profiled_queries")):
+        pending.pop()
+
+
+def enable_sql_profiling(engine: Engine) -> None:
+    """Record every statement made during a request, used with SqlProfilingMiddleware"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def _is_super_admin(authorization: str | None) -> bool:
+    if not authorization:
+        return False
+
+    token = authorization.split(" ")[-1]
+    with session_factory() as session:
+        user = UserRepo(session=session).get_user_by_auth_token(token)
+        return bool(user and user.is_super_admin)
+
+
+def _explain(query: ProfiledQuery) -> str | None:
+    """EXPLAIN ANALYZE runs the statement again, so it's only done for reads"""
+    if not query.statement.lstrip().lower().startswith("select"):
+        return None
+
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {query.statement}", query.parameters).all()
+        connection.rollback()
+
+    return "\n".join(row[0] for row in rows)
+
+
+class SqlProfilingMiddleware:
+    """Report the queries made by each request
+
+    Requests where the total query time passes SQL_PROFILING_SLOW_REQUEST_MS are logged along with their
+    slowest queries. Super admins can send an X-SQL-Profile header to have the full breakdown logged, the response's
+    X-SQL-Profile header has a summary with the id it was logged under. In development the breakdown includes the
+    plan for the slowest statement.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        is_profile_requested = bool(request_headers.get(PROFILE_REQUEST_HEADER)) and await run_in_threadpool(
+            _is_super_admin, request_headers.get("authorization")
+        )
+
+        start = time.perf_counter()
+        profile = RequestProfile()
+        token = _profile.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.is_finished = True
+                self._report(scope, time.perf_counter() - start, profile)
+
+                if is_profile_requested:
+                    summary = await self._log_report(scope, profile)
+                    headers = list(message.get("headers", []))
+                    headers.append((PROFILE_RESPONSE_HEADER.encode(), summary.encode()))
+                    message["headers"] = headers
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+
+    def _report(self, scope: Scope, duration: float, profile: RequestProfile) -> None:
+        query_time = profile.query_time
+        if query_time * 1000 < settings.SQL_PROFILING_SLOW_REQUEST_MS:
+            return
+
+        route = scope.get("route")
+        logger.warning(
+            "Slow queries in request",
+            method=scope["method"],
+            route=getattr(route, "path", scope["path"]),
+            duration_ms=round(duration * 1000, 2),
+            query_ms=round(query_time * 1000, 2),
+            query_count=len(profile.queries),
+            slowest=profile.groups()[:5],
+        )
+
+    async def _log_report(self, scope: Scope, profile: RequestProfile) -> str:
+        """Log the full profile, returns a summary of it for the response header"""
+        report = await self._build_report(profile)
+        profile_id = secrets.token_hex(8)
+        route = scope.get("route")
+        logger.info(
+            "SQL profile",
+            profile_id=profile_id,
+            method=scope["method"],
+            route=getattr(route, "path", scope["path"]),
+            **report,
+        )
+
+        return f"id={profile_id}; queries={report['queries']}; ms={report['ms']}"
+
+    async def _build_report(self, profile: RequestProfile) -> dict[str, Any]:
+        report: dict[str, Any] = {
+            "queries": len(profile.queries),
+            "ms": round(profile.query_time * 1000, 2),
+            "groups": profile.groups()[:20],
+        }
+
+        slowest = profile.slowest()
+        if slowest and settings.ENV == "development":
+            report["slowest"] = {
+                "caller": slowest.caller,
+                "ms": round(slowest.duration * 1000, 2),
+                "statement": slowest.statement,
+                "plan": await run_in_threadpool(_explain, slowest),
+            }
+
+        return report
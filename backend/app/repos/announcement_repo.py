@@ -32,12 +32,23 @@ class AnnouncementRepo(BaseRepo):
         fields: list[AnnouncementFields],
         actions: list[AnnouncementActions],
     ) -> Announcement:
+        model = self.add_announcement(organisation=organisation, fields=fields, actions=actions)
+        self.session.flush()
+
+        return model
+
+    def add_announcement(
+        self,
+        organisation: Organisation,
+        fields: list[AnnouncementFields],
+        actions: list[AnnouncementActions],
+    ) -> Announcement:
+        """Add a new announcement to the session without flushing"""
         model = Announcement()
         model.organisation_id = organisation.id
         model.actions = actions
         model.fields = fields
 
         self.session.add(model)
-        self.session.flush()
 
         return model
@@ -0,0 +1,58 @@
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Sequence
+
+from shortuuid import uuid
+
+from app.db import Base
+
+from .base_repo import BaseRepo
+
+
+def _to_copy_field(value: Any) -> str:
+    """Format a value as a COPY csv field, unquoted empty fields are loaded as NULL"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        text = value.isoformat()
+    elif isinstance(value, (list, dict)):
+        text = json.dumps(value)
+    else:
+        text = str(value)
+
+    return '"' + text.replace('"', '""') + '"'
+
+
+class BulkRepo(BaseRepo):
+    """Bulk loading which bypasses the ORM, model defaults are not applied so every column must be given"""
+
+    def generate_id(self, model: type[Base]) -> str:
+        """Generate a record ID in the same format as the model's default"""
+        return f"{model.__prefix__}_{uuid()}"
+
+    def copy_rows(self, model: type[Base], columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+        """Load rows into the model's table using postgres COPY, returns the number of rows loaded"""
+        buffer = io.StringIO()
+        total = 0
+
+        for row in rows:
+            buffer.write(",".join(_to_copy_field(value) for value in row))
+            buffer.write("\n")
+            total += 1
+
+        if not total:
+            return 0
+
+        buffer.seek(0)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        stmt = f'COPY "{model.__tablename__}" ({column_list}) FROM STDIN WITH (FORMAT csv)'
+
+        # use the raw psycopg2 connection that belongs to the session's current transaction
+        dbapi_connection = self.session.connection().connection
+        with dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(stmt, buffer)
+
+        return total
@@ -25,6 +25,28 @@ class FieldRepo(BaseRepo):
         available_options: list[str] | None = None,
     ) -> Field:
         """Create new field"""
+        field = self.add_field(
+            organisation=organisation,
+            label=label,
+            interface_kind=interface_kind,
+            kind=kind,
+            description=description,
+            available_options=available_options,
+        )
+        self.session.flush()
+
+        return field
+
+    def add_field(
+        self,
+        organisation: Organisation,
+        label: str,
+        interface_kind: InterfaceKind,
+        kind: FieldKind,
+        description: str | None = None,
+        available_options: list[str] | None = None,
+    ) -> Field:
+        """Add a new field to the session without flushing"""
         field = Field()
         field.organisation = organisation
         field.label = label
@@ -43,7 +65,6 @@ class FieldRepo(BaseRepo):
             field.is_system = True
 
         self.session.add(field)
-        self.session.flush()
 
         return field
 
@@ -23,6 +23,13 @@ class FormRepo(BaseRepo):
         return self.session.scalars(stmt).all()
 
     def create_form(self, organisation: Organisation, name: str, form_type: FormKind) -> Form:
+        form = self.add_form(organisation=organisation, name=name, form_type=form_type)
+        self.session.flush()
+
+        return form
+
+    def add_form(self, organisation: Organisation, name: str, form_type: FormKind) -> Form:
+        """Add a new form to the session without flushing"""
         form = Form()
         form.organisation_id = organisation.id
         form.name = name
@@ -30,7 +37,6 @@ class FormRepo(BaseRepo):
         form.is_published = True
 
         self.session.add(form)
-        self.session.flush()
 
         return form
 
@@ -47,9 +53,44 @@ class FormRepo(BaseRepo):
         can_have_description: bool = True,
         can_change_requirement_type: bool = True,
     ) -> FormField:
+        if rank is None:
+            next_rank_stmt = select(func.max(FormField.rank)).where(FormField.form_id == form.id)
+            rank = self.session.scalar(next_rank_stmt)
+            rank = rank + 1 if rank else 0
+
+        model = self.add_form_field(
+            form=form,
+            field=field,
+            label=label,
+            requirement_type=requirement_type,
+            rank=rank,
+            description=description,
+            is_deletable=is_deletable,
+            can_have_default_value=can_have_default_value,
+            can_have_description=can_have_description,
+            can_change_requirement_type=can_change_requirement_type,
+        )
+        self.session.flush()
+
+        return model
+
+    def add_form_field(
+        self,
+        form: Form,
+        field: Field,
+        label: str,
+        requirement_type: RequirementTypeEnum,
+        rank: int,
+        description: str | None = None,
+        is_deletable: bool = True,
+        can_have_default_value: bool = True,
+        can_have_description: bool = True,
+        can_change_requirement_type: bool = True,
+    ) -> FormField:
+        """Add a new form field to the session without flushing, the form and field don't need to be flushed yet"""
         model = FormField()
-        model.form_id = form.id
-        model.field_id = field.id
+        model.form = form
+        model.field = field
         model.label = label
         model.description = description
         model.requirement_type = requirement_type
@@ -57,16 +98,9 @@ class FormRepo(BaseRepo):
         model.can_have_default_value = can_have_default_value
         model.can_have_description = can_have_description
         model.can_change_requirement_type = can_change_requirement_type
-
-        if rank is not None:
-            model.rank = rank
-        else:
-            next_rank_stmt = select(func.max(FormField.rank)).where(FormField.form_id == form.id)
-            rank = self.session.scalar(next_rank_stmt)
-            model.rank = rank + 1 if rank else 0
+        model.rank = rank
 
         self.session.add(model)
-        self.session.flush()
 
         return model
 
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Literal, Sequence
 
-from sqlalchemy import Row, and_, delete, func, select
+from sqlalchemy import Row, and_, delete, func, or_, select
 
 from app.exceptions import FormFieldValidationError, ValidationError
 from app.models import (
@@ -61,14 +61,14 @@ class IncidentRepo(BaseRepo):
         fields: list[ModelIdSchema] | None = None,
         is_default: bool = False,
     ) -> IncidentType:
-        model = IncidentType()
-        model.organisation_id = organisation.id
-        model.name = name
-        model.description = description
-        model.is_deletable = is_deletable
-        model.is_editable = is_editable
-        model.is_default = is_default
-        self.session.add(model)
+        model = self.add_incident_type(
+            organisation=organisation,
+            name=name,
+            description=description,
+            is_editable=is_editable,
+            is_deletable=is_deletable,
+            is_default=is_default,
+        )
         self.session.flush()
 
         if fields:
@@ -83,6 +83,27 @@ class IncidentRepo(BaseRepo):
 
         return model
 
+    def add_incident_type(
+        self,
+        organisation: Organisation,
+        name: str,
+        description: str,
+        is_editable: bool = True,
+        is_deletable: bool = True,
+        is_default: bool = False,
+    ) -> IncidentType:
+        """Add a new incident type to the session without flushing"""
+        model = IncidentType()
+        model.organisation_id = organisation.id
+        model.name = name
+        model.description = description
+        model.is_deletable = is_deletable
+        model.is_editable = is_editable
+        model.is_default = is_default
+        self.session.add(model)
+
+        return model
+
     def search_incidents(
         self,
         organisation: Organisation,
@@ -118,6 +139,28 @@ class IncidentRepo(BaseRepo):
 
         return PaginatedResults(total=total, page=page, size=size, items=records)
 
+    def search_incidents_by_name_or_reference(
+        self, organisation: Organisation, query: str, limit: int = 100
+    ) -> Sequence[Incident]:
+        """Most recent incidents whose name or reference starts with the query, case insensitively"""
+        prefix = query.lower()
+        stmt = (
+            select(Incident)
+            .where(
+                Incident.organisation_id == organisation.id,
+                Incident.deleted_at.is_(None),
+                # matches the indexes on lower(name) and lower(reference), so this stays fast for large organisations
+                or_(
+                    func.lower(Incident.name).startswith(prefix, autoescape=True),
+                    func.lower(Incident.reference).startswith(prefix, autoescape=True),
+                ),
+            )
+            .order_by(Incident.created_at.desc())
+            .limit(limit)
+        )
+
+        return self.session.scalars(stmt).all()
+
     def get_all_incidents(self, organisation: Organisation) -> Sequence[Incident]:
         stmt = select(Incident).where(Incident.organisation_id == organisation.id, Incident.deleted_at.is_(None))
 
@@ -199,6 +242,22 @@ class IncidentRepo(BaseRepo):
         description: str | None = None,
     ) -> IncidentStatus:
         """Create new incident status"""
+        model = self.add_incident_status(
+            organisation=organisation, name=name, rank=rank, category=category, description=description
+        )
+        self.session.flush()
+
+        return model
+
+    def add_incident_status(
+        self,
+        organisation: Organisation,
+        name: str,
+        rank: int,
+        category: IncidentStatusCategoryEnum,
+        description: str | None = None,
+    ) -> IncidentStatus:
+        """Add a new incident status to the session without flushing"""
         model = IncidentStatus()
         model.organisation_id = organisation.id
         model.name = name
@@ -207,7 +266,6 @@ class IncidentRepo(BaseRepo):
         model.description = description
 
         self.session.add(model)
-        self.session.flush()
 
         return model
 
@@ -245,6 +303,16 @@ class IncidentRepo(BaseRepo):
 
         return self.session.scalar(stmt) or 0
 
+    def reserve_reference_ids(self, organisation: Organisation, total: int) -> range:
+        """Reserve a block of reference IDs, the organisation row stays locked until the transaction ends"""
+        lock_stmt = select(Organisation.id).where(Organisation.id == organisation.id).with_for_update()
+        self.session.execute(lock_stmt)
+
+        max_stmt = select(func.max(Incident.reference_id)).where(Incident.organisation_id == organisation.id)
+        start = (self.session.scalar(max_stmt) or 0) + 1
+
+        return range(start, start + total)
+
     def assign_role(self, incident: Incident, role: IncidentRole, user: User) -> AssignRoleResult:
         # if that role has already been assigned, update the user
         for role_assignment in incident.incident_role_assignments:
@@ -305,6 +373,30 @@ class IncidentRepo(BaseRepo):
         is_editable: bool = True,
         is_deletable: bool = True,
     ) -> IncidentRole:
+        model = self.add_incident_role(
+            organisation=organisation,
+            name=name,
+            description=description,
+            kind=kind,
+            slack_reference=slack_reference,
+            is_editable=is_editable,
+            is_deletable=is_deletable,
+        )
+        self.session.flush()
+
+        return model
+
+    def add_incident_role(
+        self,
+        organisation: Organisation,
+        name: str,
+        description: str,
+        kind: IncidentRoleKind,
+        slack_reference: str,
+        is_editable: bool = True,
+        is_deletable: bool = True,
+    ) -> IncidentRole:
+        """Add a new incident role to the session without flushing"""
         model = IncidentRole()
         model.organisation_id = organisation.id
         model.name = name
@@ -315,7 +407,6 @@ class IncidentRepo(BaseRepo):
         model.is_deletable = is_deletable
 
         self.session.add(model)
-        self.session.flush()
 
         return model
 
@@ -9,6 +9,12 @@ from .base_repo import BaseRepo
 class LifecycleRepo(BaseRepo):
     def create_lifecycle(self, organisation: Organisation) -> Lifecycle:
         """Create default lifecycle for organisation"""
+        model = self.add_lifecycle(organisation=organisation)
+        self.session.flush()
+        return model
+
+    def add_lifecycle(self, organisation: Organisation) -> Lifecycle:
+        """Add the default lifecycle for organisation to the session without flushing"""
         model = Lifecycle()
         model.name = "Default"
         model.organisation_id = organisation.id
@@ -16,7 +22,6 @@ class LifecycleRepo(BaseRepo):
         model.is_deletable = False
         model.is_triage_available = True
         self.session.add(model)
-        self.session.flush()
         return model
 
     def get_lifecycle_for_organisation_or_raise(self, organisation: Organisation) -> Lifecycle:
@@ -1,6 +1,9 @@
+from typing import Iterable, Sequence
+
 from pydantic.alias_generators import to_snake
 from shortuuid import uuid
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.models import MemberRole, Organisation, OrganisationMember, OrganisationTypes, User
 from app.schemas.actions import PatchOrganisationSettingsSchema
@@ -70,6 +73,20 @@ class OrganisationRepo(BaseRepo):
 
         return member
 
+    def add_members_if_not_exist(self, user_ids: Iterable[str], organisation: Organisation, role: MemberRole) -> None:
+        """Add many members in one statement, existing members keep their current role"""
+        rows = [dict(user_id=user_id, organisation_id=organisation.id, role=role) for user_id in user_ids]
+        if not rows:
+            return
+
+        stmt = insert(OrganisationMember).values(rows).on_conflict_do_nothing(constraint="ux_user_organisation")
+        self.session.execute(stmt)
+
+    def get_slack_organisations(self) -> Sequence[Organisation]:
+        """Organisations with the slack app installed"""
+        stmt = select(Organisation).where(Organisation.slack_bot_token.is_not(None))
+        return self.session.scalars(stmt).all()
+
     def add_member_if_not_exists(self, user: User, organisation: Organisation, role: MemberRole) -> OrganisationMember:
         """Only add a member if they are not already part of the organisation"""
         if member := self.get_member(user=user, organisation=organisation):
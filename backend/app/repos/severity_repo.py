@@ -30,6 +30,13 @@ class SeverityRepo(BaseRepo):
         return self.session.scalars(stmt).one()
 
     def create_severity(self, organisation: Organisation, name: str, description: str, rating: int) -> IncidentSeverity:
+        model = self.add_severity(organisation=organisation, name=name, description=description, rating=rating)
+        self.session.flush()
+
+        return model
+
+    def add_severity(self, organisation: Organisation, name: str, description: str, rating: int) -> IncidentSeverity:
+        """Add a new severity to the session without flushing"""
         model = IncidentSeverity()
         model.name = name
         model.organisation_id = organisation.id
@@ -37,7 +44,6 @@ class SeverityRepo(BaseRepo):
         model.rating = rating
 
         self.session.add(model)
-        self.session.flush()
 
         return model
 
@@ -1,8 +1,13 @@
-from datetime import datetime, timezone
-from typing import Sequence
+import collections
+from datetime import date, datetime, timezone
+from typing import Any, Sequence
 
-from sqlalchemy import distinct, func, or_, select
+from sqlalchemy import delete, distinct, func, insert, or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.env import settings
 from app.exceptions import FormFieldValidationError, ValidationError
 from app.models import (
     ComponentStatus,
@@ -10,7 +15,9 @@ from app.models import (
     StatusPage,
     StatusPageComponent,
     StatusPageComponentAffected,
+    StatusPageComponentDailySummary,
     StatusPageComponentEvent,
+    StatusPageComponentEventArchive,
     StatusPageComponentGroup,
     StatusPageComponentUpdate,
     StatusPageIncident,
@@ -33,7 +40,7 @@ from app.schemas.actions import (
     UpdateStatusPageItemsRankSchema,
 )
 from app.schemas.resources import ComponentsCurrentStatusSchema, ComponentStatusSchema
-from app.utils import generate_slug
+from app.utils import generate_slug, queue_live_event, status_page_channel
 
 
 class StatusPageRepo(BaseRepo):
@@ -55,17 +62,57 @@ class StatusPageRepo(BaseRepo):
 
     def get_by_domain_or_raise(self, domain: str) -> StatusPage:
         """Get status page by domain"""
-        stmt = select(StatusPage).where(StatusPage.custom_domain == domain, StatusPage.deleted_at.is_(None))
-        return self.session.execute(stmt).scalar_one()
-
-    def get_by_domain_or_slug_or_raise(self, domain: str) -> StatusPage:
-        """Get status page by domain or slug"""
         stmt = select(StatusPage).where(
-            or_(StatusPage.custom_domain == domain, StatusPage.slug == domain),
-            StatusPage.deleted_at.is_(None),
+            func.lower(StatusPage.custom_domain) == domain.lower(), StatusPage.deleted_at.is_(None)
         )
         return self.session.execute(stmt).scalar_one()
 
+    def get_id_by_host(self, host: str) -> str | None:
+        """ID of the status page served on a host, either a subdomain of ours or a custom domain
+
+        Hosts which aren't subdomains of ours may also be a slug.
+        """
+        if host.endswith(settings.STATUS_PAGE_DOMAIN):
+            condition = StatusPage.slug == host.split(".")[0]
+        else:
+            condition = or_(func.lower(StatusPage.custom_domain) == host, StatusPage.slug == host)
+
+        stmt = select(StatusPage.id).where(condition, StatusPage.deleted_at.is_(None)).limit(1)
+        return self.session.scalar(stmt)
+
+    def load_item_trees(self, status_pages: Sequence[StatusPage]) -> None:
+        """Load the items of every page, with their components and groups, in one query
+
+        Items are linked to their children in memory, so serializing a page doesn't query for each item.
+        Only call this for pages without pending changes to their items, as those would be replaced.
+        """
+        if not status_pages:
+            return
+
+        stmt = (
+            select(StatusPageItem)
+            .where(StatusPageItem.status_page_id.in_([status_page.id for status_page in status_pages]))
+            .options(
+                joinedload(StatusPageItem.status_page_component),
+                joinedload(StatusPageItem.status_page_component_group),
+            )
+            .order_by(StatusPageItem.rank.asc())
+        )
+
+        children: dict[str | None, list[StatusPageItem]] = collections.defaultdict(list)
+        top_level: dict[str, list[StatusPageItem]] = collections.defaultdict(list)
+        items = self.session.scalars(stmt).all()
+        for item in items:
+            if item.parent_id:
+                children[item.parent_id].append(item)
+            else:
+                top_level[item.status_page_id].append(item)
+
+        for item in items:
+            set_committed_value(item, "status_page_items", children[item.id])
+        for status_page in status_pages:
+            set_committed_value(status_page, "status_page_items", top_level[status_page.id])
+
     def get_group_by_id_or_raise(self, id: str) -> StatusPageComponentGroup:
         stmt = (
             select(StatusPageComponentGroup)
@@ -175,12 +222,15 @@ class StatusPageRepo(BaseRepo):
     def _generate_slug(self, name: str) -> str:
         """Generate a slug that is not currently in use"""
         base_slug = generate_slug(name)
+        stmt = select(StatusPage.slug).where(
+            or_(StatusPage.slug == base_slug, StatusPage.slug.startswith(base_slug + "-", autoescape=True))
+        )
+        taken = set(self.session.scalars(stmt).all())
+
         suffix = 1
         while True:
             slug = base_slug + "-" + str(suffix) if suffix > 1 else base_slug
-            stmt = select(StatusPage).where(StatusPage.slug == slug).limit(1)
-            page = self.session.execute(stmt).scalar_one_or_none()
-            if not page:
+            if slug not in taken:
                 return slug
 
             suffix += 1
@@ -289,7 +339,6 @@ class StatusPageRepo(BaseRepo):
         stmt = (
             select(StatusPageComponentEvent)
             .join(StatusPageComponent)
-            .join(StatusPage)
             .where(
                 StatusPageComponent.status_page_id == status_page.id,
                 StatusPageComponentEvent.started_at >= start_date,
@@ -329,6 +378,7 @@ class StatusPageRepo(BaseRepo):
         self.session.add(update)
         self.session.flush()
 
+        events: list[StatusPageComponentEvent] = []
         for component_id, status in create_in.affected_components.items():
             # Skip operational components
             if status == ComponentStatus.OPERATIONAL:
@@ -358,6 +408,9 @@ class StatusPageRepo(BaseRepo):
             event.started_at = datetime.now(tz=timezone.utc)
             self.session.add(event)
             self.session.flush()
+            events.append(event)
+
+        self._queue_delta(status_page_id=status_page.id, kind="incident.created", incident=incident, events=events)
 
         return incident
 
@@ -378,18 +431,43 @@ class StatusPageRepo(BaseRepo):
         )
 
         result = self.session.execute(stmt).all()
-        status_ordered = list(ComponentStatus)
         results: list[ComponentStatusSchema] = []
 
         for component_id, status_list in result:
             component = self.get_component_by_id_or_raise(component_id)
-            indexes = map(status_ordered.index, status_list)
-            most_serve_status = status_ordered[max(indexes)]
-            item = ComponentStatusSchema(component=component, status=most_serve_status)
+            item = ComponentStatusSchema(component=component, status=ComponentStatus.most_severe(status_list))
             results.append(item)
 
         return ComponentsCurrentStatusSchema(components=results)
 
+    def get_public_component_statuses(self, status_page: StatusPage) -> dict[str, ComponentStatus]:
+        """Current status of the page's visible components which aren't operational"""
+        stmt = (
+            select(
+                StatusPageComponentEvent.status_page_component_id,
+                func.array_agg(distinct(StatusPageComponentEvent.status)),
+            )
+            .join(StatusPageIncident)
+            .join(StatusPageComponent, StatusPageComponent.id == StatusPageComponentEvent.status_page_component_id)
+            .where(
+                StatusPageIncident.status_page_id == status_page.id,
+                StatusPageComponentEvent.deleted_at.is_(None),
+                StatusPageIncident.deleted_at.is_(None),
+                StatusPageComponentEvent.ended_at.is_(None),
+                StatusPageComponent.deleted_at.is_(None),
+                StatusPageComponent.is_hidden.is_(False),
+            )
+            .group_by(StatusPageComponentEvent.status_page_component_id)
+        )
+
+        statuses = {
+            component_id: ComponentStatus.most_severe(status_list)
+            for component_id, status_list in self.session.execute(stmt).all()
+        }
+        return {
+            component_id: status for component_id, status in statuses.items() if status != ComponentStatus.OPERATIONAL
+        }
+
     def get_incidents(
         self, status_page: StatusPage, pagination: PaginationParamsSchema, is_active: bool | None = None
     ) -> Sequence[StatusPageIncident]:
@@ -436,6 +514,7 @@ class StatusPageRepo(BaseRepo):
         self.session.add(update)
         self.session.flush()
 
+        events: list[StatusPageComponentEvent] = []
         for component_id, status in create_in.affected_components.items():
             component = self.get_component_by_id_or_raise(component_id)
 
@@ -470,11 +549,13 @@ class StatusPageRepo(BaseRepo):
                     event.ended_at = now
                     event.updated_at = now
                     self.session.flush()
+                    events.append(event)
                 # If the status has changed, end the current event and create a new one
                 elif event.status != status:
                     event.ended_at = now
                     event.updated_at = now
                     self.session.flush()
+                    events.append(event)
 
                     event = StatusPageComponentEvent()
                     event.status_page_component_id = component_id
@@ -483,6 +564,7 @@ class StatusPageRepo(BaseRepo):
                     event.started_at = now
                     self.session.add(event)
                     self.session.flush()
+                    events.append(event)
                 # If the status has not changed, update the event
                 else:
                     event.updated_at = now
@@ -497,9 +579,38 @@ class StatusPageRepo(BaseRepo):
                     event.started_at = now
                     self.session.add(event)
                     self.session.flush()
+                    events.append(event)
+
+        self._queue_delta(
+            status_page_id=incident.status_page_id, kind="incident.updated", incident=incident, events=events
+        )
 
         return update
 
+    def _queue_delta(
+        self, status_page_id: str, kind: str, incident: StatusPageIncident, events: list[StatusPageComponentEvent]
+    ) -> None:
+        """Queue a compact description of the change for live clients, it's published when the session commits"""
+        delta: dict[str, Any] = {
+            "incident": {
+                "id": incident.id,
+                "name": incident.name,
+                "status": StatusPageIncidentStatus(incident.status).value,
+                "publishedAt": incident.published_at.isoformat(),
+            },
+            "events": [
+                {
+                    "id": event.id,
+                    "statusPageComponentId": event.status_page_component_id,
+                    "status": ComponentStatus(event.status).value,
+                    "startedAt": event.started_at.isoformat(),
+                    "endedAt": event.ended_at.isoformat() if event.ended_at else None,
+                }
+                for event in events
+            ],
+        }
+        queue_live_event(session=self.session, channel=status_page_channel(status_page_id), type=kind, data=delta)
+
     def get_affected_component(
         self, incident: StatusPageIncident, component: StatusPageComponent
     ) -> StatusPageComponentAffected | None:
@@ -551,8 +662,109 @@ class StatusPageRepo(BaseRepo):
         stmt = select(StatusPage).where(StatusPage.slug == slug, StatusPage.id != exclude_status_page.id).limit(1)
         return not self.session.execute(stmt).scalar_one_or_none()
 
-    def get_unverified_custom_domains(self) -> Sequence[StatusPage]:
-        stmt = select(StatusPage).where(
-            StatusPage.custom_domain.isnot(None), StatusPage.is_custom_domain_verified.is_(False)
+    def get_custom_domains_due_for_check(self, now: datetime, limit: int) -> Sequence[StatusPage]:
+        """Unverified custom domains whose next check is due, those never checked first"""
+        stmt = (
+            select(StatusPage)
+            .where(
+                StatusPage.custom_domain.isnot(None),
+                StatusPage.is_custom_domain_verified.is_(False),
+                StatusPage.deleted_at.is_(None),
+                or_(StatusPage.custom_domain_next_check_at.is_(None), StatusPage.custom_domain_next_check_at <= now),
+            )
+            .order_by(StatusPage.custom_domain_next_check_at.asc().nulls_first())
+            .limit(limit)
+        )
+        return self.session.scalars(stmt).all()
+
+    def get_component_events_ended_before(self, before: datetime, limit: int) -> Sequence[StatusPageComponentEvent]:
+        """Get ended events which are older than the given date, oldest first"""
+        stmt = (
+            select(StatusPageComponentEvent)
+            .where(StatusPageComponentEvent.ended_at.isnot(None), StatusPageComponentEvent.ended_at < before)
+            .order_by(StatusPageComponentEvent.ended_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return self.session.execute(stmt).scalars().all()
+
+    def archive_component_events(self, events: Sequence[StatusPageComponentEvent]) -> None:
+        """Move events into the archive table"""
+        if not events:
+            return
+
+        archived_at = datetime.now(tz=timezone.utc)
+        self.session.execute(
+            insert(StatusPageComponentEventArchive),
+            [
+                {
+                    "id": event.id,
+                    "status_page_incident_id": event.status_page_incident_id,
+                    "status_page_component_id": event.status_page_component_id,
+                    "status": event.status,
+                    "started_at": event.started_at,
+                    "ended_at": event.ended_at,
+                    "created_at": event.created_at,
+                    "updated_at": event.updated_at,
+                    "deleted_at": event.deleted_at,
+                    "archived_at": archived_at,
+                }
+                for event in events
+            ],
+        )
+
+        event_ids = [event.id for event in events]
+        self.session.execute(delete(StatusPageComponentEvent).where(StatusPageComponentEvent.id.in_(event_ids)))
+        self.session.flush()
+
+    def get_component_event_intervals(
+        self, component_ids: Sequence[str], start: datetime, end: datetime
+    ) -> list[tuple[str, ComponentStatus, datetime, datetime | None]]:
+        """Events of the components overlapping the period, whether or not they have been archived"""
+        if not component_ids:
+            return []
+
+        def overlapping(model: type[StatusPageComponentEvent] | type[StatusPageComponentEventArchive]):
+            return select(model.status_page_component_id, model.status, model.started_at, model.ended_at).where(
+                model.status_page_component_id.in_(component_ids),
+                model.started_at < end,
+                or_(model.ended_at.is_(None), model.ended_at > start),
+                model.deleted_at.is_(None),
+            )
+
+        stmt = union_all(overlapping(StatusPageComponentEvent), overlapping(StatusPageComponentEventArchive))
+        return [tuple(row) for row in self.session.execute(stmt).all()]  # type: ignore
+
+    def save_component_daily_summaries(self, rows: list[dict[str, Any]]) -> None:
+        """Insert or replace daily summaries for each component and day"""
+        if not rows:
+            return
+
+        stmt = pg_insert(StatusPageComponentDailySummary).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="ux_status_page_component_daily_summary_day",
+            set_={
+                "degraded_performance_seconds": stmt.excluded.degraded_performance_seconds,
+                "partial_outage_seconds": stmt.excluded.partial_outage_seconds,
+                "full_outage_seconds": stmt.excluded.full_outage_seconds,
+                "worst_status": stmt.excluded.worst_status,
+                "updated_at": func.now(),
+            },
+        )
+        self.session.execute(stmt)
+
+    def get_component_daily_summaries(
+        self, status_page: StatusPage, start_day: date, end_day: date
+    ) -> Sequence[StatusPageComponentDailySummary]:
+        """Get the daily summaries for all components of a status page, from the start day up to the end day"""
+        stmt = (
+            select(StatusPageComponentDailySummary)
+            .join(StatusPageComponent)
+            .where(
+                StatusPageComponent.status_page_id == status_page.id,
+                StatusPageComponentDailySummary.day >= start_day,
+                StatusPageComponentDailySummary.day < end_day,
+            )
+            .order_by(StatusPageComponentDailySummary.day.asc())
         )
         return self.session.execute(stmt).scalars().all()
@@ -40,6 +40,23 @@ class TimestampRepo(BaseRepo):
         rules: list[dict[str, Any]],
         can_delete: bool,
     ) -> Timestamp:
+        timestamp = self.add_timestamp(
+            organisation=organisation, label=label, kind=kind, rank=rank, rules=rules, can_delete=can_delete
+        )
+        self.session.flush()
+
+        return timestamp
+
+    def add_timestamp(
+        self,
+        organisation: Organisation,
+        label: str,
+        kind: TimestampKind,
+        rank: int,
+        rules: list[dict[str, Any]],
+        can_delete: bool,
+    ) -> Timestamp:
+        """Add a new timestamp to the session without flushing"""
         timestamp = Timestamp()
         timestamp.organisation_id = organisation.id
         timestamp.label = label
@@ -49,7 +66,6 @@ class TimestampRepo(BaseRepo):
         timestamp.can_delete = can_delete
 
         self.session.add(timestamp)
-        self.session.flush()
 
         return timestamp
 
@@ -1,7 +1,8 @@
 import secrets
-from typing import Sequence
+from typing import Iterable, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.exceptions import FormFieldValidationError
 from app.models import Organisation, OrganisationMember, User
@@ -61,6 +62,43 @@ class UserRepo(BaseRepo):
         query = select(User).where(User.slack_user_id == slack_user_id).limit(1)
         return self.session.scalars(query).first()
 
+    def get_by_slack_user_ids_or_email_addresses(
+        self, slack_user_ids: Iterable[str], email_addresses: Iterable[str]
+    ) -> Sequence[User]:
+        stmt = select(User).where(
+            or_(
+                User.slack_user_id.in_(list(slack_user_ids)),
+                User.email_address.in_([it.lower() for it in email_addresses]),
+            )
+        )
+        return self.session.scalars(stmt).all()
+
+    def create_slack_users(self, members: Sequence[tuple[str, str, str]], password_hash: str) -> dict[str, str]:
+        """Create users from (slack user id, name, email address) in one statement
+
+        Members whose slack id or email address is already taken are skipped, returns slack user id -> user id for the
+        users which were created.
+        """
+        if not members:
+            return {}
+
+        rows = [
+            {
+                "name": name,
+                "email_address": email_address.lower(),
+                # already hashed, so it's set on the column rather than through User.password
+                "_password": password_hash,
+                "auth_token": secrets.token_urlsafe(32),
+                "is_active": True,
+                "is_email_verified": False,
+                "slack_user_id": slack_user_id,
+            }
+            for slack_user_id, name, email_address in members
+        ]
+        stmt = insert(User).values(rows).on_conflict_do_nothing().returning(User.slack_user_id, User.id)
+
+        return {slack_user_id: user_id for slack_user_id, user_id in self.session.execute(stmt)}
+
     def get_all_organisation_members(self, organisation: Organisation) -> Sequence[OrganisationMember]:
         """Get all members of an organisation"""
         stmt = (
@@ -71,6 +109,23 @@ class UserRepo(BaseRepo):
 
         return self.session.scalars(stmt).all()
 
+    def search_organisation_users(self, organisation: Organisation, query: str, limit: int = 100) -> Sequence[User]:
+        """Active members of the organisation whose name starts with the query, case insensitively"""
+        stmt = (
+            select(User)
+            .join(OrganisationMember)
+            .where(
+                OrganisationMember.organisation_id == organisation.id,
+                User.is_active.is_(True),
+                # matches the index on lower(name)
+                func.lower(User.name).startswith(query.lower(), autoescape=True),
+            )
+            .order_by(User.name)
+            .limit(limit)
+        )
+
+        return self.session.scalars(stmt).all()
+
     def get_organisation_member_by_email_address(
         self, organisation: Organisation, email_address: str
     ) -> OrganisationMember | None:
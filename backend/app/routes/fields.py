@@ -1,7 +1,14 @@
 import structlog
 from fastapi import APIRouter
 
-from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession
+from app.deps import (
+    CurrentOrganisation,
+    CurrentUser,
+    DatabaseSession,
+    ReadOnlyCurrentOrganisation,
+    ReadOnlyCurrentUser,
+    ReadOnlyDatabaseSession,
+)
 from app.exceptions import NotPermittedError
 from app.models import FieldKind
 from app.repos import FieldRepo
@@ -16,9 +23,9 @@ router = APIRouter(tags=["Fields"])
 
 @router.get("/search", response_model=PaginatedResults[FieldSchema])
 async def fields_search(
-    user: CurrentUser,
-    db: DatabaseSession,
-    organisation: CurrentOrganisation,
+    user: ReadOnlyCurrentUser,
+    db: ReadOnlyDatabaseSession,
+    organisation: ReadOnlyCurrentOrganisation,
 ):
     """Get fields for organisation"""
     field_repo = FieldRepo(session=db)
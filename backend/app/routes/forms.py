@@ -2,7 +2,13 @@ from fastapi import APIRouter, Depends, Response, status
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.deps import CurrentOrganisation, CurrentUser
+from app.deps import (
+    CurrentOrganisation,
+    CurrentUser,
+    ReadOnlyCurrentOrganisation,
+    ReadOnlyCurrentUser,
+    ReadOnlyDatabaseSession,
+)
 from app.exceptions import NotPermittedError
 from app.models import FieldKind, RequirementTypeEnum
 from app.repos import FieldRepo, FormRepo, LifecycleRepo
@@ -14,7 +20,7 @@ router = APIRouter(tags=["Forms"])
 
 
 @router.get("/search", response_model=PaginatedResults[FormSchema])
-def form_search(user: CurrentUser, organisation: CurrentOrganisation, db: Session = Depends(get_db)):
+def form_search(user: ReadOnlyCurrentUser, organisation: ReadOnlyCurrentOrganisation, db: ReadOnlyDatabaseSession):
     """Search for forms"""
     form_repo = FormRepo(session=db)
     forms = form_repo.search_forms(organisation=organisation)
@@ -1,7 +1,14 @@
 import structlog
 from fastapi import APIRouter, Response, status
 
-from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession
+from app.deps import (
+    CurrentOrganisation,
+    CurrentUser,
+    DatabaseSession,
+    ReadOnlyCurrentOrganisation,
+    ReadOnlyCurrentUser,
+    ReadOnlyDatabaseSession,
+)
 from app.exceptions import NotPermittedError
 from app.repos import IncidentRepo
 from app.schemas.actions import CreateIncidentTypeSchema, PatchIncidentTypeSchema
@@ -15,9 +22,9 @@ router = APIRouter(tags=["Fields"])
 
 @router.get("/search", response_model=PaginatedResults[IncidentTypeSchema])
 async def incident_types_search(
-    _: CurrentUser,
-    db: DatabaseSession,
-    organisation: CurrentOrganisation,
+    _: ReadOnlyCurrentUser,
+    db: ReadOnlyDatabaseSession,
+    organisation: ReadOnlyCurrentOrganisation,
 ):
     """Get incident_types for organisation"""
     incident_repo = IncidentRepo(session=db)
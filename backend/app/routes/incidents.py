@@ -1,12 +1,22 @@
 from typing import Annotated
 
 import structlog
-from fastapi import APIRouter, Depends, Response, status
-
-from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession, EventsService
-from app.exceptions import NotPermittedError
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.responses import StreamingResponse
+
+from app.deps import (
+    CurrentOrganisation,
+    CurrentUser,
+    DatabaseSession,
+    EventsService,
+    ReadOnlyCurrentOrganisation,
+    ReadOnlyCurrentUser,
+    ReadOnlyDatabaseSession,
+    get_incident_search_params,
+)
+from app.exceptions import NotPermittedError, TooManyConnectionsError
 from app.models import FormKind
-from app.repos import FormRepo, IncidentRepo, TimestampRepo, UserRepo
+from app.repos import FormRepo, IncidentRepo, UserRepo
 from app.schemas.actions import (
     CreateIncidentSchema,
     CreateIncidentUpdateSchema,
@@ -21,6 +31,8 @@ from app.schemas.models import IncidentSchema, IncidentUpdateSchema
 from app.schemas.resources import PaginatedResults
 from app.schemas.special import CombinedFieldAndValueSchema
 from app.services.factories import create_incident_service
+from app.services.live_stream import broadcaster
+from app.utils import incident_channel
 
 logger = structlog.get_logger(logger_name=__name__)
 
@@ -29,10 +41,10 @@ router = APIRouter(tags=["Incidents"])
 
 @router.get("/search", response_model=PaginatedResults[IncidentSchema])
 async def incident_search(
-    search_params: Annotated[IncidentSearchSchema, Depends(IncidentSearchSchema.as_query)],
-    user: CurrentUser,
-    db: DatabaseSession,
-    organisation: CurrentOrganisation,
+    search_params: Annotated[IncidentSearchSchema, Depends(get_incident_search_params)],
+    user: ReadOnlyCurrentUser,
+    db: ReadOnlyDatabaseSession,
+    organisation: ReadOnlyCurrentOrganisation,
 ):
     """Search through organisation's incidents"""
     incident_repo = IncidentRepo(session=db)
@@ -128,13 +140,13 @@ async def incident_patch_timestamps(
 ):
     """Patch timestamps for an incident"""
     incident_repo = IncidentRepo(session=db)
-    timestamp_repo = TimestampRepo(session=db)
     incident = incident_repo.get_incident_by_id_or_raise(id)
 
     if not user.belongs_to(incident.organisation):
         raise NotPermittedError()
 
-    timestamp_repo.bulk_update_incident_timestamps(incident=incident, put_in=patch_in)
+    incident_service = create_incident_service(session=db, organisation=incident.organisation)
+    incident_service.patch_timestamps(incident=incident, patch_in=patch_in)
 
     db.commit()
 
@@ -155,8 +167,10 @@ async def incident_update_role(
 
     role = incident_repo.get_incident_role_by_id_or_raise(put_in.role.id)
 
+    incident_service = create_incident_service(session=db, organisation=incident.organisation, events=events)
+
     if not put_in.user:
-        incident_repo.remove_role_assignment(incident=incident, role=role)
+        incident_service.remove_role_assignment(incident=incident, role=role)
         db.commit()
         return None
 
@@ -165,7 +179,6 @@ async def incident_update_role(
     if not user.belongs_to_any(role_assignee.organisations) or not user.belongs_to(role.organisation):
         raise NotPermittedError()
 
-    incident_service = create_incident_service(session=db, organisation=incident.organisation, events=events)
     incident_service.assign_role(incident=incident, user=role_assignee, role=role)
 
     db.commit()
@@ -206,7 +219,8 @@ async def incident_patch_field_values(
     if not user.belongs_to(incident.organisation):
         raise NotPermittedError()
 
-    incident_repo.patch_incident_custom_fields(incident=incident, patch_in=patch_in)
+    incident_service = create_incident_service(session=db, organisation=incident.organisation)
+    incident_service.patch_incident_custom_fields(incident=incident, patch_in=patch_in)
 
     db.commit()
 
@@ -230,3 +244,31 @@ async def incident_create_update(
     db.commit()
 
     return update
+
+
+@router.get("/{id}/stream")
+async def incident_stream(
+    id: str,
+    db: DatabaseSession,
+    user: CurrentUser,
+    last_event_id: str | None = Header(None, alias="last-event-id"),
+):
+    """Changes to an incident as server-sent events"""
+    incident_repo = IncidentRepo(session=db)
+    incident = incident_repo.get_incident_by_id_or_raise(id)
+
+    if not user.belongs_to(organisation=incident.organisation):
+        raise NotPermittedError()
+
+    channel = incident_channel(incident.id)
+    if broadcaster.is_full(channel):
+        raise TooManyConnectionsError()
+
+    # nothing else is read from the database, so don't hold on to a connection while streaming
+    db.close()
+
+    return StreamingResponse(
+        broadcaster.stream(channel=channel, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
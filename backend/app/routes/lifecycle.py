@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.deps import CurrentOrganisation, CurrentUser
+from app.deps import CurrentUser, ReadOnlyCurrentOrganisation, ReadOnlyCurrentUser, ReadOnlyDatabaseSession
 from app.repos import LifecycleRepo
 from app.schemas.actions import PatchLifecycleSchema
 from app.schemas.models import LifecycleSchema
@@ -11,7 +11,7 @@ router = APIRouter(tags=["Forms"])
 
 
 @router.get("", response_model=LifecycleSchema)
-def lifecycle_get(user: CurrentUser, organisation: CurrentOrganisation, db: Session = Depends(get_db)):
+def lifecycle_get(user: ReadOnlyCurrentUser, organisation: ReadOnlyCurrentOrganisation, db: ReadOnlyDatabaseSession):
     """Get lifecycle for organisation"""
     lifecycle_repo = LifecycleRepo(session=db)
     lifecycle = lifecycle_repo.get_lifecycle_for_organisation_or_raise(organisation=organisation)
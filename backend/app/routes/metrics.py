@@ -0,0 +1,22 @@
+import secrets
+
+from fastapi import APIRouter, Header, Response
+
+from app.env import settings
+from app.exceptions import NotPermittedError
+from app.metrics import generate_metrics
+
+router = APIRouter(tags=["Metrics"], include_in_schema=False)
+
+
+@router.get("")
+def metrics_index(authorization: str | None = Header(None)):
+    """Prometheus exposition format"""
+    if settings.METRICS_TOKEN:
+        token = (authorization or "").removeprefix("Bearer ").strip()
+        if not secrets.compare_digest(token, settings.METRICS_TOKEN):
+            raise NotPermittedError()
+
+    content, content_type = generate_metrics()
+
+    return Response(content=content, media_type=content_type)
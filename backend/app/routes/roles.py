@@ -1,7 +1,14 @@
 import structlog
 from fastapi import APIRouter
 
-from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession
+from app.deps import (
+    CurrentOrganisation,
+    CurrentUser,
+    DatabaseSession,
+    ReadOnlyCurrentOrganisation,
+    ReadOnlyCurrentUser,
+    ReadOnlyDatabaseSession,
+)
 from app.exceptions import FormFieldValidationError, NotPermittedError
 from app.models import IncidentRoleKind
 from app.repos import IncidentRepo
@@ -15,7 +22,9 @@ router = APIRouter(tags=["Severities"])
 
 
 @router.get("/search", response_model=PaginatedResults[IncidentRoleSchema])
-async def roles_search(user: CurrentUser, db: DatabaseSession, organisation: CurrentOrganisation):
+async def roles_search(
+    user: ReadOnlyCurrentUser, db: ReadOnlyDatabaseSession, organisation: ReadOnlyCurrentOrganisation
+):
     """Search for all roles within the organisation"""
     incident_repo = IncidentRepo(session=db)
 
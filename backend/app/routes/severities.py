@@ -3,7 +3,14 @@ from datetime import datetime, timezone
 import structlog
 from fastapi import APIRouter, status
 
-from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession
+from app.deps import (
+    CurrentOrganisation,
+    CurrentUser,
+    DatabaseSession,
+    ReadOnlyCurrentOrganisation,
+    ReadOnlyCurrentUser,
+    ReadOnlyDatabaseSession,
+)
 from app.exceptions import ApplicationException, NotPermittedError
 from app.repos import SeverityRepo
 from app.schemas.actions import CreateSeveritySchema, PatchSeveritySchema
@@ -16,7 +23,9 @@ router = APIRouter(tags=["Severities"])
 
 
 @router.get("/search", response_model=PaginatedResults[IncidentSeveritySchema])
-async def severity_search(user: CurrentUser, db: DatabaseSession, organisation: CurrentOrganisation):
+async def severity_search(
+    user: ReadOnlyCurrentUser, db: ReadOnlyDatabaseSession, organisation: ReadOnlyCurrentOrganisation
+):
     """Search for severities"""
     severity_repo = SeverityRepo(session=db)
     severities = severity_repo.get_all(organisation=organisation)
@@ -1,11 +1,20 @@
+import json
+
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.deps import CurrentUser, EventsService
+from app.deps import (
+    CurrentUser,
+    DatabaseSession,
+    EventsService,
+    ReadOnlyDatabaseSession,
+    get_slack_command,
+    get_slack_interaction,
+)
 from app.env import settings
-from app.repos import FormRepo, IncidentRepo, OrganisationRepo, SeverityRepo, UserRepo
+from app.repos import OrganisationRepo
 from app.schemas.actions import OAuth2AuthorizationResultSchema
 from app.schemas.models import OrganisationSchema, UserSchema
 from app.schemas.slack import (
@@ -15,11 +24,18 @@ from app.schemas.slack import (
     SlackInteractionSchema,
     SlackUrlVerificationHandshakeSchema,
 )
-from app.schemas.tasks import HandleSlashCommandTaskParameters
-from app.services.factories import create_incident_service, create_onboarding_service, create_slack_user_service
+from app.schemas.tasks import (
+    HandleSlackEventTaskParameters,
+    HandleSlackInteractionTaskParameters,
+    HandleSlashCommandTaskParameters,
+    SyncSlackUsersParameters,
+)
+from app.services.factories import create_onboarding_service, create_slack_user_service
 from app.services.oauth_connector import OAuthConnectorService
-from app.services.slack.events import SlackEventsService
-from app.services.slack.interaction import SlackInteractionService
+from app.services.slack.events import claim_event, verify_token
+from app.services.slack.forms.definition import form_definitions, validate_submission
+from app.services.slack.interaction import claim_view_submission
+from app.services.slack.options import SlackOptionsService
 
 logger = structlog.get_logger(logger_name=__name__)
 
@@ -105,7 +121,10 @@ async def slack_openid_complete(result: OAuth2AuthorizationResultSchema, session
 
 @router.post("/oauth/complete", response_model=OrganisationSchema)
 async def slack_oauth_complete(
-    result: OAuth2AuthorizationResultSchema, user: CurrentUser, session: Session = Depends(get_db)
+    result: OAuth2AuthorizationResultSchema,
+    user: CurrentUser,
+    events: EventsService,
+    session: Session = Depends(get_db),
 ):
     """Complete installation of slack app."""
     connector = _create_oauth_connector()
@@ -120,12 +139,22 @@ async def slack_oauth_complete(
 
     session.commit()
 
+    # so members can use slash commands without each of them being looked up on slack
+    events.queue_job(SyncSlackUsersParameters(organisation_id=creation_result.organisation.id))
+
     return creation_result.organisation
 
 
 @router.post("/events")
-async def slack_events(slack_event: SlackEventSchema, session: Session = Depends(get_db)):
-    """This handles events from slack, which are things like user joining a channel, message sent to channel, etc.."""
+def slack_events(
+    slack_event: SlackEventSchema,
+    events: EventsService,
+    slack_retry_num: int | None = Header(None, alias="x-slack-retry-num"),
+):
+    """This handles events from slack, which are things like user joining a channel, message sent to channel, etc..
+
+    Slack expects an answer within 3 seconds, so events are handled by a worker and redelivered events are dropped.
+    """
 
     # initial verification for this endpoint
     if isinstance(slack_event, SlackUrlVerificationHandshakeSchema):
@@ -133,29 +162,13 @@ async def slack_events(slack_event: SlackEventSchema, session: Session = Depends
 
     # otherwise handle events from slack
     elif isinstance(slack_event, SlackEventCallbackSchema):
-        organisation_repo = OrganisationRepo(session=session)
-        user_repo = UserRepo(session=session)
-        incident_repo = IncidentRepo(session=session)
-
-        organisation = organisation_repo.get_by_slack_team_id(slack_team_id=slack_event.team_id)
-        if not organisation:
-            logger.warning("Organisation not found", slack_team_id=slack_event.team_id)
-            return
-
-        slack_user_service = create_slack_user_service(session=session)
-
-        slack_events_service = SlackEventsService(
-            organisation=organisation,
-            organisation_repo=organisation_repo,
-            user_repo=user_repo,
-            slack_user_service=slack_user_service,
-            incident_repo=incident_repo,
-        )
-
-        if not slack_events_service.verify_token(slack_event.token):
+        if not verify_token(slack_event.token):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token is invalid")
 
-        slack_events_service.handle_event(slack_event)
+        if claim_event(slack_event.event_id):
+            events.queue_job(HandleSlackEventTaskParameters(event=slack_event))
+        else:
+            logger.info("Ignoring duplicate slack event", event_id=slack_event.event_id, retry_num=slack_retry_num)
 
     return Response(status_code=status.HTTP_202_ACCEPTED)
 
@@ -163,7 +176,7 @@ async def slack_events(slack_event: SlackEventSchema, session: Session = Depends
 @router.post("/slash-command")
 async def slack_slash_command(
     events: EventsService,
-    command: SlackCommandDataSchema = Depends(SlackCommandDataSchema.as_form),
+    command: SlackCommandDataSchema = Depends(get_slack_command),
     session: Session = Depends(get_db),
 ):
     """Main endpoint to handle slack slash command /inc and /incident"""
@@ -171,38 +184,62 @@ async def slack_slash_command(
     return Response(status_code=status.HTTP_200_OK)
 
 
-@router.post("/interaction")
-def slack_interaction(
-    events: EventsService,
-    session: Session = Depends(get_db),
-    interaction: SlackInteractionSchema = Depends(SlackInteractionSchema.as_form),
+@router.post("/options")
+def slack_options(
+    session: DatabaseSession,
+    interaction: SlackInteractionSchema = Depends(get_slack_interaction),
 ):
-    """This handles user interaction with UI elements created within Slack"""
-    organisation_repo = OrganisationRepo(session=session)
-    form_repo = FormRepo(session=session)
-    incident_repo = IncidentRepo(session=session)
-    severity_repo = SeverityRepo(session=session)
+    """Options for external selects in slack forms, requested as the user types"""
+    payload = interaction.payload
+    if payload.get("type") != "block_suggestion":
+        return {"options": []}
+
+    if not verify_token(payload.get("token", "")):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token is invalid")
 
-    organisation = organisation_repo.get_by_slack_team_id(interaction.payload["team"]["id"])
+    # read from the primary, options cached under a new form version mustn't come from a replica which is behind
+    organisation = OrganisationRepo(session=session).get_by_slack_team_id(payload["team"]["id"])
     if not organisation:
-        logger.error("Unhandled interaction event for team", team_id=interaction.payload["team"]["id"])
-        return Response(status_code=status.HTTP_200_OK)
+        logger.error("Unhandled options request for team", team_id=payload["team"]["id"])
+        return {"options": []}
 
-    incident_service = create_incident_service(session=session, organisation=organisation, events=events)
-    slack_user_service = create_slack_user_service(session=session)
-    user = slack_user_service.get_or_create_user_from_slack_id(
-        slack_id=interaction.payload["user"]["id"], organisation=organisation
-    )
+    options_service = SlackOptionsService(session=session, organisation=organisation)
 
-    slack_interaction_service = SlackInteractionService(
-        form_repo=form_repo,
-        incident_repo=incident_repo,
-        slack_user_service=slack_user_service,
-        incident_service=incident_service,
-        severity_repo=severity_repo,
-    )
+    return {"options": options_service.get_options(action_id=payload["action_id"], query=payload.get("value", ""))}
 
-    slack_interaction_service.handle_interaction(interaction=interaction, organisation=organisation, user=user)
-    session.commit()
+
+@router.post("/interaction")
+def slack_interaction(
+    events: EventsService,
+    session: ReadOnlyDatabaseSession,
+    interaction: SlackInteractionSchema = Depends(get_slack_interaction),
+):
+    """This handles user interaction with UI elements created within Slack
+
+    Submitted forms are checked here so slack can show errors against the form, then handled by a worker as slack
+    expects an answer within 3 seconds.
+    """
+    match interaction.payload["type"]:
+        case "view_submission":
+            view = interaction.payload["view"]
+            metadata = json.loads(view["private_metadata"])
+
+            definition = form_definitions.get(metadata["form_id"], session=session)
+            if not definition:
+                logger.error("Unable to find form for slack view", form_id=metadata["form_id"])
+                return Response(status_code=status.HTTP_200_OK)
+
+            errors = validate_submission(definition=definition, interaction=interaction)
+            if errors:
+                return {"response_action": "errors", "errors": errors}
+
+            if claim_view_submission(view["id"]):
+                events.queue_job(HandleSlackInteractionTaskParameters(interaction=interaction))
+            else:
+                logger.info("Ignoring duplicate slack view submission", view_id=view["id"])
+
+            return {"response_action": "clear"}
+        case _:
+            logger.warning("Unhandled slack interaction", type=interaction.payload["type"])
 
     return Response(status_code=status.HTTP_200_OK)
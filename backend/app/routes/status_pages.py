@@ -1,13 +1,15 @@
-import collections
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 from typing import Annotated
 
 import structlog
-from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import NoResultFound
 
-from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession
+from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession, ReadOnlyDatabaseSession
 from app.env import settings
-from app.exceptions import NotPermittedError, ValidationError
+from app.exceptions import NotPermittedError, TooManyConnectionsError, ValidationError
+from app.models import ComponentStatus, StatusPage
 from app.repos import StatusPageRepo
 from app.schemas.actions import (
     CreateStatusPageComponentSchema,
@@ -30,8 +32,13 @@ from app.schemas.models import (
     StatusPageSchema,
     StatusPageWithEventsSchema,
 )
-from app.schemas.resources import PaginatedResults
+from app.schemas.resources import PaginatedResults, StatusPageCurrentStatusSchema, StatusPageUptimeSchema
 from app.services.custom_domain import CustomDomainService
+from app.services.live_stream import broadcaster
+from app.services.status_page_hosts import status_page_hosts
+from app.services.status_page_status import create_etag, current_statuses, etag_matches, get_status_version
+from app.services.uptime import calculate_long_range_uptimes, calculate_uptime_report
+from app.utils import status_page_channel
 
 logger = structlog.get_logger(logger_name=__name__)
 
@@ -48,6 +55,7 @@ async def status_pages_search(user: CurrentUser, db: DatabaseSession, organisati
     """Get all status pages for this organisation"""
     status_page_repo = StatusPageRepo(session=db)
     status_pages = status_page_repo.search(organisation=organisation)
+    status_page_repo.load_item_trees(status_pages)
 
     return PaginatedResults(items=status_pages, total=len(status_pages), page=1, size=len(status_pages))
 
@@ -63,6 +71,7 @@ async def status_pages_create(
     status_page = status_page_repo.create(organisation=organisation, create_in=create_in)
 
     db.commit()
+    status_page_repo.load_item_trees([status_page])
 
     return status_page
 
@@ -74,19 +83,13 @@ async def status_pages_create(
     response_model_exclude_none=True,
 )
 async def get_status_page_status(
-    db: DatabaseSession,
+    db: ReadOnlyDatabaseSession,
     domain: str = Query(help="Domain of the status page"),
 ):
     """Public status page"""
     status_page_repo = StatusPageRepo(session=db)
-
-    # if it's on our subdomain, we can get it by slug
-    if domain.endswith(settings.STATUS_PAGE_DOMAIN):
-        slug = domain.split(".")[0]
-        status_page = status_page_repo.get_by_slug_or_raise(slug=slug)
-    # otherwise, we assume it's a custom domain
-    else:
-        status_page = status_page_repo.get_by_domain_or_slug_or_raise(domain=domain)
+    status_page = _get_public_status_page(status_page_repo=status_page_repo, domain=domain)
+    status_page_repo.load_item_trees([status_page])
 
     # Get events for the last 90 days
     start_date = datetime.now(tz=timezone.utc) - timedelta(days=90)
@@ -95,24 +98,14 @@ async def get_status_page_status(
     # Get all events for this status page
     events = status_page_repo.get_status_page_events(status_page=status_page, start_date=start_date, end_date=end_date)
 
-    # Calculate downtime for each component
-    downtime_by_component: dict[str, float] = collections.defaultdict(float)
-
-    # add default uptime for all components
-    for component in status_page.status_page_components:
-        downtime_by_component[component.id] = 0
-
-    for event in events:
-        event_downtime = (
-            event.ended_at - event.started_at if event.ended_at else datetime.now(tz=timezone.utc) - event.started_at
-        )
-        downtime_by_component[event.status_page_component_id] += event_downtime.total_seconds()
-
-    # Calculate uptime for each component as a percentage
-    uptime_by_component: dict[str, float] = {}
-    for component_id, downtime in downtime_by_component.items():
-        uptime = 1 - downtime / (end_date - start_date).total_seconds()
-        uptime_by_component[component_id] = uptime
+    uptime_report = calculate_uptime_report(
+        component_ids=[component.id for component in status_page.status_page_components],
+        events=[(event.status_page_component_id, event.status, event.started_at, event.ended_at) for event in events],
+        start=start_date,
+        end=end_date,
+        # the page draws its daily bars from the events, in the viewer's timezone
+        by_day=False,
+    )
 
     # get active incidents for the status page
     params = PaginationParamsSchema(page=1, size=100)
@@ -121,15 +114,123 @@ async def get_status_page_status(
     response = StatusPageWithEventsSchema(
         status_page=StatusPageSchema.model_validate(status_page),
         events=[StatusPageComponentEventSchema.model_validate(event) for event in events],
-        uptimes=uptime_by_component,
+        uptimes=uptime_report.uptimes,
         incidents=[StatusPageIncidentSchema.model_validate(incident) for incident in active_incidents],
     )
 
     return response
 
 
+@router.get("/public-uptime", response_model=StatusPageUptimeSchema)
+async def get_status_page_uptime(
+    db: ReadOnlyDatabaseSession,
+    domain: str = Query(help="Domain of the status page"),
+    days: int = Query(365, ge=1, le=3650, help="Number of days, including today"),
+):
+    """Uptime of each component over a long period, days past the event retention horizon come from daily summaries"""
+    status_page_repo = StatusPageRepo(session=db)
+    status_page = _get_public_status_page(status_page_repo=status_page_repo, domain=domain)
+    status_page_repo.load_item_trees([status_page])
+    component_ids = [component.id for component in status_page.status_page_components]
+
+    end = datetime.now(tz=timezone.utc)
+    start = datetime.combine(end.date() - timedelta(days=days - 1), time.min, tzinfo=timezone.utc)
+    # days before the retention horizon have been summarised, archiving runs daily so a day's margin covers events
+    # which ended since it last ran
+    horizon = end - timedelta(days=settings.STATUS_PAGE_EVENT_RETENTION_DAYS + 1)
+    summarised_until = max(start, datetime.combine(horizon.date(), time.min, tzinfo=timezone.utc))
+
+    summaries = status_page_repo.get_component_daily_summaries(
+        status_page=status_page, start_day=start.date(), end_day=summarised_until.date()
+    )
+    uptimes = calculate_long_range_uptimes(
+        component_ids=component_ids,
+        summaries=[
+            (
+                summary.status_page_component_id,
+                {
+                    ComponentStatus.DEGRADED_PERFORMANCE: summary.degraded_performance_seconds,
+                    ComponentStatus.PARTIAL_OUTAGE: summary.partial_outage_seconds,
+                    ComponentStatus.FULL_OUTAGE: summary.full_outage_seconds,
+                },
+            )
+            for summary in summaries
+        ],
+        events=status_page_repo.get_component_event_intervals(
+            component_ids=component_ids, start=summarised_until, end=end
+        ),
+        start=start,
+        summarised_until=summarised_until,
+        end=end,
+    )
+
+    return StatusPageUptimeSchema(start=start, end=end, uptimes=uptimes)
+
+
+@router.get("/public-current-status", response_model=StatusPageCurrentStatusSchema)
+async def get_status_page_current_status(
+    db: DatabaseSession,
+    domain: str = Query(help="Domain of the status page"),
+    if_none_match: str | None = Header(None, alias="if-none-match"),
+):
+    """Current status of a public status page and its components, without any history"""
+    # the page is only loaded when its status isn't cached, pollers which are up to date never query. It's read from
+    # the primary, as a replica which hasn't caught up would cache the old status under the new version
+    status_page_id = _get_public_status_page_id(domain=domain)
+
+    version = get_status_version(status_page_id)
+    if version is None:
+        content = current_statuses.get(session=db, status_page_id=status_page_id, version=None)
+        return Response(content=content, media_type="application/json", headers={"Cache-Control": "no-cache"})
+
+    etag = create_etag(status_page_id=status_page_id, version=version)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.STATUS_PAGE_STATUS_MAX_AGE_SECONDS}"}
+    if etag_matches(etag=etag, if_none_match=if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    content = current_statuses.get(session=db, status_page_id=status_page_id, version=version)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@router.get("/public-stream")
+async def get_status_page_stream(
+    db: DatabaseSession,
+    domain: str = Query(help="Domain of the status page"),
+    last_event_id: str | None = Header(None, alias="last-event-id"),
+):
+    """Live changes to a public status page as server-sent events"""
+    status_page_repo = StatusPageRepo(session=db)
+    status_page = _get_public_status_page(status_page_repo=status_page_repo, domain=domain)
+
+    channel = status_page_channel(status_page.id)
+    if broadcaster.is_full(channel):
+        raise TooManyConnectionsError()
+
+    # nothing else is read from the database, so don't hold on to a connection while streaming
+    db.close()
+
+    return StreamingResponse(
+        broadcaster.stream(channel=channel, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _get_public_status_page_id(domain: str) -> str:
+    status_page_id = status_page_hosts.get_status_page_id(host=domain)
+    if not status_page_id:
+        raise NoResultFound("No status page for domain")
+
+    return status_page_id
+
+
+def _get_public_status_page(status_page_repo: StatusPageRepo, domain: str) -> StatusPage:
+    status_page_id = _get_public_status_page_id(domain=domain)
+    return status_page_repo.get_by_id_or_raise(id=status_page_id)
+
+
 @router.get("/public-incident/{incident_id}", response_model=StatusPageIncidentSchema)
-async def get_public_incident(incident_id: str, db: DatabaseSession):
+async def get_public_incident(incident_id: str, db: ReadOnlyDatabaseSession):
     """Get public incident"""
     status_page_repo = StatusPageRepo(session=db)
     incident = status_page_repo.get_incident_or_raise(id=incident_id)
@@ -151,6 +252,8 @@ async def get_status_page(status_page_id: str, user: CurrentUser, db: DatabaseSe
     if not user.belongs_to(status_page.organisation):
         raise NotPermittedError()
 
+    status_page_repo.load_item_trees([status_page])
+
     return status_page
 
 
@@ -168,6 +271,7 @@ async def patch_status_page(
     status_page_repo.patch_status_page(status_page=status_page, patch_in=patch_in)
 
     db.commit()
+    status_page_repo.load_item_trees([status_page])
 
     return status_page
 
@@ -233,6 +337,7 @@ async def status_page_patch_item_rank(
     status_page_repo.update_items_rank(status_page=status_page, update_in=update_in)
 
     db.commit()
+    status_page_repo.load_item_trees([status_page])
 
     return status_page
 
@@ -381,6 +486,7 @@ async def update_status_page_domain(
     custom_domain_service.handle_patch_status_page(status_page=status_page, patch_in=update_in)
 
     db.commit()
+    status_page_repo.load_item_trees([status_page])
 
     return status_page
 
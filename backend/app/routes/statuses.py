@@ -1,7 +1,7 @@
 import structlog
 from fastapi import APIRouter
 
-from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession
+from app.deps import ReadOnlyCurrentOrganisation, ReadOnlyCurrentUser, ReadOnlyDatabaseSession
 from app.repos import IncidentRepo
 from app.schemas.models import IncidentStatusSchema
 from app.schemas.resources import PaginatedResults
@@ -12,7 +12,9 @@ router = APIRouter(tags=["Incident statuses"])
 
 
 @router.get("/search", response_model=PaginatedResults[IncidentStatusSchema])
-async def status_search(user: CurrentUser, db: DatabaseSession, organisation: CurrentOrganisation):
+async def status_search(
+    user: ReadOnlyCurrentUser, db: ReadOnlyDatabaseSession, organisation: ReadOnlyCurrentOrganisation
+):
     """Search for all statues within the organisation"""
     incident_repo = IncidentRepo(session=db)
 
@@ -3,7 +3,14 @@ from datetime import datetime, timezone
 import structlog
 from fastapi import APIRouter, status
 
-from app.deps import CurrentOrganisation, CurrentUser, DatabaseSession
+from app.deps import (
+    CurrentOrganisation,
+    CurrentUser,
+    DatabaseSession,
+    ReadOnlyCurrentOrganisation,
+    ReadOnlyCurrentUser,
+    ReadOnlyDatabaseSession,
+)
 from app.exceptions import ApplicationException, NotPermittedError
 from app.repos import TimestampRepo
 from app.schemas.actions import CreateTimestampSchema, PatchTimestampSchema
@@ -15,7 +22,9 @@ router = APIRouter(tags=["Timestamps"])
 
 
 @router.get("/search", response_model=PaginatedResults[TimestampSchema])
-async def timestamp_search(user: CurrentUser, organisation: CurrentOrganisation, db: DatabaseSession):
+async def timestamp_search(
+    user: ReadOnlyCurrentUser, organisation: ReadOnlyCurrentOrganisation, db: ReadOnlyDatabaseSession
+):
     """ "Search through organisation's timestamps"""
     timestamp_repo = TimestampRepo(session=db)
 
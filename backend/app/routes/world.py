@@ -1,10 +1,7 @@
 import structlog
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter
 
-from app.auth import get_current_user
-from app.db import get_db
-from app.models import User
+from app.deps import ReadOnlyCurrentUser, ReadOnlyDatabaseSession
 from app.repos import FormRepo, IncidentRepo
 from app.schemas.resources import WorldSchema
 
@@ -13,7 +10,7 @@ logger = structlog.get_logger(logger_name=__name__)
 
 
 @router.get("", response_model=WorldSchema)
-def world_index(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def world_index(db: ReadOnlyDatabaseSession, user: ReadOnlyCurrentUser):
     """Get world"""
     incident_repo = IncidentRepo(session=db)
     form_repo = FormRepo(session=db)
@@ -3,7 +3,6 @@ from datetime import datetime
 from typing import Annotated, Any
 
 import pytz
-from fastapi import Query
 from pydantic import ConfigDict, EmailStr, HttpUrl, RootModel, StringConstraints, field_validator, model_validator
 
 from app.models import (
@@ -45,30 +44,11 @@ class PaginationParamsSchema(BaseSchema):
     page: int = 1
     size: int = 25
 
-    @classmethod
-    def as_query(cls, page: int = Query(1), size: int = Query(25)):
-        return PaginationParamsSchema(page=page, size=size)
-
 
 class IncidentSearchSchema(PaginationParamsSchema):
     q: str | None = None
     status_category: list[IncidentStatusCategoryEnum] | None = None
 
-    @classmethod
-    def as_query(
-        cls,
-        page: int = Query(1),
-        size: int = Query(25),
-        q: str | None = Query(None),
-        status_category: Annotated[list[IncidentStatusCategoryEnum] | None, Query(alias="statusCategory")] = None,
-    ) -> "IncidentSearchSchema":
-        return IncidentSearchSchema(
-            page=page,
-            size=size,
-            q=q,
-            status_category=status_category,
-        )
-
 
 class PatchIncidentSchema(BaseSchema):
     """Use by API route to patch incident"""
@@ -344,5 +324,32 @@ class CreateInviteSchema(BaseSchema):
     role: MemberRole = MemberRole.MEMBER
 
 
+class ImportIncidentUpdateSchema(BaseSchema):
+    """An historical incident update, statuses and severities are referenced by name"""
+
+    created_at: datetime
+    summary: str | None = None
+    status: str | None = None
+    severity: str | None = None
+    creator_email: str | None = None
+
+
+class ImportIncidentSchema(BaseSchema):
+    """A single historical incident read from an import file"""
+
+    name: str
+    description: str | None = None
+    severity: str
+    type: str | None = None
+    status: str
+    creator_email: str | None = None
+    created_at: datetime
+    slack_channel_id: str | None = None
+    slack_channel_name: str | None = None
+    fields: dict[str, str | list[str]] = {}
+    timestamps: dict[str, datetime] = {}
+    updates: list[ImportIncidentUpdateSchema] = []
+
+
 CreateStatusPageGroupSchema.model_rebuild()
 UpdateStatusPageItemsRankSchema.model_rebuild()
@@ -18,7 +18,8 @@ def validate_domain_name(value: str):
     if not re.match(domain_regex, value):
         raise ValueError("Invalid domain name format.")
 
-    return value
+    # hosts are case insensitive, they're stored lower case so they can be looked up the same way
+    return value.lower()
 
 
 DomainNameValidator = Annotated[str, AfterValidator(validate_domain_name)]
@@ -102,8 +102,8 @@ class IncidentSchema(ModelSchema):
     name: str
     description: str | None
     reference: str
-    slack_channel_id: str
-    slack_channel_name: str
+    slack_channel_id: str | None
+    slack_channel_name: str | None
     creator: PublicUserSchema
     incident_type: IncidentTypeSchema
     incident_status: IncidentStatusSchema
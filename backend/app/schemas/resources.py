@@ -3,7 +3,7 @@ from typing import Any, Generic, Sequence, TypeVar
 
 from pydantic import ConfigDict
 
-from app.models import ComponentStatus, Organisation, User
+from app.models import ComponentStatus, Organisation, StatusPageIncidentStatus, User
 from app.schemas.base import BaseSchema
 from app.schemas.models import FormSchema, IncidentRoleSchema, OrganisationSchema, StatusPageComponentSchema, UserSchema
 
@@ -62,3 +62,23 @@ class ComponentStatusSchema(BaseSchema):
 
 class ComponentsCurrentStatusSchema(BaseSchema):
     components: list[ComponentStatusSchema]
+
+
+class ActiveIncidentSummarySchema(BaseSchema):
+    id: str
+    name: str
+    status: StatusPageIncidentStatus
+
+
+class StatusPageUptimeSchema(BaseSchema):
+    start: datetime
+    end: datetime
+    # by component id
+    uptimes: dict[str, float]
+
+
+class StatusPageCurrentStatusSchema(BaseSchema):
+    status: ComponentStatus
+    # only components which aren't operational, any others are
+    components: dict[str, ComponentStatus]
+    incidents: list[ActiveIncidentSummarySchema]
@@ -31,9 +31,11 @@ class MemberJoinedChannelEventType(BaseEventTypeSchema):
     event_ts: str
 
 
-def get_discriminator_value(v: dict[str, Any]) -> str:
+def get_discriminator_value(v: dict[str, Any] | BaseEventTypeSchema) -> str:
+    # a dict when validating, a model when serializing
+    event_type = v.get("type") if isinstance(v, dict) else getattr(v, "type", None)
     try:
-        event_type_enum = EventTypes(v.get("type"))
+        event_type_enum = EventTypes(event_type)
         return event_type_enum
     except ValueError:
         return "fallback"
@@ -1,8 +1,6 @@
 from pydantic import BaseModel
 
-from app.schemas.slack import (
-    SlackCommandDataSchema,
-)
+from app.schemas.slack import SlackCommandDataSchema, SlackEventCallbackSchema, SlackInteractionSchema
 
 
 class CreateAnnouncementTaskParameters(BaseModel):
@@ -13,6 +11,14 @@ class HandleSlashCommandTaskParameters(BaseModel):
     command: SlackCommandDataSchema
 
 
+class HandleSlackEventTaskParameters(BaseModel):
+    event: SlackEventCallbackSchema
+
+
+class HandleSlackInteractionTaskParameters(BaseModel):
+    interaction: SlackInteractionSchema
+
+
 class CreateIncidentUpdateParameters(BaseModel):
     incident_id: str
     incident_update_id: str
@@ -69,4 +75,19 @@ class SendInviteTaskParameters(BaseModel):
     invite_id: str
 
 
-class VerifyCustomDomainParameters(BaseModel): ...
+class VerifyCustomDomainParameters(BaseModel):
+    # most domains checked in one run, any others are checked in the next
+    batch_size: int = 500
+
+
+class SyncSlackUsersParameters(BaseModel):
+    # every organisation with slack installed when not given
+    organisation_id: str | None = None
+
+
+class ArchiveComponentEventsParameters(BaseModel):
+    batch_size: int = 1000
+
+
+class FlushEmailsParameters(BaseModel):
+    batch_size: int = 1000
@@ -1,13 +1,20 @@
+import asyncio
+from datetime import datetime, timedelta
 from enum import Enum
+from typing import Sequence
 
-from httpx import HTTPStatusError, codes
+import structlog
+from httpx import HTTPError, HTTPStatusError, codes
 from pydantic import BaseModel
 
 from app.env import settings
 from app.exceptions import ValidationError
 from app.models import StatusPage
 from app.schemas.actions import UpdateStatusPageCustomDomain
-from app.services.vercel.client import VercelClient
+from app.services.vercel.client import AsyncVercelClient, VercelClient
+from app.services.vercel.models import DomainConfig
+
+logger = structlog.get_logger(logger_name=__name__)
 
 
 class ErrorCodes(str, Enum):
@@ -19,19 +26,66 @@ class AddDomainResult(BaseModel):
     error_code: ErrorCodes | None = None
 
 
+_client: VercelClient | None = None
+
+
+def _get_client() -> VercelClient:
+    """One client per process, so connections to the API are reused"""
+    global _client
+    if _client is None:
+        _client = VercelClient(token=settings.VERCEL_TOKEN)
+    return _client
+
+
+def is_domain_configured(config: DomainConfig) -> bool:
+    return not config.misconfigured or bool(config.configured_by)
+
+
+def get_next_check_at(attempts: int, now: datetime) -> datetime:
+    """Domains are usually configured soon after they're added, the longer one isn't the less often it's checked"""
+    delay = min(settings.CUSTOM_DOMAIN_CHECK_MIN_SECONDS * 2**attempts, settings.CUSTOM_DOMAIN_CHECK_MAX_SECONDS)
+    return now + timedelta(seconds=delay)
+
+
 class CustomDomainService:
-    def __init__(self):
-        self.client = VercelClient(token=settings.VERCEL_TOKEN)
+    def __init__(self, client: VercelClient | None = None):
+        self.client = client or _get_client()
 
     def check_domain_is_configured(self, domain: str):
-        response = self.client.get_domain_config(domain)
-        if not response.misconfigured:
-            return True
+        return is_domain_configured(self.client.get_domain_config(domain))
+
+    async def check_domains_are_configured(
+        self, client: AsyncVercelClient, domains: Sequence[str], concurrency: int
+    ) -> dict[str, bool | None]:
+        """Check many domains at once, None for those which couldn't be checked"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def check(domain: str) -> bool | None:
+            async with semaphore:
+                try:
+                    return is_domain_configured(await client.get_domain_config(domain))
+                except HTTPError as e:
+                    logger.warning("Could not check custom domain", domain=domain, error=str(e))
+                    return None
+
+        results = await asyncio.gather(*(check(domain) for domain in domains))
+        return dict(zip(domains, results))
+
+    def record_check(self, status_page: StatusPage, is_configured: bool | None, now: datetime) -> None:
+        """Mark the domain as verified, or schedule its next check"""
+        if is_configured:
+            status_page.is_custom_domain_verified = True
+            status_page.custom_domain_next_check_at = None
+            return
 
-        if response.configured_by:
-            return True
+        if is_configured is None:
+            # the check itself failed, which says nothing about the domain, so it's tried again at the same delay
+            attempts = max(status_page.custom_domain_check_attempts - 1, 0)
+            status_page.custom_domain_next_check_at = get_next_check_at(attempts, now=now)
+            return
 
-        return False
+        status_page.custom_domain_next_check_at = get_next_check_at(status_page.custom_domain_check_attempts, now=now)
+        status_page.custom_domain_check_attempts += 1
 
     def handle_patch_status_page(self, status_page: StatusPage, patch_in: UpdateStatusPageCustomDomain):
         """Handle the custom domain update for a status page"""
@@ -56,6 +110,10 @@ class CustomDomainService:
         result = self.add_domain(domain)
         if result.is_success:
             status_page.custom_domain = domain
+            # a new domain needs verifying, and is checked straight away
+            status_page.is_custom_domain_verified = False
+            status_page.custom_domain_check_attempts = 0
+            status_page.custom_domain_next_check_at = None
         else:
             if result.error_code == ErrorCodes.DOMAIN_ALREADY_ADDED:
                 raise ValidationError("Domain is already added to another project")
@@ -1,36 +1,218 @@
+"""Sending templated emails
+
+Emails are queued in an outbox in redis and sent in batches by the flush_emails task, so many emails queued at
+once, such as invites to a whole team, share a few API calls. The transport which delivers them is chosen with
+EMAIL_TRANSPORT, sendgrid in production or a local file or SMTP sink for development and throughput tests.
+"""
+
+import itertools
+import json
+import smtplib
+import time
 from abc import abstractmethod
+from email.message import EmailMessage as MIMEMessage
+from pathlib import Path
+from typing import Sequence
 
 import httpx
 import structlog
+from kombu.exceptions import OperationalError
+from pydantic import BaseModel, ValidationError
+from redis import Redis, RedisError
 
 from app.env import settings
+from app.metrics import InstrumentedTransport
 
 logger = structlog.get_logger(logger_name=__name__)
 
+OUTBOX_KEY = "email-outbox"
+FLUSH_SCHEDULED_KEY = "email-outbox-flush-scheduled"
+# emails taken from the outbox which haven't been sent yet
+PROCESSING_KEY = "email-outbox-processing"
+FLUSH_LOCK_KEY = "lock:flush-emails"
+# held for at most this long, in case a worker dies without releasing it
+FLUSH_LOCK_TIMEOUT_SECONDS = 600
+
+# most personalizations sendgrid accepts in one request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+RETRY_STATUS_CODES = {429, *range(500, 600)}
+
+
+class EmailMessage(BaseModel):
+    to_address: str
+    template_id: str
+    template_vars: dict
+    from_address: str | None = None
+    from_name: str | None = None
+    # flushes which have failed to send it
+    flush_attempts: int = 0
 
-class EmailerBase:
+
+class EmailTransportBase:
     @abstractmethod
-    def send(
-        self,
-        to_address: str,
-        template_id: str,
-        template_vars: dict,
-        from_address: str | None = None,
-        from_name: str | None = None,
-    ):
+    def send_batch(self, messages: Sequence[EmailMessage]) -> list[EmailMessage]:
+        """Send the messages, returning those which failed for now and should be tried again later"""
         raise NotImplementedError()
 
 
-class SendgridEmailer(EmailerBase):
-    """Simple sendgrid emailer"""
+class SendgridTransport(EmailTransportBase):
+    """Messages using the same template and sender are sent together, one personalization each"""
+
+    def __init__(self, client: httpx.Client | None = None):
+        self.client = client or _get_sendgrid_client()
+
+    def send_batch(self, messages: Sequence[EmailMessage]) -> list[EmailMessage]:
+        def sender(message: EmailMessage) -> tuple[str, str, str]:
+            return (
+                message.template_id,
+                message.from_address or settings.SUPPORT_EMAIL,
+                message.from_name or settings.SUPPORT_EMAIL_NAME,
+            )
+
+        failed: list[EmailMessage] = []
+        for (template_id, from_address, from_name), group in itertools.groupby(
+            sorted(messages, key=sender), key=sender
+        ):
+            group_messages = list(group)
+            for idx in range(0, len(group_messages), SENDGRID_MAX_PERSONALIZATIONS):
+                chunk = group_messages[idx : idx + SENDGRID_MAX_PERSONALIZATIONS]
+                status_code = self._post(chunk, template_id=template_id, from_address=from_address, from_name=from_name)
+                if status_code == httpx.codes.BAD_REQUEST and len(chunk) > 1:
+                    # one bad address rejects the whole request, sent alone only that email is lost
+                    logger.warning("Sendgrid rejected emails, sending them one at a time", total=len(chunk))
+                    for message in chunk:
+                        status_code = self._post(
+                            [message], template_id=template_id, from_address=from_address, from_name=from_name
+                        )
+                        if status_code is None or status_code in RETRY_STATUS_CODES:
+                            failed.append(message)
+                elif status_code is None or status_code in RETRY_STATUS_CODES:
+                    failed.extend(chunk)
+
+        return failed
+
+    def _post(self, messages: list[EmailMessage], template_id: str, from_address: str, from_name: str) -> int | None:
+        """Retry rate limited and failed requests with backoff, returns the last status code, None if never sent"""
+        to_addresses = [it.to_address for it in messages]
+        payload = {
+            "from": {"email": from_address, "name": from_name},
+            "personalizations": [
+                {"to": [{"email": it.to_address}], "dynamic_template_data": it.template_vars} for it in messages
+            ],
+            "template_id": template_id,
+        }
+
+        status_code: int | None = None
+        for attempt in range(settings.EMAIL_SEND_ATTEMPTS):
+            delay = min(2**attempt, settings.EMAIL_RETRY_MAX_SECONDS)
+            try:
+                response = self.client.post("/v3/mail/send", json=payload)
+            except httpx.TransportError as e:
+                logger.warning("Could not connect to sendgrid", error=str(e), attempt=attempt)
+            else:
+                status_code = response.status_code
+                if response.is_success:
+                    logger.info("Emails sent", total=len(to_addresses), template_id=template_id)
+                    return status_code
+                if status_code not in RETRY_STATUS_CODES:
+                    # a batch rejected as a bad request is sent again one email at a time
+                    if len(messages) == 1 or status_code != httpx.codes.BAD_REQUEST:
+                        logger.error("Sendgrid rejected emails", to_addresses=to_addresses, err=response.content)
+                    return status_code
+
+                logger.warning("Sendgrid request failed", status_code=status_code, attempt=attempt)
+                retry_after = response.headers.get("retry-after")
+                if retry_after and retry_after.isdigit():
+                    delay = min(int(retry_after), settings.EMAIL_RETRY_MAX_SECONDS)
+
+            if attempt < settings.EMAIL_SEND_ATTEMPTS - 1:
+                time.sleep(delay)
+
+        logger.error(
+            "Could not send emails, they'll be tried again", to_addresses=to_addresses, template_id=template_id
+        )
+        return status_code
+
+
+class FileTransport(EmailTransportBase):
+    """Append each message to a file as a line of JSON"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def send_batch(self, messages: Sequence[EmailMessage]) -> list[EmailMessage]:
+        with self.path.open("a") as f:
+            for message in messages:
+                f.write(message.model_dump_json() + "\n")
+
+        return []
 
-    def __init__(self):
-        self.client = httpx.Client()
-        self.client.headers.update(
-            {
-                "Authorization": f"Bearer {settings.SENDGRID_API_KEY}",
-            }
+
+class SMTPTransport(EmailTransportBase):
+    """Send each message to an SMTP server over one connection, templates are sendgrid's so the variables are sent"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    def send_batch(self, messages: Sequence[EmailMessage]) -> list[EmailMessage]:
+        with smtplib.SMTP(self.host, self.port) as smtp:
+            for message in messages:
+                mime_message = MIMEMessage()
+                mime_message["From"] = message.from_address or settings.SUPPORT_EMAIL
+                mime_message["To"] = message.to_address
+                mime_message["Subject"] = message.template_id
+                mime_message.set_content(json.dumps(message.template_vars, indent=2))
+                try:
+                    smtp.send_message(mime_message)
+                except smtplib.SMTPRecipientsRefused as e:
+                    logger.error("SMTP server rejected email", to_address=message.to_address, error=str(e))
+
+        return []
+
+
+_redis: Redis | None = None
+_sendgrid_client: httpx.Client | None = None
+
+
+def _get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    return _redis
+
+
+def _get_sendgrid_client() -> httpx.Client:
+    """One client per process, so connections to sendgrid are reused"""
+    global _sendgrid_client
+    if _sendgrid_client is None:
+        _sendgrid_client = httpx.Client(
+            base_url=settings.SENDGRID_API_URL,
+            headers={"Authorization": f"Bearer {settings.SENDGRID_API_KEY}"},
+            transport=InstrumentedTransport(service="sendgrid"),
         )
+    return _sendgrid_client
+
+
+def _requeue_processing(redis: Redis) -> None:
+    """Put emails which were being sent back at the front of the outbox, in the order they were queued"""
+    while redis.lmove(PROCESSING_KEY, OUTBOX_KEY, "RIGHT", "LEFT") is not None:
+        pass
+
+
+def create_transport() -> EmailTransportBase:
+    match settings.EMAIL_TRANSPORT:
+        case "file":
+            return FileTransport(path=settings.EMAIL_FILE_PATH)
+        case "smtp":
+            return SMTPTransport(host=settings.EMAIL_SMTP_HOST, port=settings.EMAIL_SMTP_PORT)
+        case _:
+            return SendgridTransport()
+
+
+class Emailer:
+    def __init__(self, transport: EmailTransportBase | None = None):
+        self.transport = transport or create_transport()
 
     def send(
         self,
@@ -39,30 +221,111 @@ class SendgridEmailer(EmailerBase):
         template_vars: dict,
         from_address: str | None = None,
         from_name: str | None = None,
-    ):
-        """Send email"""
-        url = "https://api.sendgrid.com/v3/mail/send"
-        payload = {
-            "from": {
-                "email": from_address if from_address else settings.SUPPORT_EMAIL,
-                "name": from_name if from_name else settings.SUPPORT_EMAIL_NAME,
-            },
-            "personalizations": [
-                {
-                    "to": [
-                        {
-                            "email": to_address,
-                        },
-                    ],
-                    "dynamic_template_data": template_vars,
-                }
-            ],
-            "template_id": template_id,
-        }
+    ) -> None:
+        """Queue an email, it's sent with any others queued around the same time"""
+        message = EmailMessage(
+            to_address=to_address,
+            template_id=template_id,
+            template_vars=template_vars,
+            from_address=from_address,
+            from_name=from_name,
+        )
+
+        try:
+            redis = _get_redis()
+            redis.rpush(OUTBOX_KEY, message.model_dump_json())
+            # the first email queued schedules the flush, those queued before it runs go with it
+            is_first = redis.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=settings.EMAIL_BATCH_DELAY_SECONDS * 10)
+        except RedisError as e:
+            logger.warning("Could not queue email, sending it now", error=str(e))
+            self.transport.send_batch([message])
+            return
+
+        if is_first:
+            # by name, the tasks module imports this one
+            from app.worker import celery
+
+            try:
+                celery.send_task("app.tasks.celerytasks.flush_emails", countdown=settings.EMAIL_BATCH_DELAY_SECONDS)
+            except OperationalError as e:
+                # the email is in the outbox, the scheduled flush will send it
+                logger.warning("Could not schedule sending emails", error=str(e))
+
+    def flush(self, batch_size: int) -> int:
+        """Send everything in the outbox, returns the number of emails sent
+
+        Emails are moved to a processing list while they're sent and only removed once they have been, so they're put
+        back in the outbox if sending fails or the worker dies part way through.
+        """
+        redis = _get_redis()
+        # emails queued from now on schedule another flush
+        redis.delete(FLUSH_SCHEDULED_KEY)
+
+        lock = redis.lock(FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT_SECONDS, blocking=False)
+        if not lock.acquire():
+            logger.info("Emails are already being flushed")
+            return 0
+
+        try:
+            # left by a flush which didn't finish
+            _requeue_processing(redis)
+            return self._flush(redis, batch_size=batch_size)
+        finally:
+            try:
+                lock.release()
+            except RedisError as e:
+                logger.warning("Could not unlock email flush", error=str(e))
+
+    def _flush(self, redis: Redis, batch_size: int) -> int:
+        total = 0
+        while True:
+            pipeline = redis.pipeline(transaction=False)
+            for _ in range(batch_size):
+                pipeline.lmove(OUTBOX_KEY, PROCESSING_KEY, "LEFT", "RIGHT")
+            items = [it for it in pipeline.execute() if it is not None]
+            if not items:
+                return total
+
+            messages: list[EmailMessage] = []
+            for item in items:
+                try:
+                    messages.append(EmailMessage.model_validate_json(item))
+                except ValidationError as e:
+                    # can never be sent, so it isn't put back
+                    logger.error("Dropping invalid queued email", error=str(e))
+
+            try:
+                failed = self.transport.send_batch(messages)
+            except Exception:
+                _requeue_processing(redis)
+                raise
+
+            # transports group messages as they send them, so failures are put back in the order they were queued
+            failed_ids = {id(it) for it in failed}
+            retry: list[EmailMessage] = []
+            for message in messages:
+                if id(message) not in failed_ids:
+                    continue
+                message.flush_attempts += 1
+                if message.flush_attempts >= settings.EMAIL_MAX_FLUSH_ATTEMPTS:
+                    logger.error(
+                        "Dropping email which could not be sent",
+                        to_address=message.to_address,
+                        template_id=message.template_id,
+                        flush_attempts=message.flush_attempts,
+                    )
+                else:
+                    retry.append(message)
 
-        response = self.client.post(url, json=payload)
-        if not response.is_success:
-            logger.error("There was a problem sending email", err=response.content)
-            return None
+            pipeline = redis.pipeline(transaction=True)
+            pipeline.delete(PROCESSING_KEY)
+            if retry:
+                # pushed to the front one at a time, so the last is pushed first
+                pipeline.lpush(OUTBOX_KEY, *[it.model_dump_json() for it in reversed(retry)])
+            pipeline.execute()
 
-        logger.info("Email sent", to_address=to_address, template_id=template_id)
+            total += len(messages) - len(failed)
+            if failed:
+                # the rest wait for the next flush, rather than retrying straight away
+                logger.warning("Emails will be tried again", total=len(retry), dropped=len(failed) - len(retry))
+                return total
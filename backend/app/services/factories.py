@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
 
-from app.models import Organisation
+from app.models import Organisation, User
 from app.repos import (
     AnnouncementRepo,
+    BulkRepo,
     FieldRepo,
     FormRepo,
     IncidentRepo,
@@ -15,6 +16,7 @@ from app.repos import (
 )
 from app.services.events import Events
 from app.services.incident import IncidentService
+from app.services.incident_import import IncidentImportService
 from app.services.onboarding import OnboardingService
 from app.services.slack.user import SlackUserService
 
@@ -30,12 +32,14 @@ def create_incident_service(
         events = Events()
 
     announcement_repo = AnnouncementRepo(session=session)
+    timestamp_repo = TimestampRepo(session=session)
     incident_service = IncidentService(
         organisation=organisation,
         incident_repo=incident_repo,
         announcement_repo=announcement_repo,
         events=events,
         form_repo=form_repo,
+        timestamp_repo=timestamp_repo,
     )
 
     return incident_service
@@ -74,3 +78,20 @@ def create_onboarding_service(session: Session) -> OnboardingService:
     )
 
     return onboarding_service
+
+
+def create_incident_import_service(
+    session: Session, organisation: Organisation, default_creator: User
+) -> IncidentImportService:
+    incident_import_service = IncidentImportService(
+        organisation=organisation,
+        default_creator=default_creator,
+        incident_repo=IncidentRepo(session=session),
+        severity_repo=SeverityRepo(session=session),
+        field_repo=FieldRepo(session=session),
+        timestamp_repo=TimestampRepo(session=session),
+        user_repo=UserRepo(session=session),
+        bulk_repo=BulkRepo(session=session),
+    )
+
+    return incident_import_service
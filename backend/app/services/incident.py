@@ -16,16 +16,19 @@ from app.models import (
     Organisation,
     User,
 )
-from app.repos import AnnouncementRepo, FormRepo, IncidentRepo
+from app.repos import AnnouncementRepo, FormRepo, IncidentRepo, TimestampRepo
 from app.schemas.actions import (
     CreateIncidentSchema,
     CreateIncidentUpdateSchema,
     ExtendedPatchIncidentSchema,
     PatchIncidentFieldValuesSchema,
     PatchIncidentSchema,
+    PatchIncidentTimestampsSchema,
     SetIncidentFieldValueSchema,
 )
-from app.schemas.models import ModelIdSchema
+from app.schemas.base import BaseSchema
+from app.schemas.models import IncidentRoleAssignmentSchema, IncidentSchema, IncidentUpdateSchema, ModelIdSchema
+from app.schemas.special import CombinedFieldAndValueSchema
 from app.schemas.tasks import (
     CreateAnnouncementTaskParameters,
     CreateIncidentUpdateParameters,
@@ -39,6 +42,7 @@ from app.schemas.tasks import (
     SyncBookmarksTaskParameters,
 )
 from app.services.slack.client import SlackClientService
+from app.utils import incident_channel, queue_live_event
 
 logger = structlog.get_logger(logger_name=__name__)
 
@@ -53,10 +57,12 @@ class IncidentService:
         incident_repo: IncidentRepo,
         announcement_repo: AnnouncementRepo,
         form_repo: FormRepo,
+        timestamp_repo: TimestampRepo,
         events: "Events",
     ):
         self.organisation = organisation
         self.incident_repo = incident_repo
+        self.timestamp_repo = timestamp_repo
         self.announcement_repo = announcement_repo
         self.slack_service = SlackClientService(auth_token=organisation.slack_bot_token)  # type: ignore
         self.events = events
@@ -260,7 +266,7 @@ class IncidentService:
 
         # patch any custom fields that were set
         patch_incident_field_values_in = PatchIncidentFieldValuesSchema(root=custom_fields_patches)
-        self.incident_repo.patch_incident_custom_fields(incident=incident, patch_in=patch_incident_field_values_in)
+        self.patch_incident_custom_fields(incident=incident, patch_in=patch_incident_field_values_in)
 
         return incident_update
 
@@ -305,6 +311,9 @@ class IncidentService:
         )
         self.events.queue_job(SyncBookmarksTaskParameters(incident_id=incident.id))
 
+        self._queue_live_event(incident, "incident_update.created", incident_update, IncidentUpdateSchema)
+        self._queue_live_event(incident, "incident.updated", incident, IncidentSchema)
+
         return incident_update
 
     def patch_incident(self, user: User, incident: Incident, patch_in: PatchIncidentSchema):
@@ -327,6 +336,28 @@ class IncidentService:
 
         self.incident_repo.patch_incident(incident=incident, patch_in=patch_in)
 
+        self._queue_live_event(incident, "incident.updated", incident, IncidentSchema)
+
+    def patch_incident_custom_fields(self, incident: Incident, patch_in: PatchIncidentFieldValuesSchema):
+        """Set custom field values for an incident"""
+        if not patch_in.root:
+            return
+
+        self.incident_repo.patch_incident_custom_fields(incident=incident, patch_in=patch_in)
+
+        changed_field_ids = {item.field.id for item in patch_in.root}
+        for field, value in self.incident_repo.get_incident_fields_with_values(incident=incident):
+            if field.id in changed_field_ids:
+                self._queue_live_event(
+                    incident, "field_value.updated", {"field": field, "value": value}, CombinedFieldAndValueSchema
+                )
+
+    def patch_timestamps(self, incident: Incident, patch_in: PatchIncidentTimestampsSchema):
+        """Set or clear timestamp values for an incident"""
+        self.timestamp_repo.bulk_update_incident_timestamps(incident=incident, put_in=patch_in)
+
+        self._queue_live_event(incident, "incident.updated", incident, IncidentSchema)
+
     def assign_role(self, incident: Incident, user: User, role: IncidentRole):
         """Assign a role to a user"""
 
@@ -336,6 +367,10 @@ class IncidentService:
         if assign_result.type == "no_change":
             return
 
+        self._queue_live_event(
+            incident, "role_assignment.updated", assign_result.assignment, IncidentRoleAssignmentSchema
+        )
+
         public_message = f"<@{user.slack_user_id}> has been assigned as {role.name} for this incident"
 
         if incident.slack_channel_id:
@@ -355,3 +390,21 @@ class IncidentService:
                 incident_id=incident.id,
             )
         )
+
+    def remove_role_assignment(self, incident: Incident, role: IncidentRole):
+        """Remove the user assigned to a role"""
+        self.incident_repo.remove_role_assignment(incident=incident, role=role)
+
+        self._queue_live_event(incident, "role_assignment.removed", {"incidentRole": {"id": role.id}})
+
+    def _queue_live_event(
+        self, incident: Incident, type: str, data: typing.Any, schema: type[BaseSchema] | None = None
+    ) -> None:
+        """Let dashboards watching the incident know what changed, sent once the transaction commits"""
+        queue_live_event(
+            session=self.incident_repo.session,
+            channel=incident_channel(incident.id),
+            type=type,
+            data=data,
+            schema=schema,
+        )
@@ -0,0 +1,454 @@
+"""Bulk import of historical incidents from other tools"""
+
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterator
+
+import structlog
+from pydantic import ValidationError as PydanticValidationError
+
+from app.models import (
+    Field,
+    FieldKind,
+    Incident,
+    IncidentFieldValue,
+    IncidentRoleAssignment,
+    IncidentRoleKind,
+    IncidentUpdate,
+    InterfaceKind,
+    Organisation,
+    TimestampValue,
+    User,
+)
+from app.repos import BulkRepo, FieldRepo, IncidentRepo, SeverityRepo, TimestampRepo, UserRepo
+from app.schemas.actions import ImportIncidentSchema
+
+logger = structlog.get_logger(logger_name=__name__)
+
+# CSV columns which map onto custom fields and timestamps, e.g. "field:Affected team"
+FIELD_COLUMN_PREFIX = "field:"
+TIMESTAMP_COLUMN_PREFIX = "timestamp:"
+
+# separator used for multi select values in CSV files
+MULTI_SELECT_SEPARATOR = "|"
+
+
+class ImportRowError(Exception):
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+@dataclass
+class ImportResult:
+    incidents: int = 0
+    updates: int = 0
+    rows_committed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def incidents_per_second(self) -> float:
+        return self.incidents / self.elapsed if self.elapsed else 0.0
+
+
+class ImportCheckpoint:
+    """Records how many rows of an import file have been committed, so a failed import can be resumed"""
+
+    def __init__(self, path: str | None, source: str):
+        self.path = path
+        self.source = os.path.abspath(source)
+
+    def load(self) -> int:
+        if not self.path or not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, "r") as fp:
+            data = json.load(fp)
+
+        if data["source"] != self.source:
+            raise ValueError(f"Checkpoint {self.path} belongs to a different import file: {data['source']}")
+
+        return data["rows_committed"]
+
+    def save(self, rows_committed: int) -> None:
+        if not self.path:
+            return
+
+        # write then rename, so a crash never leaves a partially written checkpoint
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as fp:
+            json.dump({"source": self.source, "rows_committed": rows_committed}, fp)
+        os.replace(tmp_path, self.path)
+
+
+def read_import_rows(path: str) -> Iterator[dict[str, Any]]:
+    """Read raw rows from a CSV or NDJSON file"""
+    if path.endswith(".csv"):
+        with open(path, "r", newline="") as fp:
+            for row in csv.DictReader(fp):
+                yield _nest_csv_row(row)
+    else:
+        with open(path, "r") as fp:
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _nest_csv_row(row: dict[str, str]) -> dict[str, Any]:
+    """Convert flat CSV columns into the same shape as an NDJSON row"""
+    data: dict[str, Any] = {"fields": {}, "timestamps": {}}
+
+    for key, value in row.items():
+        if value is None or value == "":
+            continue
+        if key.startswith(FIELD_COLUMN_PREFIX):
+            data["fields"][key[len(FIELD_COLUMN_PREFIX) :]] = value
+        elif key.startswith(TIMESTAMP_COLUMN_PREFIX):
+            data["timestamps"][key[len(TIMESTAMP_COLUMN_PREFIX) :]] = value
+        else:
+            data[key] = value
+
+    return data
+
+
+class IncidentImportService:
+    """
+    Loads historical incidents directly with COPY. Slack channels are not created and no jobs are queued,
+    so imported incidents are only visible from the dashboard.
+    """
+
+    def __init__(
+        self,
+        organisation: Organisation,
+        default_creator: User,
+        incident_repo: IncidentRepo,
+        severity_repo: SeverityRepo,
+        field_repo: FieldRepo,
+        timestamp_repo: TimestampRepo,
+        user_repo: UserRepo,
+        bulk_repo: BulkRepo,
+    ):
+        self.organisation = organisation
+        self.default_creator = default_creator
+        self.incident_repo = incident_repo
+        self.severity_repo = severity_repo
+        self.field_repo = field_repo
+        self.timestamp_repo = timestamp_repo
+        self.user_repo = user_repo
+        self.bulk_repo = bulk_repo
+        self.session = incident_repo.session
+
+        self._load_config()
+
+    def _load_config(self) -> None:
+        """Resolve the organisation's configuration once, rows are then matched by name in memory"""
+        organisation = self.organisation
+
+        self.severities = {it.name.lower(): it.id for it in self.severity_repo.get_all(organisation)}
+        self.incident_statuses = {
+            it.name.lower(): it.id for it in self.incident_repo.get_all_incident_statuses(organisation)
+        }
+
+        incident_types = self.incident_repo.get_all_incident_types(organisation)
+        self.incident_types = {it.name.lower(): it.id for it in incident_types}
+        default_types = [it.id for it in incident_types if it.is_default]
+        self.default_incident_type_id = default_types[0] if default_types else None
+
+        self.fields = {
+            it.label.lower(): it
+            for it in self.field_repo.get_all_fields(organisation)
+            if it.kind == FieldKind.USER_DEFINED
+        }
+        self.timestamps = {
+            it.label.lower(): it.id for it in self.timestamp_repo.get_timestamps_for_organisation(organisation)
+        }
+        self.creators = {
+            member.user.email_address: member.user_id
+            for member in self.user_repo.get_all_organisation_members(organisation)
+        }
+
+        reporter_role = self.incident_repo.get_incident_role(organisation=organisation, kind=IncidentRoleKind.REPORTER)
+        if not reporter_role:
+            raise ValueError("Could not find role reporter")
+        self.reporter_role_id = reporter_role.id
+
+    def import_file(
+        self,
+        path: str,
+        checkpoint: ImportCheckpoint,
+        batch_size: int = 1000,
+        on_batch: Callable[[ImportResult], None] | None = None,
+    ) -> ImportResult:
+        """Import all rows in a file, committing and checkpointing after each batch"""
+        result = ImportResult(rows_committed=checkpoint.load())
+        started_at = time.perf_counter()
+        batch: list[tuple[int, dict[str, Any]]] = []
+
+        if result.rows_committed:
+            logger.info("Resuming import from checkpoint", rows_committed=result.rows_committed)
+
+        def flush() -> None:
+            try:
+                total_updates = self._import_batch(batch)
+                self.session.commit()
+            except Exception:
+                self.session.rollback()
+                raise
+
+            result.incidents += len(batch)
+            result.updates += total_updates
+            result.rows_committed = batch[-1][0]
+            result.elapsed = time.perf_counter() - started_at
+            checkpoint.save(result.rows_committed)
+            batch.clear()
+
+            if on_batch:
+                on_batch(result)
+
+        for line, row in enumerate(read_import_rows(path), start=1):
+            if line <= result.rows_committed:
+                continue
+
+            batch.append((line, row))
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+        result.elapsed = time.perf_counter() - started_at
+        return result
+
+    def _import_batch(self, batch: list[tuple[int, dict[str, Any]]]) -> int:
+        """Load a batch of rows, returns the number of incident updates created"""
+        rows = [(line, self._validate_row(line, row)) for line, row in batch]
+        reference_ids = self.incident_repo.reserve_reference_ids(organisation=self.organisation, total=len(rows))
+
+        incidents: list[tuple] = []
+        role_assignments: list[tuple] = []
+        updates: list[tuple] = []
+        field_values: list[tuple] = []
+        timestamp_values: list[tuple] = []
+
+        for (line, row), reference_id in zip(rows, reference_ids):
+            incident_id = self.bulk_repo.generate_id(Incident)
+            creator_id = self._resolve_creator(row.creator_email)
+            severity_id = self._resolve(self.severities, row.severity, "severity", line)
+            status_id = self._resolve(self.incident_statuses, row.status, "status", line)
+            type_id = self._resolve_incident_type(row.type, line)
+            updated_at = max([row.created_at] + [it.created_at for it in row.updates])
+
+            incidents.append(
+                (
+                    incident_id,
+                    self.organisation.id,
+                    type_id,
+                    status_id,
+                    creator_id,
+                    severity_id,
+                    row.name,
+                    self._generate_reference(reference_id),
+                    reference_id,
+                    row.description,
+                    row.slack_channel_id,
+                    row.slack_channel_name,
+                    row.created_at,
+                    updated_at,
+                )
+            )
+            role_assignments.append(
+                (
+                    self.bulk_repo.generate_id(IncidentRoleAssignment),
+                    creator_id,
+                    incident_id,
+                    self.reporter_role_id,
+                    row.created_at,
+                    row.created_at,
+                )
+            )
+
+            # previous status and severity are carried forward from the preceding update
+            previous_status_id: str | None = None
+            previous_severity_id: str | None = None
+            for update in sorted(row.updates, key=lambda it: it.created_at):
+                new_status_id = self._resolve(self.incident_statuses, update.status, "status", line)
+                new_severity_id = self._resolve(self.severities, update.severity, "severity", line)
+                updates.append(
+                    (
+                        self.bulk_repo.generate_id(IncidentUpdate),
+                        incident_id,
+                        self._resolve_creator(update.creator_email, default=creator_id),
+                        update.summary,
+                        new_status_id,
+                        new_severity_id,
+                        previous_status_id if new_status_id else None,
+                        previous_severity_id if new_severity_id else None,
+                        update.created_at,
+                        update.created_at,
+                    )
+                )
+                previous_status_id = new_status_id or previous_status_id
+                previous_severity_id = new_severity_id or previous_severity_id
+
+            for label, value in row.fields.items():
+                field_values.append(self._build_field_value(incident_id, label, value, row.created_at, line))
+
+            for label, value in row.timestamps.items():
+                timestamp_id = self._resolve(self.timestamps, label, "timestamp", line)
+                timestamp_values.append(
+                    (
+                        self.bulk_repo.generate_id(TimestampValue),
+                        timestamp_id,
+                        incident_id,
+                        value,
+                        row.created_at,
+                        row.created_at,
+                    )
+                )
+
+        # load in dependency order
+        self.bulk_repo.copy_rows(
+            Incident,
+            [
+                "id",
+                "organisation_id",
+                "incident_type_id",
+                "incident_status_id",
+                "creator_id",
+                "incident_severity_id",
+                "name",
+                "reference",
+                "reference_id",
+                "description",
+                "slack_channel_id",
+                "slack_channel_name",
+                "created_at",
+                "updated_at",
+            ],
+            incidents,
+        )
+        self.bulk_repo.copy_rows(
+            IncidentRoleAssignment,
+            ["id", "user_id", "incident_id", "incident_role_id", "created_at", "updated_at"],
+            role_assignments,
+        )
+        self.bulk_repo.copy_rows(
+            IncidentUpdate,
+            [
+                "id",
+                "incident_id",
+                "creator_id",
+                "summary",
+                "new_incident_status_id",
+                "new_incident_severity_id",
+                "previous_incident_status_id",
+                "previous_incident_severity_id",
+                "created_at",
+                "updated_at",
+            ],
+            updates,
+        )
+        self.bulk_repo.copy_rows(
+            IncidentFieldValue,
+            [
+                "id",
+                "incident_id",
+                "field_id",
+                "value_text",
+                "value_single_select",
+                "value_multi_select",
+                "created_at",
+                "updated_at",
+            ],
+            field_values,
+        )
+        self.bulk_repo.copy_rows(
+            TimestampValue,
+            ["id", "timestamp_id", "incident_id", "value", "created_at", "updated_at"],
+            timestamp_values,
+        )
+
+        return len(updates)
+
+    def _validate_row(self, line: int, row: dict[str, Any]) -> ImportIncidentSchema:
+        try:
+            return ImportIncidentSchema.model_validate(row)
+        except PydanticValidationError as e:
+            raise ImportRowError(line, str(e)) from e
+
+    def _resolve(self, lookup: dict[str, str], name: str | None, kind: str, line: int) -> str | None:
+        if name is None:
+            return None
+
+        value = lookup.get(name.strip().lower())
+        if not value:
+            raise ImportRowError(line, f"Unknown {kind} '{name}'")
+
+        return value
+
+    def _resolve_incident_type(self, name: str | None, line: int) -> str:
+        if name is None:
+            if not self.default_incident_type_id:
+                raise ImportRowError(line, "No type given and organisation has no default incident type")
+            return self.default_incident_type_id
+
+        return self._resolve(self.incident_types, name, "type", line)  # type: ignore
+
+    def _resolve_creator(self, email_address: str | None, default: str | None = None) -> str:
+        """Creators that are not members of the organisation fall back to the default creator"""
+        if email_address and (user_id := self.creators.get(email_address.lower())):
+            return user_id
+
+        return default or self.default_creator.id
+
+    def _generate_reference(self, reference_id: int) -> str:
+        return self.organisation.settings.incident_reference_format.replace("{id}", str(reference_id))
+
+    def _resolve_option(self, field: Field, value: str, line: int) -> str:
+        """The field's option matching the value, ignoring case"""
+        options = {it.lower(): it for it in field.available_options or []}
+        option = options.get(value.strip().lower())
+        if option is None:
+            raise ImportRowError(line, f"Unknown option '{value}' for field '{field.label}'")
+
+        return option
+
+    def _build_field_value(
+        self, incident_id: str, label: str, value: str | list[str], created_at: datetime, line: int
+    ) -> tuple:
+        field = self.fields.get(label.strip().lower())
+        if not field:
+            raise ImportRowError(line, f"Unknown field '{label}'")
+
+        value_text = None
+        value_single_select = None
+        value_multi_select = None
+
+        match field.interface_kind:
+            case InterfaceKind.SINGLE_SELECT:
+                if not isinstance(value, str):
+                    raise ImportRowError(line, f"Field '{label}' takes a single option")
+                value_single_select = self._resolve_option(field, value, line)
+            case InterfaceKind.MULTI_SELECT:
+                values = value.split(MULTI_SELECT_SEPARATOR) if isinstance(value, str) else value
+                value_multi_select = [self._resolve_option(field, it, line) for it in values]
+            case InterfaceKind.TEXT | InterfaceKind.TEXTAREA:
+                if not isinstance(value, str):
+                    raise ImportRowError(line, f"Field '{label}' takes text")
+                value_text = value
+
+        return (
+            self.bulk_repo.generate_id(IncidentFieldValue),
+            incident_id,
+            field.id,
+            value_text,
+            value_single_select,
+            value_multi_select,
+            created_at,
+            created_at,
+        )
@@ -0,0 +1,254 @@
+import asyncio
+import collections
+import json
+from typing import Any, AsyncIterator
+
+import structlog
+from pydantic import BaseModel
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db import Base
+from app.env import settings
+from app.utils import LIVE_EVENTS_KEY
+
+logger = structlog.get_logger(logger_name=__name__)
+
+CHANNEL_PREFIX = "live:"
+HISTORY_KEY_PREFIX = "live-history:"
+
+# session.info key for events which have been serialized and are waiting for the commit to finish
+SERIALIZED_LIVE_EVENTS_KEY = "serialized_live_events"
+
+# sent to a client to end its stream, browsers will reconnect with the last event ID they saw
+_CLOSE = None
+
+
+def _history_key(channel: str) -> str:
+    return f"{HISTORY_KEY_PREFIX}{channel}"
+
+
+def _parse_event_id(event_id: str) -> tuple[int, int] | None:
+    """Redis stream IDs are <milliseconds>-<sequence>"""
+    try:
+        ms, seq = event_id.split("-")
+        return int(ms), int(seq)
+    except ValueError:
+        return None
+
+
+def _format_event(event_id: str, type: str, data: str) -> str:
+    return f"id: {event_id}\nevent: {type}\ndata: {data}\n\n"
+
+
+class LivePublisher:
+    """Publish events to every API process holding a live connection for the channel"""
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    def publish(self, channel: str, type: str, data: Any) -> str:
+        """Keep the event in the channel's history, so reconnecting clients can catch up, then fan it out"""
+        fields = {"type": type, "data": json.dumps(data)}
+        event_id = self.redis.xadd(
+            _history_key(channel),
+            fields,  # type: ignore
+            maxlen=settings.LIVE_STREAM_HISTORY,
+            approximate=True,
+        ).decode()
+        self.redis.publish(f"{CHANNEL_PREFIX}{channel}", json.dumps({"id": event_id, **fields}))
+
+        return event_id
+
+
+_redis: Redis | None = None
+
+
+def _get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    return _redis
+
+
+def warm_up_publisher() -> None:
+    """Connect to redis before the first event is published"""
+    _get_redis().ping()
+
+
+def _serialize_pending_events(session: Session) -> None:
+    """Serialize before committing, afterwards the models are expired and can't be loaded again"""
+    pending = session.info.pop(LIVE_EVENTS_KEY, None)
+    if not pending:
+        return
+
+    # relationships aren't updated when a foreign key is changed, so reload anything that's sent as a model
+    session.flush()
+    seen: set[tuple[str, str, int]] = set()
+    serialized = []
+
+    # live updates are best effort, a problem serializing them mustn't stop the changes being committed
+    try:
+        for channel, type, data, schema in pending:
+            if schema:
+                # the same model may have been queued more than once, it's only sent in its final state
+                key = (channel, type, id(data))
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                if isinstance(data, Base):
+                    session.expire(data)
+                data = schema.model_validate(data).model_dump(mode="json", by_alias=True)
+            elif isinstance(data, BaseModel):
+                data = data.model_dump(mode="json", by_alias=True)
+            serialized.append((channel, type, data))
+    except Exception:
+        logger.exception("Could not serialize live events, they won't be sent", total=len(pending))
+        return
+
+    session.info.setdefault(SERIALIZED_LIVE_EVENTS_KEY, []).extend(serialized)
+
+
+def _publish_pending_events(session: Session) -> None:
+    pending = session.info.pop(SERIALIZED_LIVE_EVENTS_KEY, None)
+    if not pending:
+        return
+
+    publisher = LivePublisher(redis=_get_redis())
+    for channel, type, data in pending:
+        try:
+            publisher.publish(channel=channel, type=type, data=data)
+        except RedisError:
+            logger.warning("Could not publish live event", channel=channel, type=type, exc_info=True)
+
+
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop(LIVE_EVENTS_KEY, None)
+    session.info.pop(SERIALIZED_LIVE_EVENTS_KEY, None)
+
+
+def register_publisher() -> None:
+    """Publish the events queued with queue_live_event once their transaction has committed"""
+    if not event.contains(Session, "after_commit", _publish_pending_events):
+        event.listen(Session, "before_commit", _serialize_pending_events)
+        event.listen(Session, "after_commit", _publish_pending_events)
+        event.listen(Session, "after_rollback", _discard_pending_events)
+
+
+class LiveBroadcaster:
+    """Fan out published events to the clients connected to this process
+
+    A single pattern subscription is shared by every client, pages and incidents change rarely enough that
+    receiving events for channels nobody is watching here costs less than subscribing per channel.
+    """
+
+    def __init__(self) -> None:
+        self.redis: AsyncRedis | None = None
+        self.reader: asyncio.Task | None = None
+        self.listeners: dict[str, set[asyncio.Queue]] = collections.defaultdict(set)
+
+    def is_full(self, channel: str) -> bool:
+        return len(self.listeners.get(channel, ())) >= settings.LIVE_STREAM_MAX_CONNECTIONS
+
+    def _ensure_started(self) -> None:
+        if self.redis is None:
+            self.redis = AsyncRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        assert self.redis is not None
+
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel = message["channel"].decode().removeprefix(CHANNEL_PREFIX)
+                    payload = json.loads(message["data"])
+                    self._dispatch(channel, (payload["id"], payload["type"], payload["data"]))
+            except RedisError:
+                logger.warning("Live subscription lost, reconnecting", exc_info=True)
+                # events may have been missed, clients will catch up from history when they reconnect
+                for channel in list(self.listeners):
+                    self._dispatch(channel, _CLOSE)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _dispatch(self, channel: str, item: tuple[str, str, str] | None) -> None:
+        for queue in list(self.listeners.get(channel, ())):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # slow client, drop what it has not read and ask it to reconnect
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_CLOSE)
+
+    async def _history_since(self, channel: str, last_event_id: str) -> tuple[list[tuple[str, str, str]], bool]:
+        """Events published after the given event, and whether some may have been trimmed from history"""
+        assert self.redis is not None
+
+        key = _history_key(channel)
+        entries = await self.redis.xrange(key, min=f"({last_event_id}", max="+")
+        items = [
+            (entry_id.decode(), fields[b"type"].decode(), fields[b"data"].decode()) for entry_id, fields in entries
+        ]
+
+        # the last seen event is only older than everything kept if it has been trimmed
+        oldest = await self.redis.xrange(key, min="-", max="+", count=1)
+        oldest_id = _parse_event_id(oldest[0][0].decode()) if oldest else None
+        last_seen = _parse_event_id(last_event_id)
+        is_truncated = bool(oldest_id and last_seen and oldest_id > last_seen)
+
+        return items, is_truncated
+
+    async def stream(self, channel: str, last_event_id: str | None = None) -> AsyncIterator[str]:
+        """Server-sent events for a channel, starting after the last event the client received"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_STREAM_QUEUE_SIZE)
+        self.listeners[channel].add(queue)
+
+        try:
+            self._ensure_started()
+            yield f"retry: {settings.LIVE_STREAM_RETRY_MS}\n\n"
+
+            last_sent: tuple[int, int] | None = None
+            if last_event_id and _parse_event_id(last_event_id):
+                items, is_truncated = await self._history_since(channel, last_event_id)
+                if is_truncated:
+                    # too far behind to replay, the client should fetch everything again
+                    yield _format_event(event_id=last_event_id, type="reset", data="{}")
+                for event_id, type, data in items:
+                    yield _format_event(event_id=event_id, type=type, data=data)
+                    last_sent = _parse_event_id(event_id)
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if item is _CLOSE:
+                    return
+
+                event_id, type, data = item
+                # already sent while replaying history
+                parsed_id = _parse_event_id(event_id)
+                if last_sent and parsed_id and parsed_id <= last_sent:
+                    continue
+
+                yield _format_event(event_id=event_id, type=type, data=data)
+        finally:
+            self.listeners[channel].discard(queue)
+            if not self.listeners[channel]:
+                del self.listeners[channel]
+
+
+broadcaster = LiveBroadcaster()
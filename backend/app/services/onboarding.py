@@ -1,10 +1,13 @@
-from typing import Any, TypedDict
+import functools
+from typing import Any
 
 import yaml
+from pydantic import BaseModel, ConfigDict
 
 from app.models import (
     AnnouncementActions,
     AnnouncementFields,
+    Field,
     FieldKind,
     Form,
     FormKind,
@@ -18,32 +21,117 @@ from app.models.incident_role import IncidentRoleKind
 from app.models.incident_status import IncidentStatusCategoryEnum
 from app.repos import AnnouncementRepo, FieldRepo, FormRepo, IncidentRepo, LifecycleRepo, SeverityRepo, TimestampRepo
 
+# data files
+TIMESTAMPS_SEED_DATA_PATH = "/srv/data/timestamps.yaml"
+SEVERITIES_SEED_DATA_PATH = "/srv/data/severities.yaml"
+STATUSES_SEED_DATA_PATH = "/srv/data/statuses.yaml"
+FORMS_SEED_DATA_PATH = "/srv/data/forms.yaml"
+FIELDS_SEED_DATA_PATH = "/srv/data/fields.yaml"
+ROLES_SEED_DATA_PATH = "/srv/data/roles.yaml"
+TYPES_SEED_DATA_PATH = "/srv/data/types.yaml"
+
+
+class SeedItem(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+
+class SeedField(SeedItem):
+    label: str
+    interface_kind: InterfaceKind
+    kind: FieldKind
+    description: str
+
+
+class SeedFormField(SeedItem):
+    label: str
+    field_kind: FieldKind
+    description: str | None = None
+    requirement_type: RequirementTypeEnum
+    is_deletable: bool
+    can_have_default_value: bool
+    can_have_description: bool
+    can_change_requirement_type: bool
 
-class CategoryItemType(TypedDict):
+
+class SeedForm(SeedItem):
     name: str
-    category: IncidentStatusCategoryEnum
+    type: FormKind
+    fields: list[SeedFormField]
+
+
+class SeedSeverity(SeedItem):
+    name: str
+    description: str
+
+
+class SeedIncidentType(SeedItem):
+    name: str
+    description: str
+    is_editable: bool
+    is_deletable: bool
+    is_default: bool
 
 
-class IncidentRoleItemType(TypedDict):
+class SeedIncidentStatus(SeedItem):
     name: str
+    category: IncidentStatusCategoryEnum
     description: str
+
+
+class SeedIncidentRole(SeedItem):
+    name: str
     kind: IncidentRoleKind
+    description: str
     slack_reference: str
     is_deletable: bool
     is_editable: bool
 
 
-# data files
-TIMESTAMPS_SEED_DATA_PATH = "/srv/data/timestamps.yaml"
-SEVERITIES_SEED_DATA_PATH = "/srv/data/severities.yaml"
-STATUSES_SEED_DATA_PATH = "/srv/data/statuses.yaml"
-FORMS_SEED_DATA_PATH = "/srv/data/forms.yaml"
-FIELDS_SEED_DATA_PATH = "/srv/data/fields.yaml"
-ROLES_SEED_DATA_PATH = "/srv/data/roles.yaml"
-TYPES_SEED_DATA_PATH = "/srv/data/types.yaml"
+class SeedTimestamp(SeedItem):
+    kind: TimestampKind
+    label: str
+    rule: dict[str, Any]
+
+
+class SeedData(SeedItem):
+    """Configuration every organisation starts with"""
+
+    fields: list[SeedField]
+    forms: list[SeedForm]
+    severities: list[SeedSeverity]
+    types: list[SeedIncidentType]
+    statuses: list[SeedIncidentStatus]
+    roles: list[SeedIncidentRole]
+    timestamps: list[SeedTimestamp]
+
+
+def _read_yaml(path: str) -> Any:
+    with open(path, "r") as fp:
+        return yaml.load(fp, Loader=yaml.CLoader)
+
+
+@functools.cache
+def load_seed_data() -> SeedData:
+    """Read and validate the seed data files, once per process"""
+    return SeedData(
+        fields=_read_yaml(FIELDS_SEED_DATA_PATH)["fields"],
+        forms=list(_read_yaml(FORMS_SEED_DATA_PATH)["forms"].values()),
+        severities=_read_yaml(SEVERITIES_SEED_DATA_PATH)["severities"],
+        types=_read_yaml(TYPES_SEED_DATA_PATH)["types"],
+        statuses=_read_yaml(STATUSES_SEED_DATA_PATH)["statuses"],
+        roles=_read_yaml(ROLES_SEED_DATA_PATH)["roles"],
+        timestamps=_read_yaml(TIMESTAMPS_SEED_DATA_PATH)["timestamps"],
+    )
 
 
 class OnboardingService:
+    """Create the default configuration for an organisation, anything it already has is left alone
+
+    Models are added to the session without flushing after each one. The queries for what an organisation already has
+    autoflush whatever has been added before them, so rows are written a table or form at a time with multi-row
+    inserts, rather than one insert per row.
+    """
+
     def __init__(
         self,
         form_repo: FormRepo,
@@ -61,114 +149,127 @@ class OnboardingService:
         self.timestamp_repo = timestamp_repo
         self.field_repo = field_repo
         self.lifecycle_repo = lifecycle_repo
+        self.session = incident_repo.session
 
     def setup_organisation(self, organisation: Organisation) -> None:
-        self._setup_fields(organisation=organisation)
-        self._setup_forms(organisation)
-        self._setup_severities(organisation)
-        self._setup_incident_types(organisation)
-        self._setup_incident_statuses(organisation)
+        seed_data = load_seed_data()
+
+        fields_by_kind = self._setup_fields(organisation, seed_data.fields)
+        self._setup_forms(organisation, seed_data.forms, fields_by_kind=fields_by_kind)
+        self._setup_severities(organisation, seed_data.severities)
+        self._setup_incident_types(organisation, seed_data.types)
+        self._setup_incident_statuses(organisation, seed_data.statuses)
         self._setup_settings(organisation)
-        self._setup_incident_roles(organisation)
+        self._setup_incident_roles(organisation, seed_data.roles)
         self._setup_announcement(organisation)
-        self._setup_timestamps(organisation)
+        self._setup_timestamps(organisation, seed_data.timestamps)
         self._setup_lifecycle(organisation)
 
-    def _setup_forms(self, organisation: Organisation) -> list[Form]:
-        forms: list[Form] = []
+        self.session.flush()
+
+    def _setup_fields(self, organisation: Organisation, items: list[SeedField]) -> dict[FieldKind, Field]:
+        """Setup system fields, returns every field by kind"""
+        fields_by_kind = {field.kind: field for field in self.field_repo.get_all_fields(organisation=organisation)}
+
+        for item in items:
+            if item.kind in fields_by_kind:
+                continue
+
+            fields_by_kind[item.kind] = self.field_repo.add_field(
+                organisation=organisation,
+                label=item.label,
+                interface_kind=item.interface_kind,
+                kind=item.kind,
+                description=item.description,
+            )
+
+        return fields_by_kind
 
-        with open(FORMS_SEED_DATA_PATH, "r") as fp:
-            data = yaml.load(fp, Loader=yaml.CLoader)
+    def _setup_forms(
+        self, organisation: Organisation, items: list[SeedForm], fields_by_kind: dict[FieldKind, Field]
+    ) -> list[Form]:
+        forms: list[Form] = []
 
-        for form_key, form_data in data["forms"].items():
-            form_kind = FormKind(form_data["type"])
-            form = self.form_repo.get_form(organisation=organisation, form_type=form_kind)
+        for item in items:
+            form = self.form_repo.get_form(organisation=organisation, form_type=item.type)
             if not form:
-                form = self.form_repo.create_form(
-                    organisation=organisation,
-                    name=form_data["name"],
-                    form_type=form_kind,
-                )
-
-            field_descriptions = form_data["fields"]
-            self._create_form_fields(form=form, field_descriptions=field_descriptions)
+                form = self.form_repo.add_form(organisation=organisation, name=item.name, form_type=item.type)
+
+            self._create_form_fields(form=form, items=item.fields, fields_by_kind=fields_by_kind)
             forms.append(form)
 
         return forms
 
-    def _create_form_fields(self, form: Form, field_descriptions: list[dict[str, Any]]):
+    def _create_form_fields(self, form: Form, items: list[SeedFormField], fields_by_kind: dict[FieldKind, Field]):
         """Setup the form fields for a form"""
-
-        for idx, item in enumerate(field_descriptions):
-            field_kind = FieldKind(item["field_kind"])
-            requirement_type = RequirementTypeEnum(item["requirement_type"])
-            form_field = self.form_repo.get_form_field_by_label(form=form, label=item["label"])
-            field = self.field_repo.get_field_by_kind(organisation=form.organisation, kind=field_kind)
-            if not form_field:
-                if not field:
-                    raise RuntimeError(f"Could not find custom field: {item['field_kind']}")
-
-                form_field = self.form_repo.create_form_field(
-                    form=form,
-                    field=field,
-                    label=item["label"],
-                    requirement_type=requirement_type,
-                    rank=idx,
-                    description=item.get("description"),
-                    is_deletable=item["is_deletable"],
-                    can_have_default_value=item["can_have_default_value"],
-                    can_have_description=item["can_have_description"],
-                    can_change_requirement_type=item["can_change_requirement_type"],
-                )
-
-    def _setup_severities(self, organisation: Organisation):
+        # a new form has no fields, so this doesn't need a query
+        existing_labels = {form_field.label for form_field in form.form_fields}
+
+        for idx, item in enumerate(items):
+            if item.label in existing_labels:
+                continue
+
+            field = fields_by_kind.get(item.field_kind)
+            if not field:
+                raise RuntimeError(f"Could not find custom field: {item.field_kind}")
+
+            self.form_repo.add_form_field(
+                form=form,
+                field=field,
+                label=item.label,
+                requirement_type=item.requirement_type,
+                rank=idx,
+                description=item.description,
+                is_deletable=item.is_deletable,
+                can_have_default_value=item.can_have_default_value,
+                can_have_description=item.can_have_description,
+                can_change_requirement_type=item.can_change_requirement_type,
+            )
+
+    def _setup_severities(self, organisation: Organisation, items: list[SeedSeverity]):
         """Setup incident severities"""
-        with open(SEVERITIES_SEED_DATA_PATH) as fp:
-            data = yaml.load(fp, Loader=yaml.CLoader)
-
-        for idx, item in enumerate(data["severities"]):
-            severity = self.severity_repo.get_severity_by_name(organisation=organisation, name=item["name"])
-            if not severity:
-                self.severity_repo.create_severity(
-                    organisation=organisation,
-                    name=item["name"],
-                    description=item["description"],
-                    rating=idx,
-                )
-
-    def _setup_incident_types(self, organisation: Organisation):
+        existing = {severity.name for severity in self.severity_repo.get_all(organisation=organisation)}
+
+        for idx, item in enumerate(items):
+            if item.name in existing:
+                continue
+
+            self.severity_repo.add_severity(
+                organisation=organisation, name=item.name, description=item.description, rating=idx
+            )
+
+    def _setup_incident_types(self, organisation: Organisation, items: list[SeedIncidentType]):
         """Setup incident types"""
-        with open(TYPES_SEED_DATA_PATH) as fp:
-            data = yaml.load(fp, Loader=yaml.CLoader)
-
-        for item in data["types"]:
-            incident_type = self.incident_repo.get_incident_type_by_name(organisation=organisation, name=item["name"])
-            if not incident_type:
-                self.incident_repo.create_incident_type(
-                    organisation=organisation,
-                    name=item["name"],
-                    description=item["description"],
-                    is_editable=item["is_editable"],
-                    is_deletable=item["is_deletable"],
-                    is_default=item["is_default"],
-                )
-
-    def _setup_incident_statuses(self, organisation: Organisation):
+        existing = {it.name for it in self.incident_repo.get_all_incident_types(organisation=organisation)}
+
+        for item in items:
+            if item.name in existing:
+                continue
+
+            self.incident_repo.add_incident_type(
+                organisation=organisation,
+                name=item.name,
+                description=item.description,
+                is_editable=item.is_editable,
+                is_deletable=item.is_deletable,
+                is_default=item.is_default,
+            )
+
+    def _setup_incident_statuses(self, organisation: Organisation, items: list[SeedIncidentStatus]):
         """Setup incident statuses"""
-        with open(STATUSES_SEED_DATA_PATH) as fp:
-            data = yaml.load(fp, Loader=yaml.CLoader)
-
-        for idx, item in enumerate(data["statuses"]):
-            status = self.incident_repo.get_incident_status_by_name(organisation=organisation, name=item["name"])
-            category = IncidentStatusCategoryEnum(item["category"])
-            if not status:
-                self.incident_repo.create_incident_status(
-                    organisation=organisation,
-                    name=item["name"],
-                    rank=idx,
-                    category=category,
-                    description=item["description"],
-                )
+        existing = {status.name for status in self.incident_repo.get_all_incident_statuses(organisation=organisation)}
+
+        for idx, item in enumerate(items):
+            if item.name in existing:
+                continue
+
+            self.incident_repo.add_incident_status(
+                organisation=organisation,
+                name=item.name,
+                rank=idx,
+                category=item.category,
+                description=item.description,
+            )
 
     def _setup_settings(self, organisation: Organisation) -> None:
         """Setup organisation setting"""
@@ -177,29 +278,25 @@ class OnboardingService:
             model.organisation_id = organisation.id
             model.slack_announcement_channel_name = "incidents"
 
-            self.incident_repo.session.add(model)
-            self.incident_repo.session.flush()
+            self.session.add(model)
 
-    def _setup_incident_roles(self, organisation: Organisation) -> None:
+    def _setup_incident_roles(self, organisation: Organisation, items: list[SeedIncidentRole]) -> None:
         """Setup incident roles"""
-        with open(ROLES_SEED_DATA_PATH) as fp:
-            data = yaml.load(fp, Loader=yaml.CLoader)
-
-        descriptors = data["roles"]
-
-        for _, item in enumerate(descriptors):
-            kind = IncidentRoleKind(item["kind"])
-            role = self.incident_repo.get_incident_role(organisation=organisation, kind=kind)
-            if not role:
-                self.incident_repo.create_incident_role(
-                    organisation=organisation,
-                    name=item["name"],
-                    description=item["description"],
-                    kind=kind,
-                    slack_reference=item["slack_reference"],
-                    is_deletable=item["is_deletable"],
-                    is_editable=item["is_editable"],
-                )
+        existing = {role.kind for role in self.incident_repo.get_all_incident_roles(organisation=organisation)}
+
+        for item in items:
+            if item.kind in existing:
+                continue
+
+            self.incident_repo.add_incident_role(
+                organisation=organisation,
+                name=item.name,
+                description=item.description,
+                kind=item.kind,
+                slack_reference=item.slack_reference,
+                is_editable=item.is_editable,
+                is_deletable=item.is_deletable,
+            )
 
     def _setup_announcement(self, organisation: Organisation) -> None:
         # todo: create a default announcement when incident is created!
@@ -207,7 +304,7 @@ class OnboardingService:
         if announcement:
             return None
 
-        self.announcement_repo.create_announcement(
+        self.announcement_repo.add_announcement(
             organisation=organisation,
             fields=[
                 AnnouncementFields.SEVERITY,
@@ -221,43 +318,26 @@ class OnboardingService:
             ],
         )
 
-    def _setup_timestamps(self, organisation: Organisation):
+    def _setup_timestamps(self, organisation: Organisation, items: list[SeedTimestamp]):
         """Setup timestamps for the organisation"""
-        with open(TIMESTAMPS_SEED_DATA_PATH) as fp:
-            data = yaml.load(fp, Loader=yaml.CLoader)
-
-        for idx, item in enumerate(data["timestamps"]):
-            timestamp = self.timestamp_repo.get_timestamp_by_label(organisation=organisation, label=item["label"])
-            if not timestamp:
-                self.timestamp_repo.create_timestamp(
-                    organisation=organisation,
-                    label=item["label"],
-                    kind=TimestampKind(item["kind"]),
-                    rank=idx,
-                    rules=[item["rule"]],
-                    can_delete=False,
-                )
-
-    def _setup_fields(self, organisation: Organisation):
-        """Setup custom fields"""
-        with open(FIELDS_SEED_DATA_PATH, "r") as fp:
-            data = yaml.load(fp, Loader=yaml.CLoader)
-
-        field_descriptors = data["fields"]
-
-        for field_descriptor in field_descriptors:
-            field_kind = FieldKind(field_descriptor["kind"])
-            interface_kind = InterfaceKind(field_descriptor["interface_kind"])
-            custom_form_field = self.field_repo.get_field_by_kind(organisation=organisation, kind=field_kind)
-            if not custom_form_field:
-                self.field_repo.create_field(
-                    organisation=organisation,
-                    label=field_descriptor["label"],
-                    interface_kind=interface_kind,
-                    kind=field_descriptor["kind"],
-                    description=field_descriptor["description"],
-                )
+        existing = {
+            timestamp.label
+            for timestamp in self.timestamp_repo.get_timestamps_for_organisation(organisation=organisation)
+        }
+
+        for idx, item in enumerate(items):
+            if item.label in existing:
+                continue
+
+            self.timestamp_repo.add_timestamp(
+                organisation=organisation,
+                label=item.label,
+                kind=item.kind,
+                rank=idx,
+                rules=[item.rule],
+                can_delete=False,
+            )
 
     def _setup_lifecycle(self, organisation: Organisation):
         if not organisation.lifecycles:
-            self.lifecycle_repo.create_lifecycle(organisation=organisation)
+            self.lifecycle_repo.add_lifecycle(organisation=organisation)
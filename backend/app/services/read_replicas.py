@@ -0,0 +1,165 @@
+import hashlib
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Generator
+
+import structlog
+from fastapi import Header
+from redis import Redis, RedisError
+from sqlalchemy import Engine, event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import replica_engines, session_factory
+from app.env import settings
+from app.metrics import db_replica_lag_seconds
+
+logger = structlog.get_logger(logger_name=__name__)
+
+RECENT_WRITE_KEY_PREFIX = "recent-write:"
+
+# session.info keys, the authorization header of the request using the session and whether it has flushed changes
+AUTHORIZATION_KEY = "authorization"
+HAS_WRITTEN_KEY = "has_written"
+
+# seconds behind the primary, zero when every change received has been replayed, so an idle primary doesn't
+# make a replica look like it's falling behind
+LAG_QUERY = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: Engine
+    session_factory: sessionmaker
+    # None when the replica could not be reached
+    lag: float | None = None
+    checked_at: float = 0.0
+
+
+class ReplicaRouter:
+    """Pick a replica which is close enough to the primary, in turn
+
+    Lag is cached per process, concurrent requests may occasionally check the same replica twice which is harmless.
+    """
+
+    def __init__(self, engines: list[Engine], max_lag_seconds: float, check_seconds: float):
+        self.replicas = [
+            Replica(name=f"replica_{idx}", engine=engine, session_factory=sessionmaker(bind=engine))
+            for idx, engine in enumerate(engines)
+        ]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.counter = itertools.count()
+
+    def get_lag(self, replica: Replica) -> float | None:
+        now = time.monotonic()
+        if now - replica.checked_at < self.check_seconds:
+            return replica.lag
+
+        replica.checked_at = now
+        try:
+            with replica.engine.connect() as connection:
+                replica.lag = float(connection.execute(text(LAG_QUERY)).scalar_one())
+        except SQLAlchemyError as e:
+            logger.warning("Could not check replica lag", replica=replica.name, error=str(e))
+            replica.lag = None
+
+        if replica.lag is not None:
+            db_replica_lag_seconds.labels(database=replica.name).set(replica.lag)
+
+        return replica.lag
+
+    def choose(self) -> Replica | None:
+        """A replica within the lag limit, or None if there isn't one"""
+        if not self.replicas:
+            return None
+
+        start = next(self.counter)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            lag = self.get_lag(replica)
+            if lag is not None and lag <= self.max_lag_seconds:
+                return replica
+
+        return None
+
+
+replica_router = ReplicaRouter(
+    engines=replica_engines,
+    max_lag_seconds=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_seconds=settings.DATABASE_REPLICA_CHECK_SECONDS,
+)
+
+_redis: Redis | None = None
+
+
+def _get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    return _redis
+
+
+def _recent_write_key(authorization: str) -> str:
+    return RECENT_WRITE_KEY_PREFIX + hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def has_recent_write(authorization: str | None) -> bool:
+    """Whether the caller wrote recently enough that a replica might not have their changes yet"""
+    if not authorization:
+        return False
+
+    try:
+        return bool(_get_redis().exists(_recent_write_key(authorization)))
+    except RedisError as e:
+        # can't tell, so stay on the primary
+        logger.warning("Could not check for recent writes", error=str(e))
+        return True
+
+
+def _track_write(session: Session, flush_context) -> None:
+    session.info[HAS_WRITTEN_KEY] = True
+
+
+def _record_recent_write(session: Session) -> None:
+    has_written = session.info.pop(HAS_WRITTEN_KEY, False)
+    authorization = session.info.get(AUTHORIZATION_KEY)
+    if not has_written or not authorization or not replica_router.replicas:
+        return
+
+    try:
+        _get_redis().set(_recent_write_key(authorization), 1, ex=settings.DATABASE_READ_YOUR_WRITES_SECONDS)
+    except RedisError as e:
+        logger.warning("Could not record recent write", error=str(e))
+
+
+def _discard_write(session: Session) -> None:
+    session.info.pop(HAS_WRITTEN_KEY, None)
+
+
+def register_write_tracking() -> None:
+    """Remember which callers have just written, so their reads can stay on the primary"""
+    if not event.contains(Session, "after_commit", _record_recent_write):
+        event.listen(Session, "after_flush", _track_write)
+        event.listen(Session, "after_commit", _record_recent_write)
+        event.listen(Session, "after_rollback", _discard_write)
+
+
+def get_read_db(authorization: str | None = Header(None)) -> Generator[Session, None, None]:
+    """Session for read-only routes, on a replica unless none are fresh enough or the caller has just written"""
+    replica = None
+    if replica_router.replicas and not has_recent_write(authorization):
+        replica = replica_router.choose()
+
+    db = replica.session_factory() if replica else session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
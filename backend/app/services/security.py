@@ -3,7 +3,6 @@
 import base64
 from datetime import datetime, timedelta, timezone
 
-import pyotp
 import structlog
 from sqlalchemy.orm import Session
 
@@ -23,6 +22,13 @@ COOL_OFF_PERIOD = timedelta(minutes=15)
 OTP_CODE_EXPIRE_IN_SECONDS = 15 * 60
 
 
+def _totp(key: str):
+    # only used when logging in with a code, so it's not imported on startup
+    import pyotp
+
+    return pyotp.TOTP(s=key, interval=OTP_CODE_EXPIRE_IN_SECONDS)
+
+
 class SecurityService:
     def __init__(
         self,
@@ -39,7 +45,7 @@ class SecurityService:
         Generate an OTP code for a user
         """
         key = self._get_user_key(user)
-        totp = pyotp.TOTP(s=key, interval=OTP_CODE_EXPIRE_IN_SECONDS)
+        totp = _totp(key)
         token = totp.now()
 
         return token
@@ -47,7 +53,7 @@ class SecurityService:
     def validate_otp_code(self, user: User, code: str) -> None:
         """Validate the OTP code"""
         key = self._get_user_key(user)
-        totp = pyotp.TOTP(s=key, interval=OTP_CODE_EXPIRE_IN_SECONDS)
+        totp = _totp(key)
 
         if self._is_user_account_in_cool_off_period(user):
             raise ValidationError(
@@ -2,9 +2,9 @@ from datetime import datetime, timezone
 from typing import Tuple
 
 import structlog
-from slack_sdk import WebClient
 
 from app.models import Organisation
+from app.services.slack.web_client import SlackWebClient
 from app.utils import to_channel_name
 
 logger = structlog.get_logger(logger_name=__name__)
@@ -13,7 +13,7 @@ logger = structlog.get_logger(logger_name=__name__)
 class SlackClientService:
     def __init__(self, auth_token: str):
         self.auth_token = auth_token
-        self.client = WebClient(token=auth_token)
+        self.client = SlackWebClient(token=auth_token)
 
     def _generate_slack_channel_name(self, organisation: Organisation, incident_name: str) -> str:
         now = datetime.now(tz=timezone.utc)
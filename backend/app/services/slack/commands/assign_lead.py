@@ -17,14 +17,14 @@ class AssignLeadCommand(SlackCommandHandlerBase):
     trigger_in_incident_channel = True
 
     def execute(self, command: SlackCommandDataSchema):
-        params = self.get_params(command=command)
+        params = self.params
         if not params:
             return
 
         if len(params.parameters) != 1:
             raise InvalidUsageError("This command expects the name of user, e.g /inc lead @TheUser", command)
 
-        incident = self.incident_repo.get_incident_by_slack_channel_id(command.channel_id)
+        incident = self.incident
         if not incident:
             raise RuntimeError("Could not find associated incident")
 
@@ -15,7 +15,7 @@ class AssignGenericRoleCommand(SlackCommandHandlerBase):
     trigger_in_incident_channel = True
 
     def execute(self, command: SlackCommandDataSchema):
-        params = self.get_params(command=command)
+        params = self.params
         if not params:
             return
 
@@ -23,7 +23,7 @@ class AssignGenericRoleCommand(SlackCommandHandlerBase):
             raise InvalidUsageError("use /inc role role_name @user", command=command)
 
         # get incident
-        incident = self.incident_repo.get_incident_by_slack_channel_id(command.channel_id)
+        incident = self.incident
         if not incident:
             raise RuntimeError("Could not find associated incident")
 
@@ -1,21 +1,33 @@
 import structlog
-from slack_sdk import WebClient
 
 from app.models import Organisation, User
-from app.repos import FormRepo
+from app.repos import FormRepo, IncidentRepo
 from app.schemas.slack import SlackCommandDataSchema
 from app.services.events import Events
+from app.services.slack.web_client import SlackWebClient
 
 # commands
 from .assign_lead import AssignLeadCommand
 from .assign_role import AssignGenericRoleCommand
-from .base import SlackCommandHandlerBase
+from .base import SlackCommandHandlerBase, parse_command
 from .create_incident import CreateIncidentCommand
 from .errors import InvalidUsageError
 from .update_status import UpdateStatusCommand
 
 logger = structlog.get_logger(logger_name=__name__)
 
+HANDLERS: list[type[SlackCommandHandlerBase]] = [
+    CreateIncidentCommand,
+    AssignLeadCommand,
+    AssignGenericRoleCommand,
+    UpdateStatusCommand,
+]
+
+# (trigger word, sent from an incident channel) -> handler, a trigger word of None is the fallback for that channel
+HANDLERS_BY_TRIGGER: dict[tuple[str | None, bool], type[SlackCommandHandlerBase]] = {
+    (handler.trigger_word, handler.trigger_in_incident_channel): handler for handler in HANDLERS
+}
+
 
 class SlackCommandRouterService:
     def __init__(
@@ -25,27 +37,41 @@ class SlackCommandRouterService:
         events: Events,
     ):
         self.organisation = organisation
-        self.slack_client = WebClient(token=self.organisation.slack_bot_token)
+        self.slack_client = SlackWebClient(token=self.organisation.slack_bot_token)
         self.session = form_repo.session
+        self.events = events
+        self.incident_repo = IncidentRepo(session=self.session)
 
-        self.commands: list[SlackCommandHandlerBase] = [
-            CreateIncidentCommand(session=self.session, organisation=self.organisation, events=events),
-            AssignLeadCommand(session=self.session, organisation=organisation, events=events),
-            AssignGenericRoleCommand(session=self.session, organisation=organisation, events=events),
-            UpdateStatusCommand(session=self.session, organisation=organisation, events=events),
-        ]
+    def get_handler(self, command: SlackCommandDataSchema) -> SlackCommandHandlerBase | None:
+        params = parse_command(command=command)
+
+        incident = self.incident_repo.get_incident_by_slack_channel_id(command.channel_id)
+        if incident and incident.organisation_id != self.organisation.id:
+            incident = None
+        in_incident_channel = incident is not None
+
+        trigger_word = params.trigger_word if params else None
+        handler_cls = HANDLERS_BY_TRIGGER.get((trigger_word, in_incident_channel)) or HANDLERS_BY_TRIGGER.get(
+            (None, in_incident_channel)
+        )
+        if not handler_cls:
+            return None
+
+        return handler_cls(
+            session=self.session, organisation=self.organisation, events=self.events, params=params, incident=incident
+        )
 
     def handle_command(self, command: SlackCommandDataSchema, user: User):
-        for command_handler in self.commands:
-            if command_handler.can_trigger(command=command):
-                try:
-                    logger.info("Running command handler", handler=command_handler.__class__.__name__)
-                    return command_handler.execute(command=command)
-                except InvalidUsageError as ex:
-                    self.show_invalid_usage_error(message=ex.message, command=ex.command)
-                    return
-
-        self.show_commands_help(command=command)
+        command_handler = self.get_handler(command=command)
+        if not command_handler:
+            self.show_commands_help(command=command)
+            return
+
+        try:
+            logger.info("Running command handler", handler=command_handler.__class__.__name__)
+            return command_handler.execute(command=command)
+        except InvalidUsageError as ex:
+            self.show_invalid_usage_error(message=ex.message, command=ex.command)
 
     def show_commands_help(self, command: SlackCommandDataSchema):
         help_message = [
@@ -0,0 +1,25 @@
+import structlog
+from redis import Redis, RedisError
+
+from app.env import settings
+
+logger = structlog.get_logger(logger_name=__name__)
+
+_redis: Redis | None = None
+
+
+def _get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    return _redis
+
+
+def claim_once(key: str, ttl: int) -> bool:
+    """Mark key as seen for ttl seconds, False if it already was, which happens when slack retries a delivery"""
+    try:
+        return bool(_get_redis().set(key, 1, nx=True, ex=ttl))
+    except RedisError as e:
+        # better to handle something twice than to lose it
+        logger.warning("Could not check for duplicate slack delivery", key=key, error=str(e))
+        return True
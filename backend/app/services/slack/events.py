@@ -6,10 +6,22 @@ from app.repos import IncidentRepo, OrganisationRepo, UserRepo
 from app.schemas.slack import SlackEventCallbackSchema
 from app.schemas.slack_events import CatchAllEventType, MemberJoinedChannelEventType
 
+from .deduplication import claim_once
 from .user import SlackUserService, UserIsABotError
 
 logger = structlog.get_logger(logger_name=__name__)
 
+PROCESSED_EVENT_KEY_PREFIX = "slack-event:"
+
+
+def verify_token(token: str) -> bool:
+    return settings.SLACK_VERIFICATION_TOKEN == token
+
+
+def claim_event(event_id: str) -> bool:
+    """False if the event has already been received"""
+    return claim_once(PROCESSED_EVENT_KEY_PREFIX + event_id, ttl=settings.SLACK_EVENT_DEDUPLICATION_SECONDS)
+
 
 class SlackEventsService:
     def __init__(
@@ -26,12 +38,6 @@ class SlackEventsService:
         self.slack_user_service = slack_user_service
         self.incident_repo = incident_repo
 
-    def verify_token(self, token: str) -> bool:
-        if settings.SLACK_VERIFICATION_TOKEN == token:
-            return True
-        else:
-            return False
-
     def handle_event(self, event: SlackEventCallbackSchema):
         # logger.info("handling slack event", slack_event=event)
 
@@ -0,0 +1,105 @@
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+from sqlalchemy.orm import Session
+
+from app.env import settings
+from app.models import FieldKind, FormKind, RequirementTypeEnum
+from app.repos import FormRepo
+from app.schemas.slack import SlackInteractionSchema
+
+logger = structlog.get_logger(logger_name=__name__)
+
+
+@dataclass(frozen=True)
+class FormFieldDefinition:
+    id: str
+    label: str
+    kind: FieldKind
+    is_required: bool
+
+    @property
+    def block_id(self) -> str:
+        return f"block-{self.id}"
+
+
+@dataclass(frozen=True)
+class FormDefinition:
+    """What's needed to check a submitted slack form, without loading the form and its fields from the database"""
+
+    id: str
+    organisation_id: str
+    type: FormKind
+    fields: tuple[FormFieldDefinition, ...]
+
+
+class FormDefinitionCache:
+    """Form definitions cached per process for a short time, so edits to a form are picked up soon after"""
+
+    def __init__(self, ttl_seconds: float, max_size: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.definitions: dict[str, tuple[float, FormDefinition]] = {}
+
+    def get(self, form_id: str, session: Session) -> FormDefinition | None:
+        now = time.monotonic()
+        cached = self.definitions.get(form_id)
+        if cached and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        form = FormRepo(session=session).get_form_by_id(form_id)
+        if not form:
+            self.definitions.pop(form_id, None)
+            return None
+
+        definition = FormDefinition(
+            id=form.id,
+            organisation_id=form.organisation_id,
+            type=form.type,
+            fields=tuple(
+                FormFieldDefinition(
+                    id=form_field.id,
+                    label=form_field.label,
+                    kind=form_field.field.kind,
+                    is_required=form_field.requirement_type == RequirementTypeEnum.REQUIRED,
+                )
+                for form_field in form.form_fields
+            ),
+        )
+
+        if len(self.definitions) >= self.max_size:
+            # oldest first, as entries are only ever appended
+            self.definitions.pop(next(iter(self.definitions)))
+        self.definitions.pop(form_id, None)
+        self.definitions[form_id] = (now, definition)
+
+        return definition
+
+
+form_definitions = FormDefinitionCache(ttl_seconds=settings.SLACK_FORM_CACHE_SECONDS)
+
+
+def _get_submitted_value(field_data: dict[str, Any]) -> str | None:
+    if field_data.get("selected_option"):
+        return field_data["selected_option"]["value"]
+    return field_data.get("value")
+
+
+def validate_submission(definition: FormDefinition, interaction: SlackInteractionSchema) -> dict[str, str]:
+    """Errors to show against each block of the submitted view, empty when the submission is valid"""
+    state_values = interaction.payload["view"]["state"]["values"]
+    errors: dict[str, str] = {}
+
+    for form_field in definition.fields:
+        # blocks may be left out of the view, initial status isn't shown when triage is disabled
+        if form_field.block_id not in state_values:
+            continue
+
+        value = _get_submitted_value(state_values[form_field.block_id].get(form_field.id, {}))
+        is_blank = value is None or not value.strip()
+        if is_blank and (form_field.is_required or form_field.kind == FieldKind.INCIDENT_NAME):
+            errors[form_field.block_id] = f"{form_field.label} is required"
+
+    return errors
@@ -3,6 +3,7 @@ from typing import Any
 
 import structlog
 
+from app.env import settings
 from app.models import Form, Incident, Organisation, User
 from app.models.form import FormKind
 from app.repos import FormRepo, IncidentRepo, SeverityRepo
@@ -12,8 +13,17 @@ from app.services.slack.interactions.create_incident import CreateIncidentIntera
 from app.services.slack.interactions.update_incident import UpdateIncidentInteraction
 from app.services.slack.user import SlackUserService
 
+from .deduplication import claim_once
+
 logger = structlog.get_logger(logger_name=__name__)
 
+SUBMITTED_VIEW_KEY_PREFIX = "slack-view-submission:"
+
+
+def claim_view_submission(view_id: str) -> bool:
+    """False if the view has already been submitted, so a retried submission can't create a second incident"""
+    return claim_once(SUBMITTED_VIEW_KEY_PREFIX + view_id, ttl=settings.SLACK_EVENT_DEDUPLICATION_SECONDS)
+
 
 class SlackInteractionService:
     def __init__(
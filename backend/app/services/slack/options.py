@@ -0,0 +1,126 @@
+import time
+from typing import Any
+
+import structlog
+from sqlalchemy.orm import Session
+
+from app.env import settings
+from app.models import FieldKind, Organisation
+from app.repos import FormRepo, IncidentRepo, SeverityRepo, UserRepo
+from app.services.slack.renderer.cache import get_form_version
+from app.services.slack.renderer.form import INCIDENTS_ACTION_ID, USERS_ACTION_ID
+
+logger = structlog.get_logger(logger_name=__name__)
+
+# most options slack will show for a select
+MAX_OPTIONS = 100
+MAX_OPTION_TEXT_LENGTH = 75
+
+
+def create_option(name: str, value: str) -> dict[str, Any]:
+    return {"text": {"type": "plain_text", "text": name[:MAX_OPTION_TEXT_LENGTH]}, "value": value}
+
+
+def filter_options(options: list[dict[str, Any]], query: str) -> list[dict[str, Any]]:
+    """Options matching what the user has typed so far, those starting with it first"""
+    query = query.strip().lower()
+    if not query:
+        return options[:MAX_OPTIONS]
+
+    starts_with = []
+    contains = []
+    for option in options:
+        text = option["text"]["text"].lower()
+        if text.startswith(query):
+            starts_with.append(option)
+        elif query in text:
+            contains.append(option)
+
+        if len(starts_with) >= MAX_OPTIONS:
+            break
+
+    return (starts_with + contains)[:MAX_OPTIONS]
+
+
+class FormFieldOptionsCache:
+    """Every option for a form field, cached per process for each version of the organisation's form configuration"""
+
+    def __init__(self, ttl_seconds: float, max_size: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.options: dict[tuple[str, int], tuple[float, list[dict[str, Any]]]] = {}
+
+    def _load(self, session: Session, organisation: Organisation, form_field_id: str) -> list[dict[str, Any]] | None:
+        form_field = FormRepo(session=session).get_form_field_by_id(form_field_id)
+        if not form_field or form_field.form.organisation_id != organisation.id:
+            return None
+
+        incident_repo = IncidentRepo(session=session)
+        match form_field.field.kind:
+            case FieldKind.INCIDENT_SEVERITY:
+                items = [(it.name, it.id) for it in SeverityRepo(session=session).get_all(organisation=organisation)]
+            case FieldKind.INCIDENT_TYPE:
+                items = [(it.name, it.id) for it in incident_repo.get_all_incident_types(organisation)]
+            case FieldKind.INCIDENT_STATUS:
+                items = [(it.name, it.id) for it in incident_repo.get_all_incident_statuses(organisation)]
+            case FieldKind.USER_DEFINED:
+                items = [(it, it) for it in form_field.field.available_options or []]
+            case _:
+                return None
+
+        return [create_option(name=name, value=value) for name, value in items]
+
+    def get(self, session: Session, organisation: Organisation, form_field_id: str) -> list[dict[str, Any]] | None:
+        version = get_form_version(organisation.id)
+        if version is None:
+            return self._load(session=session, organisation=organisation, form_field_id=form_field_id)
+
+        now = time.monotonic()
+        key = (form_field_id, version)
+        cached = self.options.get(key)
+        if cached and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        options = self._load(session=session, organisation=organisation, form_field_id=form_field_id)
+        if options is None:
+            return None
+
+        if len(self.options) >= self.max_size:
+            # oldest first, as entries are only ever appended
+            self.options.pop(next(iter(self.options)))
+        self.options.pop(key, None)
+        self.options[key] = (now, options)
+
+        return options
+
+
+form_field_options = FormFieldOptionsCache(ttl_seconds=settings.SLACK_FORM_RENDER_CACHE_SECONDS)
+
+
+class SlackOptionsService:
+    """Options for external selects, which slack requests as the user types"""
+
+    def __init__(self, session: Session, organisation: Organisation):
+        self.session = session
+        self.organisation = organisation
+
+    def get_options(self, action_id: str, query: str) -> list[dict[str, Any]]:
+        if action_id == USERS_ACTION_ID:
+            users = UserRepo(session=self.session).search_organisation_users(
+                organisation=self.organisation, query=query.strip(), limit=MAX_OPTIONS
+            )
+            return [create_option(name=it.name, value=it.id) for it in users]
+
+        if action_id == INCIDENTS_ACTION_ID:
+            incidents = IncidentRepo(session=self.session).search_incidents_by_name_or_reference(
+                organisation=self.organisation, query=query.strip(), limit=MAX_OPTIONS
+            )
+            return [create_option(name=f"{it.reference} {it.name}", value=it.id) for it in incidents]
+
+        # otherwise the select is for a form field, its action id is the form field's id
+        options = form_field_options.get(session=self.session, organisation=self.organisation, form_field_id=action_id)
+        if options is None:
+            logger.warning("No options for slack select", action_id=action_id)
+            return []
+
+        return filter_options(options, query=query)
@@ -0,0 +1,159 @@
+import time
+
+import structlog
+from redis import Redis, RedisError
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.env import settings
+from app.models import (
+    Field,
+    Form,
+    FormField,
+    FormKind,
+    Incident,
+    IncidentSeverity,
+    IncidentStatus,
+    IncidentType,
+    Lifecycle,
+    Organisation,
+)
+from app.repos import FormRepo, IncidentRepo, LifecycleRepo, SeverityRepo
+
+from .form import CompiledForm, FormRenderer, RenderContext
+
+logger = structlog.get_logger(logger_name=__name__)
+
+FORM_VERSION_KEY_PREFIX = "slack-form-version:"
+
+# session.info key for the organisations whose forms have changed in the current transaction
+CHANGED_FORM_ORGANISATIONS_KEY = "changed_form_organisations"
+
+# models which are rendered into a form, all but FormField belong directly to an organisation
+RENDERED_MODELS = (Form, Field, IncidentSeverity, IncidentType, IncidentStatus, Lifecycle)
+
+_redis: Redis | None = None
+
+
+def _get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    return _redis
+
+
+def get_form_version(organisation_id: str) -> int | None:
+    """Version of the organisation's form configuration, None if it can't be known"""
+    try:
+        return int(_get_redis().get(FORM_VERSION_KEY_PREFIX + organisation_id) or 0)
+    except RedisError as e:
+        logger.warning("Could not get slack form version", error=str(e))
+        return None
+
+
+class RenderedFormCache:
+    """Forms compiled per process, for each version of the organisation's form configuration
+
+    The version is bumped whenever anything rendered into a form changes, the TTL only bounds staleness from
+    changes made without the invalidation listeners registered.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.forms: dict[tuple[str, FormKind, int], tuple[float, CompiledForm]] = {}
+
+    def _compile(self, session: Session, organisation: Organisation, form_kind: FormKind) -> CompiledForm | None:
+        form = FormRepo(session=session).get_form(organisation=organisation, form_type=form_kind)
+        if not form:
+            return None
+
+        incident_repo = IncidentRepo(session=session)
+        form_renderer = FormRenderer(
+            severities=SeverityRepo(session=session).get_all(organisation=organisation),
+            incident_types=incident_repo.get_all_incident_types(organisation),
+            incident_statuses=incident_repo.get_all_incident_statuses(organisation),
+        )
+        lifecycle = LifecycleRepo(session=session).get_lifecycle_for_organisation_or_raise(organisation)
+
+        return form_renderer.compile(form=form, lifecycle=lifecycle)
+
+    def get(self, session: Session, organisation: Organisation, form_kind: FormKind) -> CompiledForm | None:
+        version = get_form_version(organisation.id)
+        if version is None:
+            return self._compile(session=session, organisation=organisation, form_kind=form_kind)
+
+        now = time.monotonic()
+        key = (organisation.id, form_kind, version)
+        cached = self.forms.get(key)
+        if cached and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        compiled = self._compile(session=session, organisation=organisation, form_kind=form_kind)
+        if not compiled:
+            return None
+
+        if len(self.forms) >= self.max_size:
+            # oldest first, as entries are only ever appended
+            self.forms.pop(next(iter(self.forms)))
+        self.forms.pop(key, None)
+        self.forms[key] = (now, compiled)
+
+        return compiled
+
+    def render(
+        self, session: Session, organisation: Organisation, form_kind: FormKind, incident: Incident | None = None
+    ) -> dict | None:
+        """The form's slack modal, None if the organisation doesn't have the form"""
+        compiled = self.get(session=session, organisation=organisation, form_kind=form_kind)
+        if not compiled:
+            return None
+
+        # severities etc. aren't needed to fill in an incident's values
+        return FormRenderer(severities=[], incident_types=[], incident_statuses=[]).apply_context(
+            compiled=compiled, context=RenderContext(incident=incident)
+        )
+
+
+rendered_forms = RenderedFormCache(ttl_seconds=settings.SLACK_FORM_RENDER_CACHE_SECONDS)
+
+
+def _track_form_changes(session: Session, flush_context) -> None:
+    organisation_ids: set[str] = session.info.setdefault(CHANGED_FORM_ORGANISATIONS_KEY, set())
+    form_ids: set[str] = set()
+
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, RENDERED_MODELS):
+            organisation_ids.add(instance.organisation_id)
+        elif isinstance(instance, FormField):
+            form_ids.add(instance.form_id)
+
+    if form_ids:
+        stmt = select(Form.organisation_id).where(Form.id.in_(form_ids))
+        organisation_ids.update(session.scalars(stmt))
+
+
+def _bump_form_versions(session: Session) -> None:
+    organisation_ids = session.info.pop(CHANGED_FORM_ORGANISATIONS_KEY, None)
+    if not organisation_ids:
+        return
+
+    try:
+        pipeline = _get_redis().pipeline(transaction=False)
+        for organisation_id in organisation_ids:
+            pipeline.incr(FORM_VERSION_KEY_PREFIX + organisation_id)
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning("Could not invalidate cached slack forms", error=str(e))
+
+
+def _discard_form_changes(session: Session) -> None:
+    session.info.pop(CHANGED_FORM_ORGANISATIONS_KEY, None)
+
+
+def register_form_invalidation() -> None:
+    """Invalidate cached slack forms once changes to what they show have been committed"""
+    if not event.contains(Session, "after_commit", _bump_form_versions):
+        event.listen(Session, "after_flush", _track_form_changes)
+        event.listen(Session, "after_commit", _bump_form_versions)
+        event.listen(Session, "after_rollback", _discard_form_changes)
@@ -1,9 +1,11 @@
 import json
+from dataclasses import dataclass
 from typing import Any, Sequence
 
 import structlog
 from pydantic import BaseModel, ConfigDict
 
+from app.env import settings
 from app.models import (
     FieldKind,
     Form,
@@ -16,10 +18,15 @@ from app.models import (
     InterfaceKind,
     Lifecycle,
     RequirementTypeEnum,
+    User,
 )
 
 logger = structlog.get_logger(logger_name=__name__)
 
+# action ids of selects which pick from the organisation's users or incidents, rather than a form field's options
+USERS_ACTION_ID = "users"
+INCIDENTS_ACTION_ID = "incidents"
+
 
 class RenderContext(BaseModel):
     incident: Incident | None = None
@@ -28,6 +35,47 @@ class RenderContext(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
+@dataclass(frozen=True)
+class CompiledForm:
+    """A rendered form without anything specific to an incident, which can be reused for any incident"""
+
+    modal: dict[str, Any]
+    # block id -> kind, for the blocks whose initial value is taken from the incident
+    incident_blocks: dict[str, FieldKind]
+
+
+# field kind -> incident relationship which gives its initial value
+INCIDENT_FIELD_RELATIONSHIPS = {
+    FieldKind.INCIDENT_SEVERITY: "incident_severity",
+    FieldKind.INCIDENT_TYPE: "incident_type",
+    FieldKind.INCIDENT_STATUS: "incident_status",
+}
+
+
+def create_users_select_element(initial_user: User | None = None) -> dict[str, Any]:
+    """Select one of the organisation's users, always loaded as the user types as there can be any number of them"""
+    element: dict[str, Any] = {"type": "external_select", "action_id": USERS_ACTION_ID, "min_query_length": 0}
+    if initial_user:
+        element["initial_option"] = {
+            "text": {"type": "plain_text", "text": initial_user.name},
+            "value": initial_user.id,
+        }
+
+    return element
+
+
+def create_incidents_select_element(initial_incident: Incident | None = None) -> dict[str, Any]:
+    """Select one of the organisation's incidents, always loaded as the user types"""
+    element: dict[str, Any] = {"type": "external_select", "action_id": INCIDENTS_ACTION_ID, "min_query_length": 0}
+    if initial_incident:
+        element["initial_option"] = {
+            "text": {"type": "plain_text", "text": f"{initial_incident.reference} {initial_incident.name}"},
+            "value": initial_incident.id,
+        }
+
+    return element
+
+
 class FormRenderer:
     def __init__(
         self,
@@ -40,11 +88,19 @@ class FormRenderer:
         self.incident_statuses = incident_statuses
 
     def render(self, form: Form, context: RenderContext | None = None) -> dict[str, Any]:
+        compiled = self.compile(form=form, lifecycle=context.lifecycle if context else None)
+        return self.apply_context(compiled=compiled, context=context)
+
+    def compile(self, form: Form, lifecycle: Lifecycle | None = None) -> CompiledForm:
+        context = RenderContext(lifecycle=lifecycle)
         blocks = []
+        incident_blocks: dict[str, FieldKind] = {}
         for field in form.form_fields:
             block = self._render_block(field, context)
             if block:
                 blocks.append(block)
+                if field.field.kind in INCIDENT_FIELD_RELATIONSHIPS:
+                    incident_blocks[block["block_id"]] = field.field.kind
 
         modal = {
             "type": "modal",
@@ -55,11 +111,43 @@ class FormRenderer:
             "private_metadata": json.dumps(
                 {
                     "form_id": form.id,
-                    "incident_id": context.incident.id if context and context.incident else None,
+                    "incident_id": None,
                 }
             ),
         }
 
+        return CompiledForm(modal=modal, incident_blocks=incident_blocks)
+
+    def apply_context(self, compiled: CompiledForm, context: RenderContext | None = None) -> dict[str, Any]:
+        """Fill in the values from the incident being rendered, leaving the compiled form untouched
+
+        Only the modal, its list of blocks and the blocks which are given a value are copied, everything else is
+        shared with the compiled form, so the result mustn't be changed in place.
+        """
+        modal = compiled.modal | {"blocks": list(compiled.modal["blocks"])}
+        if not context or not context.incident:
+            return modal
+
+        incident = context.incident
+        metadata = json.loads(modal["private_metadata"])
+        metadata["incident_id"] = incident.id
+        modal["private_metadata"] = json.dumps(metadata)
+
+        blocks = modal["blocks"]
+        for idx, block in enumerate(blocks):
+            kind = compiled.incident_blocks.get(block["block_id"])
+            if not kind:
+                continue
+
+            relationship = INCIDENT_FIELD_RELATIONSHIPS[kind]
+            value = getattr(incident, f"{relationship}_id")
+
+            # options already hold the name, so the incident's relationships usually don't need loading
+            option = next((it for it in block["element"].get("options", []) if it["value"] == value), None)
+            if not option:
+                option = self._create_option_value(name=getattr(incident, relationship).name, value=value)
+            blocks[idx] = block | {"element": block["element"] | {"initial_option": option}}
+
         return modal
 
     def _render_severity_type(self, form_field: FormField, context: RenderContext | None = None) -> dict:
@@ -89,11 +177,7 @@ class FormRenderer:
                 "type": "plain_text",
                 "text": form_field.label,
             },
-            "element": {
-                "type": "static_select",
-                "action_id": form_field.id,
-                "options": options,
-            },
+            "element": self._create_select_element(action_id=form_field.id, options=options),
             "optional": True if form_field.requirement_type == RequirementTypeEnum.OPTIONAL else False,
         }
 
@@ -123,12 +207,8 @@ class FormRenderer:
                 "type": "plain_text",
                 "text": form_field.label,
             },
-            "element": {
-                "type": "static_select",
-                "action_id": form_field.id,
-                "options": options,
-                "initial_option": initial_option,
-            },
+            "element": self._create_select_element(action_id=form_field.id, options=options)
+            | {"initial_option": initial_option},
             "optional": True if form_field.requirement_type == RequirementTypeEnum.OPTIONAL else False,
         }
 
@@ -189,11 +269,7 @@ class FormRenderer:
                 "type": "plain_text",
                 "text": form_field.label,
             },
-            "element": {
-                "type": "static_select",
-                "action_id": form_field.id,
-                "options": options,
-            },
+            "element": self._create_select_element(action_id=form_field.id, options=options),
             "optional": True if form_field.requirement_type == RequirementTypeEnum.OPTIONAL else False,
             "dispatch_action": True,
         }
@@ -293,6 +369,13 @@ class FormRenderer:
             "value": value,
         }
 
+    def _create_select_element(self, action_id: str, options: list[dict[str, Any]]) -> dict[str, Any]:
+        """Slack limits how many options a select can have, larger selects load their options as the user types"""
+        if len(options) > settings.SLACK_EXTERNAL_SELECT_THRESHOLD:
+            return {"type": "external_select", "action_id": action_id, "min_query_length": 0}
+
+        return {"type": "static_select", "action_id": action_id, "options": options}
+
     def _render_select_element(self, form_field: FormField, context: RenderContext | None = None) -> dict[str, Any]:
         options = []
         initial_option: dict | None = None
@@ -305,11 +388,7 @@ class FormRenderer:
         if form_field.default_value:
             initial_option = self._create_option_value(name=form_field.default_value, value=form_field.default_value)
 
-        element: dict[str, Any] = {
-            "type": "static_select",
-            "action_id": form_field.id,
-            "options": options,
-        }
+        element = self._create_select_element(action_id=form_field.id, options=options)
 
         if initial_option:
             element["initial_option"] = initial_option
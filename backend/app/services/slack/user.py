@@ -1,16 +1,29 @@
-from typing import Any
+import secrets
+from typing import Any, Iterable
 
+import bcrypt
 import structlog
-from slack_sdk import WebClient
+from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
 
 from app.models import MemberRole, Organisation, OrganisationTypes, User
 from app.repos import InviteRepo, OrganisationRepo, UserRepo
 from app.schemas.actions import CreateUserViaSlackSchema
 from app.schemas.resources import CreationResult, Credentials, OrganisationCreationResult
+from app.services.slack.web_client import SlackWebClient
 from app.utils import generate_password
 
 logger = structlog.get_logger(logger_name=__name__)
 
+# users_list is a tier 2 method, pages are as large as slack allows to keep the number of calls down
+USERS_LIST_PAGE_SIZE = 200
+
+
+def _is_person(member: dict[str, Any]) -> bool:
+    """Whether a member from users_list should have a user"""
+    if member.get("is_bot") or member.get("deleted") or member["id"] == "USLACKBOT":
+        return False
+    return bool(member.get("profile", {}).get("email"))
+
 
 class UserIsABotError(Exception):
     pass
@@ -23,15 +36,17 @@ class SlackUserService:
         self.invite_repo = invite_repo
 
     def get_or_create_user_from_slack_id(self, slack_id: str, organisation: Organisation) -> User:
-        """Get or create new user from slack user"""
-        client = WebClient(token=organisation.slack_bot_token)
+        """Get or create new user from slack user
 
+        Workspace members are normally already synced, slack is only asked about users who joined since the last sync.
+        """
         # user already exists
         user = self.user_repo.get_by_slack_user_id(slack_user_id=slack_id)
         if user:
             return user
 
         # otherwise create a new user
+        client = SlackWebClient(token=organisation.slack_bot_token)
         slack_user_response = client.users_info(user=slack_id)
         slack_user_response.validate()
 
@@ -63,13 +78,70 @@ class SlackUserService:
 
         return user
 
+    def sync_workspace_members(self, organisation: Organisation) -> int:
+        """Create users for every member of the organisation's slack workspace, returns the number of members synced"""
+        client = SlackWebClient(token=organisation.slack_bot_token)
+        client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=5))
+
+        # hashing is slow, synced users share a password nobody knows, they sign in through slack
+        password_hash = bcrypt.hashpw(secrets.token_bytes(16), bcrypt.gensalt()).decode()
+        total = 0
+        cursor: str | None = None
+
+        while True:
+            response = client.users_list(limit=USERS_LIST_PAGE_SIZE, cursor=cursor)
+            response.validate()
+
+            members = [member for member in response.get("members", []) if _is_person(member)]
+            total += self._sync_members(organisation=organisation, members=members, password_hash=password_hash)
+
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+
+        logger.info("Synced slack workspace members", organisation_id=organisation.id, total=total)
+
+        return total
+
+    def _sync_members(self, organisation: Organisation, members: Iterable[dict[str, Any]], password_hash: str) -> int:
+        members_by_slack_id = {member["id"]: member for member in members}
+        slack_ids_by_email = {
+            member["profile"]["email"].lower(): slack_id for slack_id, member in members_by_slack_id.items()
+        }
+
+        user_ids: dict[str, str] = {}
+        taken_emails: set[str] = set()
+        for user in self.user_repo.get_by_slack_user_ids_or_email_addresses(
+            slack_user_ids=members_by_slack_id.keys(), email_addresses=slack_ids_by_email.keys()
+        ):
+            taken_emails.add(user.email_address)
+            if user.slack_user_id in members_by_slack_id:
+                user_ids[user.slack_user_id] = user.id
+            elif not user.slack_user_id:
+                # signed up with the same email address before using slack
+                user.slack_user_id = slack_ids_by_email[user.email_address]
+                user_ids[user.slack_user_id] = user.id
+
+        new_members = [
+            (slack_id, member.get("real_name") or member["name"], member["profile"]["email"])
+            for slack_id, member in members_by_slack_id.items()
+            if slack_id not in user_ids and member["profile"]["email"].lower() not in taken_emails
+        ]
+        user_ids.update(self.user_repo.create_slack_users(members=new_members, password_hash=password_hash))
+
+        self.organisation_repo.add_members_if_not_exist(
+            user_ids=user_ids.values(), organisation=organisation, role=MemberRole.MEMBER
+        )
+
+        return len(user_ids)
+
     def complete_slack_login(self, token: str) -> CreationResult:
         """Used by slack login"""
         user_id_key = "https://slack.com/user_id"
         team_id_key = "https://slack.com/team_id"
         team_name_key = "https://slack.com/team_name"
 
-        client = WebClient(token=token)
+        client = SlackWebClient(token=token)
         response = client.openid_connect_userInfo()
         if not isinstance(response.data, dict):
             raise ValueError("Response data must be dict")
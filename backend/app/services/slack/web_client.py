@@ -0,0 +1,31 @@
+import time
+from typing import Any
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+from app.env import settings
+from app.metrics import outbound_request_duration, outbound_request_errors
+
+
+class SlackWebClient(WebClient):
+    """WebClient which records the latency and errors of every Slack API call"""
+
+    def __init__(self, token: str | None = None, **kwargs: Any):
+        kwargs.setdefault("base_url", settings.SLACK_API_URL)
+        super().__init__(token=token, **kwargs)
+
+    def api_call(self, api_method: str, **kwargs: Any) -> SlackResponse:  # type: ignore[override]
+        start = time.perf_counter()
+        try:
+            return super().api_call(api_method, **kwargs)
+        except SlackApiError as e:
+            error = e.response.get("error") or str(e.response.status_code)
+            outbound_request_errors.labels(service="slack", operation=api_method, error=error).inc()
+            raise
+        except Exception as e:
+            outbound_request_errors.labels(service="slack", operation=api_method, error=type(e).__name__).inc()
+            raise
+        finally:
+            outbound_request_duration.labels(service="slack", operation=api_method).observe(time.perf_counter() - start)
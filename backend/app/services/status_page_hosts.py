@@ -0,0 +1,172 @@
+"""Which status page is served on a host, cached so public requests don't query for it
+
+Hosts are cached in redis, shared by every process, and in each process for a short time on top. Unknown hosts
+are cached too, scanners requesting random hostnames would otherwise each cost a query. Redis entries are deleted
+once a change to a page's slug or custom domain is committed, other processes pick it up when their entry expires.
+"""
+
+import time
+
+import structlog
+from redis import Redis, RedisError
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.db import session_factory
+from app.env import settings
+from app.models import StatusPage
+from app.repos import StatusPageRepo
+
+logger = structlog.get_logger(logger_name=__name__)
+
+HOST_KEY_PREFIX = "status-page-host:"
+
+# session.info key for the hosts whose status page may have changed in the current transaction
+CHANGED_HOSTS_KEY = "changed_status_page_hosts"
+
+# stored for hosts without a status page
+_NOT_FOUND = ""
+
+_redis: Redis | None = None
+
+
+def _get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    return _redis
+
+
+def normalise_host(host: str) -> str:
+    """Hosts are case insensitive and may have a port or a trailing dot"""
+    return host.strip().lower().split(":")[0].rstrip(".")
+
+
+def _get_hosts(slug: str | None, custom_domain: str | None) -> set[str]:
+    """Every host a page with the slug and custom domain is served on"""
+    hosts: set[str] = set()
+    if slug:
+        hosts.update([slug, f"{slug}.{settings.STATUS_PAGE_DOMAIN}"])
+    if custom_domain:
+        hosts.add(custom_domain)
+
+    return {normalise_host(host) for host in hosts}
+
+
+class StatusPageHostCache:
+    def __init__(
+        self, ttl_seconds: float, not_found_ttl_seconds: float, local_ttl_seconds: float, max_size: int = 10000
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.not_found_ttl_seconds = not_found_ttl_seconds
+        self.local_ttl_seconds = local_ttl_seconds
+        self.max_size = max_size
+        self.status_page_ids: dict[str, tuple[float, str | None]] = {}
+
+    def _get_shared(self, host: str) -> str | None:
+        """The cached status page ID, empty when the host has none, None when it isn't cached"""
+        try:
+            cached = _get_redis().get(HOST_KEY_PREFIX + host)
+        except RedisError as e:
+            logger.warning("Could not get cached status page host", error=str(e))
+            return None
+
+        return cached.decode() if cached is not None else None
+
+    def _set_shared(self, host: str, status_page_id: str | None) -> None:
+        ttl = self.ttl_seconds if status_page_id else self.not_found_ttl_seconds
+        try:
+            _get_redis().set(HOST_KEY_PREFIX + host, status_page_id or _NOT_FOUND, ex=int(ttl))
+        except RedisError as e:
+            logger.warning("Could not cache status page host", error=str(e))
+
+    def _set_local(self, host: str, status_page_id: str | None, now: float) -> None:
+        if len(self.status_page_ids) >= self.max_size:
+            # oldest first, as entries are only ever appended
+            self.status_page_ids.pop(next(iter(self.status_page_ids)))
+        self.status_page_ids.pop(host, None)
+        self.status_page_ids[host] = (now, status_page_id)
+
+    def get_status_page_id(self, host: str) -> str | None:
+        """ID of the status page served on the host, None if there isn't one
+
+        Misses are looked up on the primary, a replica which is behind could cache a page that's just been created
+        as not found.
+        """
+        host = normalise_host(host)
+        now = time.monotonic()
+        cached = self.status_page_ids.get(host)
+        if cached and now - cached[0] < self.local_ttl_seconds:
+            return cached[1]
+
+        shared = self._get_shared(host)
+        if shared is not None:
+            status_page_id = shared or None
+        else:
+            with session_factory() as session:
+                status_page_id = StatusPageRepo(session=session).get_id_by_host(host)
+            self._set_shared(host, status_page_id)
+
+        self._set_local(host, status_page_id, now=now)
+        return status_page_id
+
+    def invalidate(self, hosts: set[str]) -> None:
+        for host in hosts:
+            self.status_page_ids.pop(host, None)
+
+        try:
+            _get_redis().delete(*[HOST_KEY_PREFIX + host for host in hosts])
+        except RedisError as e:
+            logger.warning("Could not invalidate cached status page hosts", error=str(e))
+
+
+status_page_hosts = StatusPageHostCache(
+    ttl_seconds=settings.STATUS_PAGE_HOST_CACHE_SECONDS,
+    not_found_ttl_seconds=settings.STATUS_PAGE_HOST_NOT_FOUND_CACHE_SECONDS,
+    local_ttl_seconds=settings.STATUS_PAGE_HOST_LOCAL_CACHE_SECONDS,
+)
+
+
+def _track_host_changes(session: Session, flush_context, instances) -> None:
+    """Collect hosts before flushing, while the database still has the ones pages were served on until now"""
+    hosts: set[str] = session.info.setdefault(CHANGED_HOSTS_KEY, set())
+    status_page_ids: list[str] = []
+
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(instance, StatusPage):
+            continue
+
+        state = inspect(instance)
+        if instance in session.dirty and not any(
+            state.attrs[attribute].history.has_changes() for attribute in ("slug", "custom_domain", "deleted_at")
+        ):
+            continue
+
+        # new values, attributes which haven't been loaded are unchanged and come from the database below
+        hosts.update(_get_hosts(slug=state.dict.get("slug"), custom_domain=state.dict.get("custom_domain")))
+        if state.identity:
+            status_page_ids.append(state.identity[0])
+
+    if status_page_ids:
+        stmt = select(StatusPage.slug, StatusPage.custom_domain).where(StatusPage.id.in_(status_page_ids))
+        with session.no_autoflush:
+            for slug, custom_domain in session.execute(stmt):
+                hosts.update(_get_hosts(slug=slug, custom_domain=custom_domain))
+
+
+def _invalidate_changed_hosts(session: Session) -> None:
+    hosts = session.info.pop(CHANGED_HOSTS_KEY, None)
+    if hosts:
+        status_page_hosts.invalidate(hosts)
+
+
+def _discard_host_changes(session: Session) -> None:
+    session.info.pop(CHANGED_HOSTS_KEY, None)
+
+
+def register_host_invalidation() -> None:
+    """Drop cached hosts of status pages once changes to their slug or custom domain have been committed"""
+    if not event.contains(Session, "after_commit", _invalidate_changed_hosts):
+        event.listen(Session, "before_flush", _track_host_changes)
+        event.listen(Session, "after_commit", _invalidate_changed_hosts)
+        event.listen(Session, "after_rollback", _discard_host_changes)
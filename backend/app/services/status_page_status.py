@@ -0,0 +1,172 @@
+"""Current status of public status pages, for widgets, badges and monitors which poll often
+
+Each page has a version in redis which is bumped whenever anything its current status is made from is committed.
+The serialized status is cached per process for each version, and the version is the ETag, so pollers get a 304
+until something changes.
+"""
+
+import time
+
+import structlog
+from redis import Redis, RedisError
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.env import settings
+from app.models import ComponentStatus, StatusPage, StatusPageComponent, StatusPageComponentEvent, StatusPageIncident
+from app.repos import StatusPageRepo
+from app.schemas.actions import PaginationParamsSchema
+from app.schemas.resources import ActiveIncidentSummarySchema, StatusPageCurrentStatusSchema
+
+logger = structlog.get_logger(logger_name=__name__)
+
+STATUS_VERSION_KEY_PREFIX = "status-page-status-version:"
+
+# session.info key for the status pages whose current status may have changed in the current transaction
+CHANGED_STATUS_PAGES_KEY = "changed_status_pages"
+
+# most active incidents listed, a page with more than this is having a very bad day
+MAX_ACTIVE_INCIDENTS = 20
+
+_redis: Redis | None = None
+
+
+def _get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    return _redis
+
+
+def get_status_version(status_page_id: str) -> int | None:
+    """Version of the page's current status, None if it can't be known
+
+    Versions are the time they were set in nanoseconds rather than a count, so a version key which has been evicted
+    doesn't start again from a version clients already hold an ETag for.
+    """
+    key = STATUS_VERSION_KEY_PREFIX + status_page_id
+    try:
+        redis = _get_redis()
+        version = redis.get(key)
+        if version is None:
+            pipeline = redis.pipeline(transaction=False)
+            pipeline.set(key, time.time_ns(), nx=True)
+            pipeline.get(key)
+            version = pipeline.execute()[1]
+        return int(version)
+    except RedisError as e:
+        logger.warning("Could not get status page status version", error=str(e))
+        return None
+
+
+def create_etag(status_page_id: str, version: int) -> str:
+    return f'"{status_page_id}.{version}"'
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Whether the If-None-Match header includes the ETag, weak comparison as the body is always the same"""
+    if not if_none_match:
+        return False
+
+    candidates = [it.strip().removeprefix("W/") for it in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def get_current_status(session: Session, status_page: StatusPage) -> StatusPageCurrentStatusSchema:
+    status_page_repo = StatusPageRepo(session=session)
+    components = status_page_repo.get_public_component_statuses(status_page=status_page)
+    incidents = status_page_repo.get_incidents(
+        status_page=status_page, pagination=PaginationParamsSchema(page=1, size=MAX_ACTIVE_INCIDENTS), is_active=True
+    )
+
+    return StatusPageCurrentStatusSchema(
+        status=ComponentStatus.most_severe(components.values()),
+        components=components,
+        incidents=[
+            ActiveIncidentSummarySchema(id=incident.id, name=incident.name, status=incident.status)
+            for incident in incidents
+        ],
+    )
+
+
+class CurrentStatusCache:
+    """Serialized current status cached per process, for each version of the page's status
+
+    The TTL only bounds staleness from changes made without the invalidation listeners registered.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.statuses: dict[tuple[str, int], tuple[float, bytes]] = {}
+
+    def _serialize(self, session: Session, status_page_id: str) -> bytes:
+        status_page = StatusPageRepo(session=session).get_by_id_or_raise(id=status_page_id)
+        current_status = get_current_status(session=session, status_page=status_page)
+        return current_status.model_dump_json(by_alias=True).encode()
+
+    def get(self, session: Session, status_page_id: str, version: int | None) -> bytes:
+        if version is None:
+            return self._serialize(session=session, status_page_id=status_page_id)
+
+        now = time.monotonic()
+        key = (status_page_id, version)
+        cached = self.statuses.get(key)
+        if cached and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        content = self._serialize(session=session, status_page_id=status_page_id)
+
+        if len(self.statuses) >= self.max_size:
+            # oldest first, as entries are only ever appended
+            self.statuses.pop(next(iter(self.statuses)))
+        self.statuses.pop(key, None)
+        self.statuses[key] = (now, content)
+
+        return content
+
+
+current_statuses = CurrentStatusCache(ttl_seconds=settings.STATUS_PAGE_STATUS_CACHE_SECONDS)
+
+
+def _track_status_changes(session: Session, flush_context) -> None:
+    status_page_ids: set[str] = session.info.setdefault(CHANGED_STATUS_PAGES_KEY, set())
+    component_ids: set[str] = set()
+
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, StatusPage):
+            status_page_ids.add(instance.id)
+        elif isinstance(instance, (StatusPageComponent, StatusPageIncident)):
+            status_page_ids.add(instance.status_page_id)
+        elif isinstance(instance, StatusPageComponentEvent):
+            component_ids.add(instance.status_page_component_id)
+
+    if component_ids:
+        stmt = select(StatusPageComponent.status_page_id).where(StatusPageComponent.id.in_(component_ids))
+        status_page_ids.update(session.scalars(stmt))
+
+
+def _bump_status_versions(session: Session) -> None:
+    status_page_ids = session.info.pop(CHANGED_STATUS_PAGES_KEY, None)
+    if not status_page_ids:
+        return
+
+    try:
+        pipeline = _get_redis().pipeline(transaction=False)
+        for status_page_id in status_page_ids:
+            pipeline.set(STATUS_VERSION_KEY_PREFIX + status_page_id, time.time_ns())
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning("Could not invalidate cached status page statuses", error=str(e))
+
+
+def _discard_status_changes(session: Session) -> None:
+    session.info.pop(CHANGED_STATUS_PAGES_KEY, None)
+
+
+def register_status_invalidation() -> None:
+    """Invalidate the cached current status of pages once changes to it have been committed"""
+    if not event.contains(Session, "after_commit", _bump_status_versions):
+        event.listen(Session, "after_flush", _track_status_changes)
+        event.listen(Session, "after_commit", _bump_status_versions)
+        event.listen(Session, "after_rollback", _discard_status_changes)
@@ -0,0 +1,231 @@
+"""Uptime of status page components, computed from their events
+
+A component's events can overlap, for example when it's affected by two incidents at once. They're merged so each
+moment is counted once, in the worst status the component was in at the time. All the components of a page are
+computed in one pass over the events, working with timestamps rather than datetimes.
+"""
+
+import bisect
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from types import MappingProxyType
+from typing import Iterable, Mapping, Sequence
+
+from app.models import ComponentStatus
+
+# fraction of the time spent in each status which counts as downtime
+DOWNTIME_WEIGHTS: Mapping[ComponentStatus, float] = MappingProxyType(
+    {
+        ComponentStatus.OPERATIONAL: 0.0,
+        ComponentStatus.DEGRADED_PERFORMANCE: 0.0,
+        ComponentStatus.PARTIAL_OUTAGE: 0.3,
+        ComponentStatus.FULL_OUTAGE: 1.0,
+    }
+)
+
+# statuses indexed by their rank, so the sweep only deals with ints
+_STATUSES = sorted(ComponentStatus, key=ComponentStatus.ranked)
+_RANKS = {status: rank for rank, status in enumerate(_STATUSES)}
+_WEIGHTS = [DOWNTIME_WEIGHTS[status] for status in _STATUSES]
+# worst first, operational isn't tracked
+_OUTAGE_RANKS = range(len(_STATUSES) - 1, 0, -1)
+_DEGRADED, _PARTIAL, _FULL = (
+    _RANKS[ComponentStatus.DEGRADED_PERFORMANCE],
+    _RANKS[ComponentStatus.PARTIAL_OUTAGE],
+    _RANKS[ComponentStatus.FULL_OUTAGE],
+)
+
+# component ID, status, started at, ended at
+ComponentEvent = tuple[str, ComponentStatus, datetime, datetime | None]
+
+
+@dataclass(frozen=True)
+class ComponentUptime:
+    uptime: float
+    downtime_seconds: float
+    # only non-operational statuses the component was in
+    seconds_by_status: Mapping[ComponentStatus, float]
+    worst_status_by_day: Sequence[ComponentStatus]
+
+    def meets_target(self, target: float) -> bool:
+        """Whether the uptime meets an SLA target, 0.999 is three nines"""
+        return self.uptime >= target
+
+
+@dataclass(frozen=True)
+class UptimeReport:
+    start: datetime
+    end: datetime
+    days: list[date]
+    components: dict[str, ComponentUptime]
+
+    @property
+    def uptimes(self) -> dict[str, float]:
+        return {component_id: it.uptime for component_id, it in self.components.items()}
+
+
+def _get_days(start: datetime, end: datetime, tz: tzinfo) -> tuple[list[date], list[float]]:
+    """Days in the timezone which overlap the period, with the timestamp each day starts at"""
+    days: list[date] = []
+    day_starts: list[float] = []
+    day = start.astimezone(tz).date()
+    end_timestamp = end.timestamp()
+
+    while True:
+        day_start = datetime.combine(day, time.min, tzinfo=tz).timestamp()
+        if day_start >= end_timestamp:
+            break
+        days.append(day)
+        day_starts.append(day_start)
+        day += timedelta(days=1)
+
+    return days, day_starts
+
+
+def _sweep(
+    boundaries: list[tuple[float, int, int]],
+    day_starts: list[float],
+    period: float,
+    operational_days: list[ComponentStatus],
+) -> ComponentUptime:
+    """Walk through the boundaries of a component's events in time order, tracking which statuses are active"""
+    boundaries.sort()
+    active = [0] * len(_STATUSES)
+    seconds = [0.0] * len(_STATUSES)
+    # only the days with outages are changed, copying is far quicker than building a list for every day
+    worst_by_day = operational_days.copy()
+    previous = boundaries[0][0]
+
+    for at, rank, change in boundaries:
+        if at > previous:
+            # the worst active status, this runs for every boundary so it's spelt out
+            current = (
+                _FULL if active[_FULL] else _PARTIAL if active[_PARTIAL] else _DEGRADED if active[_DEGRADED] else 0
+            )
+            if current:
+                seconds[current] += at - previous
+                if day_starts:
+                    first_day = bisect.bisect_right(day_starts, previous) - 1
+                    last_day = bisect.bisect_left(day_starts, at) - 1
+                    for day in range(first_day, last_day + 1):
+                        if _RANKS[worst_by_day[day]] < current:
+                            worst_by_day[day] = _STATUSES[current]
+            previous = at
+        active[rank] += change
+
+    downtime = 0.0
+    seconds_by_status: dict[ComponentStatus, float] = {}
+    for rank in _OUTAGE_RANKS:
+        if seconds[rank]:
+            downtime += seconds[rank] * _WEIGHTS[rank]
+            seconds_by_status[_STATUSES[rank]] = seconds[rank]
+
+    return ComponentUptime(
+        uptime=1 - downtime / period,
+        downtime_seconds=downtime,
+        seconds_by_status=seconds_by_status,
+        worst_status_by_day=worst_by_day,
+    )
+
+
+def calculate_uptime_report(
+    component_ids: Iterable[str],
+    events: Iterable[ComponentEvent],
+    start: datetime,
+    end: datetime,
+    tz: tzinfo = timezone.utc,
+    by_day: bool = True,
+) -> UptimeReport:
+    """Uptime, time in each status and the worst status of each day, for every component over the period
+
+    Events are clipped to the period, those which haven't ended count until its end. Days are in the given
+    timezone, the first and last may only partly fall within the period. Without `by_day` there are no days, for
+    callers which only want the totals.
+    """
+    start_timestamp = start.timestamp()
+    end_timestamp = end.timestamp()
+    period = end_timestamp - start_timestamp
+    days, day_starts = _get_days(start, end, tz) if by_day else ([], [])
+
+    # start and end of each event as (timestamp, status rank, change in events active), by component
+    boundaries: dict[str, list[tuple[float, int, int]]] = {}
+    for component_id, status, started_at, ended_at in events:
+        rank = _RANKS[status]
+        started = max(started_at.timestamp(), start_timestamp)
+        ended = min(ended_at.timestamp(), end_timestamp) if ended_at else end_timestamp
+        if not rank or started >= ended:
+            continue
+
+        component_boundaries = boundaries.setdefault(component_id, [])
+        component_boundaries.append((started, rank, 1))
+        component_boundaries.append((ended, rank, -1))
+
+    # most components have no events, they all share the same result
+    operational = ComponentUptime(
+        uptime=1.0,
+        downtime_seconds=0.0,
+        seconds_by_status=MappingProxyType({}),
+        worst_status_by_day=(ComponentStatus.OPERATIONAL,) * len(days),
+    )
+    components = {component_id: operational for component_id in component_ids}
+    operational_days = [ComponentStatus.OPERATIONAL] * len(days)
+    for component_id, component_boundaries in boundaries.items():
+        components[component_id] = _sweep(
+            component_boundaries, day_starts=day_starts, period=period, operational_days=operational_days
+        )
+
+    return UptimeReport(start=start, end=end, days=days, components=components)
+
+
+def get_utc_days(started_at: datetime, ended_at: datetime) -> list[date]:
+    """UTC days an event overlaps, an event ending at midnight doesn't overlap the day that starts then"""
+    first = started_at.astimezone(timezone.utc).date()
+    last = (ended_at.astimezone(timezone.utc) - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def calculate_daily_uptimes(
+    events: Sequence[ComponentEvent], days: Iterable[date]
+) -> dict[tuple[str, date], ComponentUptime]:
+    """Uptime for each UTC day, of every component which has events that day
+
+    Each day is computed from all the events overlapping it, so a day's figures don't depend on which of its events
+    were looked at together.
+    """
+    results: dict[tuple[str, date], ComponentUptime] = {}
+    for day in sorted(set(days)):
+        start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        end = start + timedelta(days=1)
+        day_events = [it for it in events if it[2] < end and (it[3] is None or it[3] > start)]
+        report = calculate_uptime_report(
+            component_ids={it[0] for it in day_events}, events=day_events, start=start, end=end
+        )
+        for component_id, uptime in report.components.items():
+            results[(component_id, day)] = uptime
+
+    return results
+
+
+def calculate_long_range_uptimes(
+    component_ids: Iterable[str],
+    summaries: Iterable[tuple[str, Mapping[ComponentStatus, float]]],
+    events: Iterable[ComponentEvent],
+    start: datetime,
+    summarised_until: datetime,
+    end: datetime,
+) -> dict[str, float]:
+    """Uptime over a period which reaches back past the retention horizon
+
+    Days from the start until summarised_until come from the daily summaries, as their events may have been archived,
+    the rest from the events. Both start and summarised_until must be midnight UTC.
+    """
+    report = calculate_uptime_report(component_ids=component_ids, events=events, start=summarised_until, end=end)
+    downtime = {component_id: it.downtime_seconds for component_id, it in report.components.items()}
+    for component_id, seconds_by_status in summaries:
+        if component_id in downtime:
+            downtime[component_id] += sum(
+                seconds * DOWNTIME_WEIGHTS[status] for status, seconds in seconds_by_status.items()
+            )
+
+    period = (end - start).total_seconds()
+    return {component_id: 1 - seconds / period for component_id, seconds in downtime.items()}
@@ -2,18 +2,21 @@ import httpx
 import structlog
 from httpx import Response
 
+from app.env import settings
+from app.metrics import InstrumentedAsyncTransport, InstrumentedTransport
 from app.services.vercel.models import DomainConfig, ListProjectDomainsResponse, ProjectDomain
 
 logger = structlog.get_logger(logger_name=__name__)
 
 
 class VercelClient:
-    def __init__(self, token: str, timeout: int = 10, base_url: str = "https://api.vercel.com"):
+    def __init__(self, token: str, timeout: int = 10, base_url: str | None = None):
         self.token = token
         self.client = httpx.Client(
-            base_url=base_url,
+            base_url=base_url or settings.VERCEL_API_URL,
             headers={"Authorization": f"Bearer {token}"},
             timeout=timeout,
+            transport=InstrumentedTransport(service="vercel"),
         )
         # add a hook to log errors to the console
         self.client.event_hooks["response"].append(self.log_error)
@@ -59,3 +62,43 @@ class VercelClient:
         response = self.client.delete(f"/v9/projects/{project_id}/domains/{domain_id}")
         response.raise_for_status()
         return response
+
+
+class AsyncVercelClient:
+    """Client for calls made concurrently, one is shared by all of them so connections to the API are reused"""
+
+    def __init__(
+        self,
+        token: str,
+        timeout: int = 10,
+        base_url: str | None = None,
+        max_connections: int = 10,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.client = httpx.AsyncClient(
+            base_url=base_url or settings.VERCEL_API_URL,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=timeout,
+            transport=transport
+            or InstrumentedAsyncTransport(service="vercel", limits=httpx.Limits(max_connections=max_connections)),
+        )
+
+    async def __aenter__(self) -> "AsyncVercelClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.client.aclose()
+
+    async def get_domain_config(self, domain_id: str) -> DomainConfig:
+        """Get the configuration for a domain."""
+        response = await self.client.get(f"/v6/domains/{domain_id}/config")
+        if response.is_error:
+            logger.error(
+                "Request failed",
+                status_code=response.status_code,
+                url=response.url,
+                method=response.request.method,
+                response_text=response.text,
+            )
+        response.raise_for_status()
+        return DomainConfig.model_validate(response.json())
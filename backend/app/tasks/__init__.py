@@ -1,8 +1,10 @@
 # flake8: noqa: F401
+from .archive_component_events import ArchiveComponentEventsTask
 from .create_announcement import CreateAnnouncementTask
 from .create_incident_update import CreateIncidentUpdateTask
 from .create_pinned_message import CreatePinnedMessageTask
 from .create_slack_message import CreateSlackMessageTask
+from .flush_emails import FlushEmailsTask
 from .incident_declared import IncidentDeclaredTask
 from .incident_status_updated import IncidentStatusUpdatedTask
 from .invite_user_to_channel import InviteUserToChannelTask
@@ -10,6 +12,9 @@ from .join_channel import JoinChannelTask
 from .send_invite import SendInviteEmailTask
 from .send_verification_email import SendVerificationEmailTask
 from .set_channel_topic import SetChannelTopicTask
+from .slack_event import HandleSlackEventTask
+from .slack_interaction import HandleSlackInteractionTask
 from .slash_command import HandleSlashCommandTask
 from .sync_bookmarks import SyncBookmarksTask
+from .sync_slack_users import SyncSlackUsersTask
 from .verify_custom_domain import VerifyCustomDomainTask
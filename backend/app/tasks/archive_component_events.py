@@ -0,0 +1,81 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Sequence
+
+import structlog
+
+from app.env import settings
+from app.models import ComponentStatus, StatusPageComponentEvent
+from app.repos import StatusPageRepo
+from app.schemas.tasks import ArchiveComponentEventsParameters
+from app.services.uptime import calculate_daily_uptimes, get_utc_days
+
+from .base import BaseTask
+
+logger = structlog.get_logger(logger_name=__name__)
+
+
+class ArchiveComponentEventsTask(BaseTask["ArchiveComponentEventsParameters"]):
+    """Move component events older than the retention horizon into the archive, keeping daily summaries"""
+
+    def execute(self, parameters: "ArchiveComponentEventsParameters") -> None:
+        status_page_repo = StatusPageRepo(self.session)
+        horizon = datetime.now(tz=timezone.utc) - timedelta(days=settings.STATUS_PAGE_EVENT_RETENTION_DAYS)
+        total = 0
+
+        while True:
+            events = status_page_repo.get_component_events_ended_before(before=horizon, limit=parameters.batch_size)
+            self._summarise(status_page_repo, events)
+            status_page_repo.archive_component_events(events)
+            self.session.commit()
+
+            total += len(events)
+            if len(events) < parameters.batch_size:
+                break
+
+        logger.info("Archived component events", total=total, horizon=horizon)
+
+    def _summarise(self, status_page_repo: StatusPageRepo, events: Sequence[StatusPageComponentEvent]) -> None:
+        """Recompute the summaries of the days the events overlap, from every event on those days
+
+        Days are recomputed in full rather than added to, so events which overlap, whether archived in this batch, an
+        earlier one or not yet, are only counted once.
+        """
+        days_by_component: dict[str, set[date]] = {}
+        for event in events:
+            if event.deleted_at or not event.ended_at or event.status == ComponentStatus.OPERATIONAL:
+                continue
+            days_by_component.setdefault(event.status_page_component_id, set()).update(
+                get_utc_days(event.started_at, event.ended_at)
+            )
+
+        if not days_by_component:
+            return
+
+        days = set().union(*days_by_component.values())
+        intervals = status_page_repo.get_component_event_intervals(
+            component_ids=list(days_by_component.keys()),
+            start=datetime.combine(min(days), time.min, tzinfo=timezone.utc),
+            end=datetime.combine(max(days) + timedelta(days=1), time.min, tzinfo=timezone.utc),
+        )
+        daily_uptimes = calculate_daily_uptimes(intervals, days=days)
+
+        rows = []
+        for component_id, component_days in days_by_component.items():
+            for day in component_days:
+                uptime = daily_uptimes.get((component_id, day))
+                if not uptime:
+                    continue
+                rows.append(
+                    {
+                        "status_page_component_id": component_id,
+                        "day": day,
+                        "degraded_performance_seconds": uptime.seconds_by_status.get(
+                            ComponentStatus.DEGRADED_PERFORMANCE, 0.0
+                        ),
+                        "partial_outage_seconds": uptime.seconds_by_status.get(ComponentStatus.PARTIAL_OUTAGE, 0.0),
+                        "full_outage_seconds": uptime.seconds_by_status.get(ComponentStatus.FULL_OUTAGE, 0.0),
+                        "worst_status": uptime.worst_status_by_day[0],
+                    }
+                )
+
+        status_page_repo.save_component_daily_summaries(rows)
@@ -1,9 +1,15 @@
+from sqlalchemy.orm import configure_mappers
+
 from app.db import session_factory
 from app.schemas.tasks import (
+    ArchiveComponentEventsParameters,
     CreateAnnouncementTaskParameters,
     CreateIncidentUpdateParameters,
     CreatePinnedMessageTaskParameters,
     CreateSlackMessageTaskParameters,
+    FlushEmailsParameters,
+    HandleSlackEventTaskParameters,
+    HandleSlackInteractionTaskParameters,
     HandleSlashCommandTaskParameters,
     IncidentDeclaredTaskParameters,
     IncidentStatusUpdatedTaskParameters,
@@ -13,13 +19,22 @@ from app.schemas.tasks import (
     SendVerificationEmailParameters,
     SetChannelTopicParameters,
     SyncBookmarksTaskParameters,
+    SyncSlackUsersParameters,
     VerifyCustomDomainParameters,
 )
+from app.services.live_stream import register_publisher
+from app.services.slack.renderer.cache import register_form_invalidation
+from app.services.status_page_hosts import register_host_invalidation
+from app.services.status_page_status import register_status_invalidation
 from app.tasks import (
+    ArchiveComponentEventsTask,
     CreateAnnouncementTask,
     CreateIncidentUpdateTask,
     CreatePinnedMessageTask,
     CreateSlackMessageTask,
+    FlushEmailsTask,
+    HandleSlackEventTask,
+    HandleSlackInteractionTask,
     HandleSlashCommandTask,
     IncidentDeclaredTask,
     IncidentStatusUpdatedTask,
@@ -29,10 +44,20 @@ from app.tasks import (
     SendVerificationEmailTask,
     SetChannelTopicTask,
     SyncBookmarksTask,
+    SyncSlackUsersTask,
     VerifyCustomDomainTask,
 )
 from app.worker import celery
 
+# push changes made by tasks to live clients
+register_publisher()
+register_form_invalidation()
+register_status_invalidation()
+register_host_invalidation()
+
+# done once before the worker forks, rather than in every child on its first task
+configure_mappers()
+
 
 @celery.task()
 def create_announcement(params: CreateAnnouncementTaskParameters):
@@ -65,6 +90,18 @@ def handle_slash_command(params: HandleSlashCommandTaskParameters):
         HandleSlashCommandTask(session=session).execute(parameters=params)
 
 
+@celery.task
+def handle_slack_event(params: HandleSlackEventTaskParameters):
+    with session_factory() as session:
+        HandleSlackEventTask(session=session).execute(parameters=params)
+
+
+@celery.task
+def handle_slack_interaction(params: HandleSlackInteractionTaskParameters):
+    with session_factory() as session:
+        HandleSlackInteractionTask(session=session).execute(parameters=params)
+
+
 @celery.task
 def create_incident_update(params: CreateIncidentUpdateParameters):
     with session_factory() as session:
@@ -118,3 +155,30 @@ def check_custom_domains():
 def send_invite(params: SendInviteTaskParameters):
     with session_factory() as session:
         SendInviteEmailTask(session=session).execute(parameters=params)
+
+
+@celery.task
+def archive_component_events():
+    with session_factory() as session:
+        params = ArchiveComponentEventsParameters()
+        ArchiveComponentEventsTask(session=session).execute(parameters=params)
+
+
+@celery.task
+def flush_emails():
+    with session_factory() as session:
+        params = FlushEmailsParameters()
+        FlushEmailsTask(session=session).execute(parameters=params)
+
+
+@celery.task
+def sync_slack_users(params: SyncSlackUsersParameters):
+    with session_factory() as session:
+        SyncSlackUsersTask(session=session).execute(parameters=params)
+
+
+@celery.task
+def sync_all_slack_users():
+    with session_factory() as session:
+        params = SyncSlackUsersParameters()
+        SyncSlackUsersTask(session=session).execute(parameters=params)
@@ -6,6 +6,7 @@ from app.models.slack_message import SlackMessageKind
 from app.repos import AnnouncementRepo, IncidentRepo, SlackMessageRepo
 from app.schemas.tasks import CreateAnnouncementTaskParameters
 from app.services.slack.renderer import AnnouncementRenderer
+from app.services.slack.web_client import SlackWebClient
 
 from .base import BaseTask
 
@@ -26,7 +27,7 @@ class CreateAnnouncementTask(BaseTask["CreateAnnouncementTaskParameters"]):
         if not announcement:
             raise Exception("announcement not setup for organisation")
 
-        client = WebClient(token=incident.organisation.slack_bot_token)
+        client = SlackWebClient(token=incident.organisation.slack_bot_token)
 
         # create channel first
         channel_id = self.create_channel_if_not_exists(
@@ -1,11 +1,11 @@
 import structlog
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
 from app.models.slack_message import SlackMessageKind
 from app.repos import IncidentRepo, SlackMessageRepo, UserRepo
 from app.schemas.tasks import CreateIncidentUpdateParameters
 from app.services.slack.renderer import IncidentUpdateRenderer
+from app.services.slack.web_client import SlackWebClient
 
 from .base import BaseTask
 
@@ -32,7 +32,7 @@ class CreateIncidentUpdateTask(BaseTask["CreateIncidentUpdateParameters"]):
         if not creator:
             raise RuntimeError("could not find user id")
 
-        client = WebClient(token=incident.organisation.slack_bot_token)
+        client = SlackWebClient(token=incident.organisation.slack_bot_token)
 
         renderer = IncidentUpdateRenderer(
             creator=creator,
@@ -1,9 +1,8 @@
-from slack_sdk import WebClient
-
 from app.models.slack_message import SlackMessageKind
 from app.repos import IncidentRepo, SlackMessageRepo
 from app.schemas.tasks import CreatePinnedMessageTaskParameters
 from app.services.slack.renderer import IncidentInformationMessageRenderer
+from app.services.slack.web_client import SlackWebClient
 
 from .base import BaseTask
 
@@ -20,7 +19,7 @@ class CreatePinnedMessageTask(BaseTask["CreatePinnedMessageTaskParameters"]):
         if not incident.slack_channel_id:
             raise RuntimeError("slack channel id must be set on incident")
 
-        client = WebClient(token=incident.organisation.slack_bot_token)
+        client = SlackWebClient(token=incident.organisation.slack_bot_token)
 
         renderer = IncidentInformationMessageRenderer(incident=incident)
         blocks = renderer.render()
@@ -1,7 +1,6 @@
-from slack_sdk import WebClient
-
 from app.repos import OrganisationRepo
 from app.schemas.tasks import CreateSlackMessageTaskParameters
+from app.services.slack.web_client import SlackWebClient
 
 from .base import BaseTask
 
@@ -11,7 +10,7 @@ class CreateSlackMessageTask(BaseTask["CreateSlackMessageTaskParameters"]):
         organisation_repo = OrganisationRepo(session=self.session)
         organisation = organisation_repo.get_by_id_or_raise(id=parameters.organisation_id)
 
-        client = WebClient(token=organisation.slack_bot_token)
+        client = SlackWebClient(token=organisation.slack_bot_token)
 
         client.chat_postMessage(
             channel=parameters.channel_id,
@@ -0,0 +1,17 @@
+import structlog
+
+from app.schemas.tasks import FlushEmailsParameters
+from app.services.emailer import Emailer
+
+from .base import BaseTask
+
+logger = structlog.get_logger(logger_name=__name__)
+
+
+class FlushEmailsTask(BaseTask["FlushEmailsParameters"]):
+    """Send the emails waiting in the outbox, in batches"""
+
+    def execute(self, parameters: "FlushEmailsParameters") -> None:
+        total = Emailer().flush(batch_size=parameters.batch_size)
+        if total:
+            logger.info("Flushed emails", total=total)
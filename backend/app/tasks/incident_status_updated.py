@@ -4,7 +4,9 @@ import structlog
 
 from app.models import Incident, IncidentStatus, IncidentStatusCategoryEnum, Timestamp, TimestampRule
 from app.repos import IncidentRepo, TimestampRepo
+from app.schemas.models import IncidentSchema
 from app.schemas.tasks import IncidentStatusUpdatedTaskParameters
+from app.utils import incident_channel, queue_live_event
 
 from .base import BaseTask
 
@@ -29,6 +31,16 @@ class IncidentStatusUpdatedTask(BaseTask["IncidentStatusUpdatedTaskParameters"])
 
         self._add_timestamp(incident=incident, triggers=triggers)
 
+        # timestamps may have changed
+        if triggers:
+            queue_live_event(
+                session=self.session,
+                channel=incident_channel(incident.id),
+                type="incident.updated",
+                data=incident,
+                schema=IncidentSchema,
+            )
+
         self.session.commit()
 
     def get_rule_triggers(self, new_status: IncidentStatus, old_status: IncidentStatus) -> list[str]:
@@ -1,9 +1,9 @@
 import structlog
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
 from app.repos import OrganisationRepo, UserRepo
 from app.schemas.tasks import InviteUserToChannelParams
+from app.services.slack.web_client import SlackWebClient
 
 from .base import BaseTask
 
@@ -18,7 +18,7 @@ class InviteUserToChannelTask(BaseTask["InviteUserToChannelParams"]):
         user = user_repo.get_by_id_or_raise(parameters.user_id)
         organisation = organisation_repo.get_by_id_or_raise(parameters.organisation_id)
 
-        client = WebClient(token=organisation.slack_bot_token)
+        client = SlackWebClient(token=organisation.slack_bot_token)
 
         # app must be in channel first
         try:
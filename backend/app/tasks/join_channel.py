@@ -1,9 +1,9 @@
 import structlog
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
 from app.repos import OrganisationRepo
 from app.schemas.tasks import JoinChannelTaskParameters
+from app.services.slack.web_client import SlackWebClient
 
 from .base import BaseTask
 
@@ -15,7 +15,7 @@ class JoinChannelTask(BaseTask["JoinChannelTaskParameters"]):
         organisation_repo = OrganisationRepo(session=self.session)
         organisation = organisation_repo.get_by_id_or_raise(parameters.organisation_id)
 
-        client = WebClient(token=organisation.slack_bot_token)
+        client = SlackWebClient(token=organisation.slack_bot_token)
         try:
             client.conversations_join(channel=parameters.slack_channel_id)
         except SlackApiError as e:
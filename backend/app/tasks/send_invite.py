@@ -3,7 +3,7 @@ import structlog
 from app.env import settings
 from app.repos import InviteRepo
 from app.schemas.tasks import SendInviteTaskParameters
-from app.services.emailer import SendgridEmailer
+from app.services.emailer import Emailer
 
 from .base import BaseTask
 
@@ -15,7 +15,7 @@ class SendInviteEmailTask(BaseTask["SendInviteTaskParameters"]):
         invite_repo = InviteRepo(session=self.session)
         invite = invite_repo.get_by_id_or_raise(id=parameters.invite_id)
 
-        emailer = SendgridEmailer()
+        emailer = Emailer()
         template_id = "d-c60b57b5941b44c2b3c95624c3a43159"
         data = {
             "url": f"{settings.FRONTEND_URL}/login",
@@ -5,7 +5,7 @@ import structlog
 from app.env import settings
 from app.repos import UserRepo
 from app.schemas.tasks import SendVerificationEmailParameters
-from app.services.emailer import SendgridEmailer
+from app.services.emailer import Emailer
 from app.services.security import SecurityService
 
 from .base import BaseTask
@@ -19,7 +19,7 @@ class SendVerificationEmailTask(BaseTask["SendVerificationEmailParameters"]):
         user = user_repo.get_by_id_or_raise(id=parameters.user_id)
 
         security_service = SecurityService(session=self.session)
-        emailer = SendgridEmailer()
+        emailer = Emailer()
         template_id = "d-0e522385acec47dd89f106e184b4f331"
         code = security_service.generate_otp_code(user)
         url_params = urlencode(
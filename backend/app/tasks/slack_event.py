@@ -0,0 +1,31 @@
+import structlog
+
+from app.repos import IncidentRepo, OrganisationRepo, UserRepo
+from app.schemas.tasks import HandleSlackEventTaskParameters
+from app.services.factories import create_slack_user_service
+from app.services.slack.events import SlackEventsService
+
+from .base import BaseTask
+
+logger = structlog.get_logger(logger_name=__name__)
+
+
+class HandleSlackEventTask(BaseTask["HandleSlackEventTaskParameters"]):
+    def execute(self, parameters: "HandleSlackEventTaskParameters"):
+        organisation_repo = OrganisationRepo(session=self.session)
+
+        organisation = organisation_repo.get_by_slack_team_id(slack_team_id=parameters.event.team_id)
+        if not organisation:
+            logger.warning("Organisation not found", slack_team_id=parameters.event.team_id)
+            return
+
+        slack_events_service = SlackEventsService(
+            organisation=organisation,
+            organisation_repo=organisation_repo,
+            user_repo=UserRepo(session=self.session),
+            slack_user_service=create_slack_user_service(session=self.session),
+            incident_repo=IncidentRepo(session=self.session),
+        )
+
+        slack_events_service.handle_event(parameters.event)
+        self.session.commit()
@@ -0,0 +1,42 @@
+import structlog
+
+from app.repos import FormRepo, IncidentRepo, OrganisationRepo, SeverityRepo
+from app.schemas.tasks import HandleSlackInteractionTaskParameters
+from app.services.events import Events
+from app.services.factories import create_incident_service, create_slack_user_service
+from app.services.slack.interaction import SlackInteractionService
+
+from .base import BaseTask
+
+logger = structlog.get_logger(logger_name=__name__)
+
+
+class HandleSlackInteractionTask(BaseTask["HandleSlackInteractionTaskParameters"]):
+    def execute(self, parameters: "HandleSlackInteractionTaskParameters"):
+        interaction = parameters.interaction
+        organisation_repo = OrganisationRepo(session=self.session)
+        events = Events()
+
+        organisation = organisation_repo.get_by_slack_team_id(interaction.payload["team"]["id"])
+        if not organisation:
+            logger.error("Unhandled interaction event for team", team_id=interaction.payload["team"]["id"])
+            return
+
+        incident_service = create_incident_service(session=self.session, organisation=organisation, events=events)
+        slack_user_service = create_slack_user_service(session=self.session)
+        user = slack_user_service.get_or_create_user_from_slack_id(
+            slack_id=interaction.payload["user"]["id"], organisation=organisation
+        )
+
+        slack_interaction_service = SlackInteractionService(
+            form_repo=FormRepo(session=self.session),
+            incident_repo=IncidentRepo(session=self.session),
+            slack_user_service=slack_user_service,
+            incident_service=incident_service,
+            severity_repo=SeverityRepo(session=self.session),
+        )
+
+        slack_interaction_service.handle_interaction(interaction=interaction, organisation=organisation, user=user)
+
+        self.session.commit()
+        events.commit()
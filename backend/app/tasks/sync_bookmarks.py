@@ -1,7 +1,6 @@
 from typing import Any, Callable
 
 import structlog
-from slack_sdk import WebClient
 
 from app.env import settings
 from app.exceptions import ErrorCodes, ExternalApiError
@@ -9,6 +8,7 @@ from app.models import Incident, IncidentRoleKind
 from app.models.slack_bookmark import SlackBookmarkKind
 from app.repos import IncidentRepo
 from app.schemas.tasks import SyncBookmarksTaskParameters
+from app.services.slack.web_client import SlackWebClient
 
 from .base import BaseTask
 
@@ -26,7 +26,7 @@ class SyncBookmarksTask(BaseTask["SyncBookmarksTaskParameters"]):
         if not incident.slack_channel_id:
             raise Exception("slack channel id not set on incident model")
 
-        client = WebClient(token=incident.organisation.slack_bot_token)
+        client = SlackWebClient(token=incident.organisation.slack_bot_token)
 
         bookmark_renderers: dict[SlackBookmarkKind, Callable[[Incident], dict[str, str] | None]] = {
             SlackBookmarkKind.HOMEPAGE: self.render_homepage,
@@ -0,0 +1,32 @@
+import structlog
+from slack_sdk.errors import SlackApiError
+
+from app.repos import OrganisationRepo
+from app.schemas.tasks import SyncSlackUsersParameters
+from app.services.factories import create_slack_user_service
+
+from .base import BaseTask
+
+logger = structlog.get_logger(logger_name=__name__)
+
+
+class SyncSlackUsersTask(BaseTask["SyncSlackUsersParameters"]):
+    def execute(self, parameters: "SyncSlackUsersParameters"):
+        organisation_repo = OrganisationRepo(session=self.session)
+        slack_user_service = create_slack_user_service(session=self.session)
+
+        if parameters.organisation_id:
+            organisations = [organisation_repo.get_by_id_or_raise(parameters.organisation_id)]
+        else:
+            organisations = organisation_repo.get_slack_organisations()
+
+        for organisation in organisations:
+            try:
+                slack_user_service.sync_workspace_members(organisation=organisation)
+            except SlackApiError as e:
+                # e.g the app was uninstalled, carry on with the other organisations
+                logger.warning("Could not sync slack users", organisation_id=organisation.id, error=str(e))
+                self.session.rollback()
+                continue
+
+            self.session.commit()
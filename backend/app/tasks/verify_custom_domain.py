@@ -1,21 +1,97 @@
+import asyncio
+from datetime import datetime, timezone
+
+import structlog
+from redis import Redis, RedisError
+
+from app.env import settings
 from app.repos import StatusPageRepo
 from app.schemas.tasks import VerifyCustomDomainParameters
 from app.services.custom_domain import CustomDomainService
+from app.services.vercel.client import AsyncVercelClient
 
 from .base import BaseTask
 
+logger = structlog.get_logger(logger_name=__name__)
+
+LOCK_KEY = "lock:verify-custom-domains"
+# held for at most this long, in case a worker dies without releasing it
+LOCK_TIMEOUT_SECONDS = 600
+
+_redis: Redis | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_vercel_client: AsyncVercelClient | None = None
+
+
+def _get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    return _redis
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """One event loop per process, the shared client's connections belong to the loop they were opened in"""
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+
+def _get_vercel_client() -> AsyncVercelClient:
+    """One client per process, so connections to the API are reused between runs"""
+    global _vercel_client
+    if _vercel_client is None:
+        _vercel_client = AsyncVercelClient(
+            token=settings.VERCEL_TOKEN, max_connections=settings.CUSTOM_DOMAIN_CHECK_CONCURRENCY
+        )
+    return _vercel_client
+
 
 class VerifyCustomDomainTask(BaseTask["VerifyCustomDomainParameters"]):
+    """Check the unverified custom domains which are due, one run at a time"""
+
     def execute(self, parameters: "VerifyCustomDomainParameters") -> None:
+        lock = _get_redis().lock(LOCK_KEY, timeout=LOCK_TIMEOUT_SECONDS, blocking=False)
+        try:
+            is_locked = lock.acquire()
+        except RedisError as e:
+            # checking twice only costs some API calls, which is better than not checking at all
+            logger.warning("Could not lock custom domain checks", error=str(e))
+            self.check_domains(parameters)
+            return
+
+        if not is_locked:
+            logger.info("Custom domains are already being checked")
+            return
+
+        try:
+            self.check_domains(parameters)
+        finally:
+            try:
+                lock.release()
+            except RedisError as e:
+                logger.warning("Could not unlock custom domain checks", error=str(e))
+
+    def check_domains(self, parameters: "VerifyCustomDomainParameters") -> None:
         status_page_repo = StatusPageRepo(self.session)
         custom_domain_service = CustomDomainService()
+        now = datetime.now(tz=timezone.utc)
+
+        status_pages = status_page_repo.get_custom_domains_due_for_check(now=now, limit=parameters.batch_size)
+        if not status_pages:
+            return
 
-        status_pages = status_page_repo.get_unverified_custom_domains()
+        domains = [status_page.custom_domain for status_page in status_pages if status_page.custom_domain]
+        results = _get_loop().run_until_complete(
+            custom_domain_service.check_domains_are_configured(
+                client=_get_vercel_client(), domains=domains, concurrency=settings.CUSTOM_DOMAIN_CHECK_CONCURRENCY
+            )
+        )
 
         for status_page in status_pages:
             assert status_page.custom_domain is not None  # should be checked in the repo
-            is_verified = custom_domain_service.check_domain_is_configured(status_page.custom_domain)
-            if is_verified:
-                status_page.is_custom_domain_verified = True
+            custom_domain_service.record_check(status_page, is_configured=results[status_page.custom_domain], now=now)
 
         self.session.commit()
+        logger.info("Checked custom domains", total=len(status_pages), verified=sum(1 for it in results.values() if it))
@@ -3,13 +3,19 @@ import os
 import re
 import secrets
 import string
+from typing import Any
 
 import structlog
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
 
 from app.env import settings
 
 LOGGER_SETUP = False
 
+# session.info key for live events waiting for their transaction to commit, see app.services.live_stream
+LIVE_EVENTS_KEY = "live_events"
+
 
 def setup_logger() -> None:
     """Setup structlog with defaults"""
@@ -65,3 +71,22 @@ def generate_slug(name: str) -> str:
     # Remove special characters
     slug = re.sub(r"[^a-zA-Z0-9-]", "", slug)
     return slug
+
+
+def status_page_channel(status_page_id: str) -> str:
+    return f"status-page:{status_page_id}"
+
+
+def incident_channel(incident_id: str) -> str:
+    return f"incident:{incident_id}"
+
+
+def queue_live_event(
+    session: Session, channel: str, type: str, data: Any, schema: type[BaseModel] | None = None
+) -> None:
+    """Queue an event for a channel's live clients, it's only published once the session commits
+
+    When a schema is given the data is validated with it just before committing, so the event carries the
+    final state of the model rather than its state at the time the event was queued.
+    """
+    session.info.setdefault(LIVE_EVENTS_KEY, []).append((channel, type, data, schema))
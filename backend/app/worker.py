@@ -6,6 +6,7 @@ from kombu.serialization import register
 from pydantic import BaseModel
 
 from app.env import settings
+from app.metrics import instrument_celery
 from app.schemas import tasks
 
 
@@ -45,13 +46,28 @@ register(
 )
 
 celery = Celery(__name__)
+instrument_celery()
 
 celery.conf.update(
     beat_schedule={
+        # only domains which are due are checked, see CUSTOM_DOMAIN_CHECK_MIN_SECONDS
         "check-custom-domains": {
             "task": "app.tasks.celerytasks.check_custom_domains",
-            "schedule": crontab(minute="*/30"),
-        }
+            "schedule": crontab(minute="*/5"),
+        },
+        "archive-component-events": {
+            "task": "app.tasks.celerytasks.archive_component_events",
+            "schedule": crontab(minute="15", hour="3"),
+        },
+        # emails schedule their own flush, this only picks up any left if that was lost
+        "flush-emails": {
+            "task": "app.tasks.celerytasks.flush_emails",
+            "schedule": crontab(),
+        },
+        "sync-slack-users": {
+            "task": "app.tasks.celerytasks.sync_all_slack_users",
+            "schedule": crontab(minute="45", hour="4"),
+        },
     },
     task_serializer="pydantic",
     result_serializer="pydantic",
@@ -60,5 +76,6 @@ celery.conf.update(
     result_accept_content=["application/json", "application/x-pydantic"],
     imports=("app.tasks.celerytasks",),
     broker_url=settings.CELERY_BROKER_URL,
+    task_send_sent_event=settings.CELERY_SEND_SENT_EVENTS,
     broker_connection_retry_on_startup=True,
 )
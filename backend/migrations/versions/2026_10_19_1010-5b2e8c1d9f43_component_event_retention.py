@@ -0,0 +1,110 @@
+"""component event indexes and retention
+
+Revision ID: 5b2e8c1d9f43
+Revises: e4af2032001a
+Create Date: 2026-10-19 10:10:12.118021
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2e8c1d9f43"
+down_revision: Union[str, None] = "e4af2032001a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+component_status = postgresql.ENUM(
+    "OPERATIONAL", "DEGRADED_PERFORMANCE", "PARTIAL_OUTAGE", "FULL_OUTAGE", name="componentstatus", create_type=False
+)
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_status_page_component_event_component_started_at",
+        "status_page_component_event",
+        ["status_page_component_id", "started_at"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_status_page_component_event_open",
+        "status_page_component_event",
+        ["status_page_component_id", "status_page_incident_id"],
+        unique=False,
+        postgresql_where=sa.text("ended_at IS NULL AND deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_status_page_component_event_ended_at",
+        "status_page_component_event",
+        ["ended_at"],
+        unique=False,
+        postgresql_where=sa.text("ended_at IS NOT NULL"),
+    )
+
+    op.create_table(
+        "status_page_component_event_archive",
+        sa.Column("id", sa.String(length=50), nullable=False),
+        sa.Column("status_page_incident_id", sa.String(length=50), nullable=False),
+        sa.Column("status_page_component_id", sa.String(length=50), nullable=False),
+        sa.Column("status", component_status, nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_status_page_component_event_archive_status_page_component_id"),
+        "status_page_component_event_archive",
+        ["status_page_component_id"],
+        unique=False,
+    )
+
+    op.create_table(
+        "status_page_component_daily_summary",
+        sa.Column("id", sa.String(length=50), nullable=False),
+        sa.Column("status_page_component_id", sa.String(length=50), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("degraded_performance_seconds", sa.Float(), nullable=False),
+        sa.Column("partial_outage_seconds", sa.Float(), nullable=False),
+        sa.Column("full_outage_seconds", sa.Float(), nullable=False),
+        sa.Column("worst_status", component_status, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["status_page_component_id"],
+            ["status_page_component.id"],
+            ondelete="cascade",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("status_page_component_id", "day", name="ux_status_page_component_daily_summary_day"),
+    )
+    op.create_index(
+        op.f("ix_status_page_component_daily_summary_status_page_component_id"),
+        "status_page_component_daily_summary",
+        ["status_page_component_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_status_page_component_daily_summary_status_page_component_id"),
+        table_name="status_page_component_daily_summary",
+    )
+    op.drop_table("status_page_component_daily_summary")
+    op.drop_index(
+        op.f("ix_status_page_component_event_archive_status_page_component_id"),
+        table_name="status_page_component_event_archive",
+    )
+    op.drop_table("status_page_component_event_archive")
+    op.drop_index("ix_status_page_component_event_ended_at", table_name="status_page_component_event")
+    op.drop_index("ix_status_page_component_event_open", table_name="status_page_component_event")
+    op.drop_index("ix_status_page_component_event_component_started_at", table_name="status_page_component_event")
@@ -0,0 +1,25 @@
+"""index incidents by slack channel
+
+Revision ID: 8d3f6a2b7c15
+Revises: 5b2e8c1d9f43
+Create Date: 2026-10-19 14:00:41.530217
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d3f6a2b7c15"
+down_revision: Union[str, None] = "5b2e8c1d9f43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_incident_slack_channel_id"), "incident", ["slack_channel_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_incident_slack_channel_id"), table_name="incident")
@@ -0,0 +1,35 @@
+"""index status pages by custom domain
+
+Revision ID: a71c4e9d2b58
+Revises: 8d3f6a2b7c15
+Create Date: 2026-10-19 15:30:07.842163
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a71c4e9d2b58"
+down_revision: Union[str, None] = "8d3f6a2b7c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE status_page SET custom_domain = lower(custom_domain) WHERE custom_domain <> lower(custom_domain)"
+    )
+    op.create_index(
+        "ix_status_page_custom_domain_lower",
+        "status_page",
+        [sa.text("lower(custom_domain)")],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_status_page_custom_domain_lower", table_name="status_page")
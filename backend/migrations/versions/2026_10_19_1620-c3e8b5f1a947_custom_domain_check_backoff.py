@@ -0,0 +1,40 @@
+"""custom domain check backoff
+
+Revision ID: c3e8b5f1a947
+Revises: a71c4e9d2b58
+Create Date: 2026-10-19 16:20:51.304718
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e8b5f1a947"
+down_revision: Union[str, None] = "a71c4e9d2b58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "status_page", sa.Column("custom_domain_check_attempts", sa.Integer(), server_default="0", nullable=False)
+    )
+    op.add_column("status_page", sa.Column("custom_domain_next_check_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_status_page_custom_domain_next_check_at",
+        "status_page",
+        ["custom_domain_next_check_at"],
+        unique=False,
+        postgresql_where=sa.text(
+            "custom_domain IS NOT NULL AND is_custom_domain_verified IS false AND deleted_at IS NULL"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_status_page_custom_domain_next_check_at", table_name="status_page")
+    op.drop_column("status_page", "custom_domain_next_check_at")
+    op.drop_column("status_page", "custom_domain_check_attempts")
@@ -0,0 +1,42 @@
+"""index users and incidents for slack option searches
+
+Revision ID: d5a9c2e7f184
+Revises: c3e8b5f1a947
+Create Date: 2026-10-19 17:10:26.518093
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a9c2e7f184"
+down_revision: Union[str, None] = "c3e8b5f1a947"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_user_name_lower", "user", [sa.text("lower(name) text_pattern_ops")], unique=False)
+    op.create_index(
+        "ix_incident_organisation_id_name_lower",
+        "incident",
+        ["organisation_id", sa.text("lower(name) text_pattern_ops")],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_incident_organisation_id_reference_lower",
+        "incident",
+        ["organisation_id", sa.text("lower(reference) text_pattern_ops")],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_incident_organisation_id_reference_lower", table_name="incident")
+    op.drop_index("ix_incident_organisation_id_name_lower", table_name="incident")
+    op.drop_index("ix_user_name_lower", table_name="user")
@@ -0,0 +1,123 @@
+"""Microbenchmarks for pure Python hot paths, they need the usual settings but never connect to Postgres or Slack
+
+    python -m scripts.benchmarks run                 # time everything
+    python -m scripts.benchmarks run --compare       # fail when slower than the baseline by more than the tolerance
+    python -m scripts.benchmarks run --save          # record new baselines
+    python -m scripts.benchmarks onboarding          # cost of setting up an organisation, this one needs the database
+
+Baselines are only comparable on the machine they were recorded on, record them again when that changes.
+"""
+
+import json
+import statistics
+import time
+import timeit
+from pathlib import Path
+
+import typer
+from sqlalchemy import event
+
+from scripts.benchmarks.cases import BENCHMARKS
+
+app = typer.Typer(no_args_is_help=True)
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+
+
+def measure(name: str, repeat: int) -> float:
+    """Best time per call in seconds, the minimum is the least affected by other work on the machine"""
+    func = BENCHMARKS[name]()
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _format_us(seconds: float) -> str:
+    return f"{seconds * 1_000_000:,.1f}us"
+
+
+@app.callback()
+def main():
+    """Microbenchmarks for pure Python hot paths"""
+
+
+@app.command(help="Run the benchmarks, optionally comparing against or saving baselines")
+def run(
+    only: str = typer.Option("", help="Only run benchmarks whose name contains this"),
+    repeat: int = typer.Option(5, help="Times each benchmark is repeated, the best is kept"),
+    compare: bool = typer.Option(False, help="Compare against the baselines and fail on a regression"),
+    tolerance: float = typer.Option(0.2, help="Allowed slowdown when comparing, 0.2 is 20%"),
+    save: bool = typer.Option(False, help="Save the results as the new baselines"),
+    baselines_path: Path = typer.Option(BASELINES_PATH, help="File the baselines are kept in"),
+):
+    baselines: dict[str, float] = json.loads(baselines_path.read_text()) if baselines_path.exists() else {}
+    results: dict[str, float] = {}
+    regressions: list[str] = []
+
+    for name in BENCHMARKS:
+        if only not in name:
+            continue
+
+        results[name] = measure(name, repeat=repeat)
+        line = f"{name.ljust(40)}{_format_us(results[name]).rjust(14)}"
+
+        baseline = baselines.get(name)
+        if compare and baseline:
+            change = results[name] / baseline - 1
+            line += _format_us(baseline).rjust(14) + f"{change:+.1%}".rjust(10)
+            if change > tolerance:
+                regressions.append(name)
+                line += "  REGRESSION"
+        typer.echo(line)
+
+    if save:
+        baselines_path.write_text(json.dumps({**baselines, **results}, indent=2, sort_keys=True) + "\n")
+        typer.echo(f"Saved baselines to {baselines_path}")
+
+    if regressions:
+        typer.echo(f"{len(regressions)} benchmark(s) slower than baseline by more than {tolerance:.0%}", err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command(help="Time setting up new organisations, everything created is rolled back")
+def onboarding(total: int = typer.Option(20, help="Organisations to set up")):
+    # only this command needs the database
+    from app.db import engine, session_factory
+    from app.repos import OrganisationRepo
+    from app.services.factories import create_onboarding_service
+    from app.services.onboarding import load_seed_data
+
+    statements = 0
+
+    def count_statement(*args) -> None:
+        nonlocal statements
+        statements += 1
+
+    start = time.perf_counter()
+    load_seed_data()
+    typer.echo(f"{'seed data, once per process'.ljust(40)}{_format_us(time.perf_counter() - start).rjust(14)}")
+
+    session = session_factory()
+    timings: list[float] = []
+    statement_counts: list[int] = []
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        for idx in range(total):
+            organisation = OrganisationRepo(session=session).create_organisation(name=f"Onboarding benchmark {idx}")
+            statements = 0
+            start = time.perf_counter()
+            create_onboarding_service(session=session).setup_organisation(organisation=organisation)
+            timings.append(time.perf_counter() - start)
+            statement_counts.append(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+        session.rollback()
+        session.close()
+
+    typer.echo(f"{'per organisation, median'.ljust(40)}{_format_us(statistics.median(timings)).rjust(14)}")
+    typer.echo(f"{'per organisation, slowest'.ljust(40)}{_format_us(max(timings)).rjust(14)}")
+    typer.echo(f"{'statements per organisation'.ljust(40)}{str(max(statement_counts)).rjust(14)}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,130 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from app.models import ComponentStatus
+from app.schemas.models import (
+    IncidentSchema,
+    StatusPageComponentEventSchema,
+    StatusPageIncidentSchema,
+    StatusPageSchema,
+    StatusPageWithEventsSchema,
+)
+from app.services.slack.client import SlackClientService
+from app.services.slack.renderer.form import FormRenderer
+from app.services.uptime import calculate_uptime_report
+from app.tasks.incident_status_updated import IncidentStatusUpdatedTask
+from app.utils import to_channel_name
+from scripts.benchmarks import fixtures
+
+# each benchmark builds its fixtures once and returns the callable which is timed
+Benchmark = Callable[[], Callable[[], object]]
+
+
+def form_renderer_render() -> Callable[[], object]:
+    fields = fixtures.make_fields(total_custom=15)
+    renderer = FormRenderer(
+        severities=fixtures.make_severities(),
+        incident_types=fixtures.make_incident_types(fields),
+        incident_statuses=fixtures.make_statuses(),
+    )
+    form = fixtures.make_form(fields)
+
+    return lambda: renderer.render(form=form)
+
+
+def status_page_uptimes() -> Callable[[], object]:
+    status_page, events, _ = fixtures.make_status_page(total_incidents=250)
+    component_ids = [component.id for component in status_page.status_page_components]
+    end = fixtures.NOW
+    start = end - timedelta(days=90)
+
+    def run() -> object:
+        component_events = [
+            (event.status_page_component.id, event.status, event.started_at, event.ended_at) for event in events
+        ]
+        return calculate_uptime_report(component_ids=component_ids, events=component_events, start=start, end=end)
+
+    return run
+
+
+def status_page_uptimes_10k_components() -> Callable[[], object]:
+    # a page far larger than any seen, with around one event for each component
+    status_page, events, _ = fixtures.make_status_page(total_groups=100, components_per_group=100, total_incidents=2500)
+    component_ids = [component.id for component in status_page.status_page_components]
+    component_events = [
+        (event.status_page_component.id, event.status, event.started_at, event.ended_at) for event in events
+    ]
+    end = fixtures.NOW
+    start = end - timedelta(days=90)
+
+    return lambda: calculate_uptime_report(component_ids=component_ids, events=component_events, start=start, end=end)
+
+
+def component_status_most_severe() -> Callable[[], object]:
+    statuses = list(ComponentStatus)
+    # every combination a component could be in across its open events
+    status_lists = [
+        list(combination)
+        for size in range(1, len(statuses) + 1)
+        for combination in itertools.combinations(statuses, size)
+    ] * 10
+
+    return lambda: [ComponentStatus.most_severe(status_list) for status_list in status_lists]
+
+
+def slack_channel_name_collisions() -> Callable[[], object]:
+    organisation = fixtures.make_organisation()
+    incident_name = "Database connections exhausted"
+    # same format as the organisation's settings, for the day the benchmark runs
+    taken = f"inc-{datetime.now(tz=timezone.utc):%Y-%m-%d}-{to_channel_name(incident_name)}"
+    names = [f"inc-2024-01-{idx:04d}" for idx in range(2000)]
+    names += [taken] + [f"{taken}-{idx}" for idx in range(1, 50)]
+
+    service = SlackClientService(auth_token="xoxb-benchmark")
+    service.client = fixtures.CannedConversationsClient(names=names)  # type: ignore
+
+    return lambda: service._generate_slack_channel_name(organisation=organisation, incident_name=incident_name)
+
+
+def incident_status_rule_triggers() -> Callable[[], object]:
+    task = IncidentStatusUpdatedTask(session=None)  # type: ignore
+    transitions = list(itertools.permutations(fixtures.make_statuses(), 2))
+
+    return lambda: [task.get_rule_triggers(new_status=new, old_status=old) for old, new in transitions]
+
+
+def serialise_incident() -> Callable[[], object]:
+    incident = fixtures.make_incident()
+
+    return lambda: IncidentSchema.model_validate(incident).model_dump(mode="json", by_alias=True)
+
+
+def serialise_status_page_with_events() -> Callable[[], object]:
+    status_page, events, incidents = fixtures.make_status_page()
+    active_incidents = [incident for incident in incidents if incident.status != "RESOLVED"]
+    uptimes = {component.id: 0.999 for component in status_page.status_page_components}
+
+    def run() -> object:
+        # built the same way as the public status endpoint
+        response = StatusPageWithEventsSchema(
+            status_page=StatusPageSchema.model_validate(status_page),
+            events=[StatusPageComponentEventSchema.model_validate(event) for event in events],
+            uptimes=uptimes,
+            incidents=[StatusPageIncidentSchema.model_validate(incident) for incident in active_incidents],
+        )
+        return response.model_dump(mode="json", by_alias=True, exclude_defaults=True, exclude_none=True)
+
+    return run
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "form_renderer.render": form_renderer_render,
+    "status_page.uptimes": status_page_uptimes,
+    "status_page.uptimes_10k_components": status_page_uptimes_10k_components,
+    "component_status.most_severe": component_status_most_severe,
+    "slack.channel_name_collisions": slack_channel_name_collisions,
+    "incident_status.rule_triggers": incident_status_rule_triggers,
+    "serialise.incident": serialise_incident,
+    "serialise.status_page_with_events": serialise_status_page_with_events,
+}
@@ -0,0 +1,376 @@
+"""Synthetic, unsaved models shaped like a busy organisation's data
+
+Nothing here touches the database, the models are built in memory with every attribute the code under test reads.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
+
+from shortuuid import uuid
+
+from app.db import Base
+from app.models import (
+    ComponentStatus,
+    Field,
+    FieldKind,
+    Form,
+    FormField,
+    FormKind,
+    Incident,
+    IncidentRole,
+    IncidentRoleAssignment,
+    IncidentRoleKind,
+    IncidentSeverity,
+    IncidentStatus,
+    IncidentStatusCategoryEnum,
+    IncidentType,
+    InterfaceKind,
+    Organisation,
+    OrganisationTypes,
+    RequirementTypeEnum,
+    Settings,
+    StatusPage,
+    StatusPageComponent,
+    StatusPageComponentAffected,
+    StatusPageComponentEvent,
+    StatusPageComponentGroup,
+    StatusPageComponentUpdate,
+    StatusPageIncident,
+    StatusPageIncidentStatus,
+    StatusPageIncidentUpdate,
+    StatusPageItem,
+    StatusPageKind,
+    Timestamp,
+    TimestampKind,
+    TimestampValue,
+    User,
+)
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+NOW = datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+
+# the same fixtures on every run, so timings can be compared
+random.seed(1234)
+
+
+def _model(model_class: type[ModelT], **values: Any) -> ModelT:
+    model = model_class(**values)
+    model.id = f"{model_class.__prefix__}_{uuid()}"
+    model.created_at = NOW
+    model.updated_at = NOW
+    return model
+
+
+def make_organisation() -> Organisation:
+    organisation = _model(
+        Organisation,
+        name="Benchmark",
+        slug="benchmark",
+        kind=OrganisationTypes.SLACK,
+        slack_team_id="T1",
+        slack_team_name="Benchmark",
+    )
+    organisation.settings = _model(
+        Settings,
+        organisation=organisation,
+        slack_channel_name_format="inc-{YYYY}-{MM}-{DD}-{name}",
+        incident_reference_format="INC-{id}",
+    )
+    return organisation
+
+
+def make_user(idx: int = 0) -> User:
+    return _model(
+        User,
+        name=f"User {idx}",
+        email_address=f"user-{idx}@example.com",
+        auth_token=uuid(),
+        is_super_admin=False,
+        is_active=True,
+    )
+
+
+def make_severities(total: int = 5) -> list[IncidentSeverity]:
+    return [
+        _model(IncidentSeverity, name=f"Sev {idx}", description=f"Severity {idx}", rating=idx) for idx in range(total)
+    ]
+
+
+def make_statuses() -> list[IncidentStatus]:
+    categories = [
+        ("Triage", IncidentStatusCategoryEnum.TRIAGE),
+        ("Investigating", IncidentStatusCategoryEnum.ACTIVE),
+        ("Fixing", IncidentStatusCategoryEnum.ACTIVE),
+        ("Monitoring", IncidentStatusCategoryEnum.ACTIVE),
+        ("Documenting", IncidentStatusCategoryEnum.POST_INCIDENT),
+        ("Closed", IncidentStatusCategoryEnum.CLOSED),
+    ]
+    return [
+        _model(IncidentStatus, name=name, description=None, rank=rank, category=category)
+        for rank, (name, category) in enumerate(categories)
+    ]
+
+
+def make_fields(total_custom: int = 10) -> list[Field]:
+    core = [
+        (FieldKind.INCIDENT_NAME, InterfaceKind.TEXT),
+        (FieldKind.INCIDENT_TYPE, InterfaceKind.SINGLE_SELECT),
+        (FieldKind.INCIDENT_SEVERITY, InterfaceKind.SINGLE_SELECT),
+        (FieldKind.INCIDENT_INITIAL_STATUS, InterfaceKind.SINGLE_SELECT),
+        (FieldKind.INCIDENT_STATUS, InterfaceKind.SINGLE_SELECT),
+        (FieldKind.INCIDENT_SUMMARY, InterfaceKind.TEXTAREA),
+    ]
+    interface_kinds = [InterfaceKind.SINGLE_SELECT, InterfaceKind.TEXT, InterfaceKind.TEXTAREA]
+
+    fields = [
+        _model(
+            Field,
+            label=kind.value.replace("_", " ").title(),
+            description=None,
+            kind=kind,
+            interface_kind=interface_kind,
+            available_options=None,
+            is_deletable=False,
+            is_editable=False,
+            is_system=True,
+        )
+        for kind, interface_kind in core
+    ]
+    for idx in range(total_custom):
+        interface_kind = interface_kinds[idx % len(interface_kinds)]
+        fields.append(
+            _model(
+                Field,
+                label=f"Custom {idx}",
+                description=f"Custom field {idx}",
+                kind=FieldKind.USER_DEFINED,
+                interface_kind=interface_kind,
+                available_options=(
+                    [f"Option {it}" for it in range(25)] if interface_kind == InterfaceKind.SINGLE_SELECT else None
+                ),
+                is_deletable=True,
+                is_editable=True,
+                is_system=False,
+            )
+        )
+
+    return fields
+
+
+def make_incident_types(fields: list[Field], total: int = 5) -> list[IncidentType]:
+    custom_fields = [field for field in fields if field.kind == FieldKind.USER_DEFINED]
+    return [
+        _model(
+            IncidentType,
+            name=f"Type {idx}",
+            description=f"Incident type {idx}",
+            is_editable=True,
+            is_deletable=True,
+            is_default=idx == 0,
+            fields=custom_fields[:3],
+        )
+        for idx in range(total)
+    ]
+
+
+def make_form(fields: list[Field], kind: FormKind = FormKind.CREATE_INCIDENT) -> Form:
+    form = _model(Form, name="Declare incident", is_published=True, template=None, type=kind)
+    form.form_fields = [
+        _model(
+            FormField,
+            form=form,
+            field=field,
+            label=field.label,
+            description=field.description,
+            rank=rank,
+            is_deletable=field.is_deletable,
+            default_value=None,
+            default_value_multi=None,
+            requirement_type=RequirementTypeEnum.REQUIRED if field.is_system else RequirementTypeEnum.OPTIONAL,
+            can_have_default_value=True,
+            can_have_description=True,
+            can_change_requirement_type=True,
+        )
+        for rank, field in enumerate(fields)
+        if field.kind != FieldKind.INCIDENT_STATUS
+    ]
+    return form
+
+
+def make_incident(total_roles: int = 3, total_timestamps: int = 6) -> Incident:
+    fields = make_fields()
+    creator = make_user()
+    incident = _model(
+        Incident,
+        name="Database connections exhausted",
+        description="Connections to the primary database are being refused",
+        reference="INC-123",
+        reference_id=123,
+        slack_channel_id="C123",
+        slack_channel_name="inc-2024-06-01-database-connections-exhausted",
+        creator=creator,
+        incident_type=make_incident_types(fields)[0],
+        incident_status=make_statuses()[1],
+        incident_severity=make_severities()[1],
+    )
+    incident.incident_role_assignments = [
+        _model(
+            IncidentRoleAssignment,
+            incident=incident,
+            user=make_user(idx),
+            incident_role=_model(
+                IncidentRole,
+                name=f"Role {idx}",
+                kind=IncidentRoleKind.CUSTOM,
+                description=f"Role {idx}",
+                guide=None,
+                slack_reference=f"role-{idx}",
+                is_deletable=True,
+                is_editable=True,
+            ),
+        )
+        for idx in range(total_roles)
+    ]
+    incident.timestamp_values = [
+        _model(
+            TimestampValue,
+            incident=incident,
+            value=NOW - timedelta(minutes=idx),
+            timestamp=_model(
+                Timestamp,
+                label=f"Timestamp {idx}",
+                description=None,
+                kind=TimestampKind.CUSTOM,
+                rank=idx,
+                rules=[{"first": True, "onEvent": "incident.declared"}],
+                can_delete=True,
+            ),
+        )
+        for idx in range(total_timestamps)
+    ]
+    return incident
+
+
+def make_status_page(
+    total_groups: int = 5, components_per_group: int = 6, total_incidents: int = 30, days: int = 90
+) -> tuple[StatusPage, list[StatusPageComponentEvent], list[StatusPageIncident]]:
+    """A status page with grouped components, and the events and incidents of the last few months"""
+    status_page = _model(
+        StatusPage,
+        name="Benchmark",
+        organisation_id="org_benchmark",
+        page_type=StatusPageKind.PUBLIC,
+        published_at=NOW,
+        slug="benchmark",
+        custom_domain=None,
+        is_custom_domain_verified=False,
+        support_url="https://example.com/support",
+        support_label="Support",
+        privacy_policy_url=None,
+        terms_of_service_url=None,
+    )
+
+    components: list[StatusPageComponent] = []
+    items: list[StatusPageItem] = []
+    for group_idx in range(total_groups):
+        group = _model(StatusPageComponentGroup, name=f"Group {group_idx}", status_page=status_page)
+        group_item = _model(
+            StatusPageItem, status_page=status_page, status_page_component_group=group, rank=group_idx, parent=None
+        )
+        for component_idx in range(components_per_group):
+            component = _model(
+                StatusPageComponent,
+                name=f"Component {group_idx}.{component_idx}",
+                status_page=status_page,
+                is_hidden=False,
+                is_uptime_shown=True,
+                published_at=NOW,
+            )
+            components.append(component)
+            _model(
+                StatusPageItem,
+                status_page=status_page,
+                status_page_component=component,
+                rank=component_idx,
+                parent=group_item,
+            )
+        items.append(group_item)
+    status_page.status_page_items = items
+
+    creator = make_user()
+    statuses = [ComponentStatus.DEGRADED_PERFORMANCE, ComponentStatus.PARTIAL_OUTAGE, ComponentStatus.FULL_OUTAGE]
+    events: list[StatusPageComponentEvent] = []
+    incidents: list[StatusPageIncident] = []
+    for idx in range(total_incidents):
+        started_at = NOW - timedelta(days=random.uniform(0, days))
+        # the most recent incidents are still ongoing
+        ended_at = started_at + timedelta(minutes=random.uniform(5, 600)) if idx >= 3 else None
+        affected = random.sample(components, k=min(4, len(components)))
+
+        incident = _model(
+            StatusPageIncident,
+            status_page=status_page,
+            name=f"Incident {idx}",
+            published_at=started_at,
+            status=StatusPageIncidentStatus.RESOLVED if ended_at else StatusPageIncidentStatus.INVESTIGATING,
+            creator=creator,
+        )
+        incident.components_affected = [
+            _model(
+                StatusPageComponentAffected,
+                status_page_incident=incident,
+                status_page_component=component,
+                status=random.choice(statuses),
+            )
+            for component in affected
+        ]
+        update = _model(
+            StatusPageIncidentUpdate,
+            status_page_incident=incident,
+            message="We are investigating",
+            status=StatusPageIncidentStatus.INVESTIGATING,
+            published_at=started_at,
+            creator=creator,
+        )
+        update.component_updates = [
+            _model(
+                StatusPageComponentUpdate,
+                status_page_incident_update=update,
+                status_page_component=it.status_page_component,
+                status=it.status,
+            )
+            for it in incident.components_affected
+        ]
+        incident.incident_updates = [update]
+
+        for it in incident.components_affected:
+            events.append(
+                _model(
+                    StatusPageComponentEvent,
+                    status_page_incident=incident,
+                    status_page_component=it.status_page_component,
+                    status=it.status,
+                    started_at=started_at,
+                    ended_at=ended_at,
+                )
+            )
+        incidents.append(incident)
+
+    return status_page, events, incidents
+
+
+class CannedConversationsClient:
+    """Answers conversations_list from memory with the same pagination as Slack"""
+
+    def __init__(self, names: list[str], page_size: int = 100):
+        self.channels = [{"id": f"C{idx}", "name": name} for idx, name in enumerate(names)]
+        self.page_size = page_size
+
+    def conversations_list(self, types: list[str], limit: int, cursor: str | None = None) -> dict[str, Any]:
+        offset = int(cursor or 0)
+        page = self.channels[offset : offset + min(limit, self.page_size)]
+        next_offset = offset + len(page)
+        next_cursor = str(next_offset) if next_offset < len(self.channels) else ""
+        return {"channels": page, "response_metadata": {"next_cursor": next_cursor}}
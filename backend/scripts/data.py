@@ -1,15 +1,18 @@
 import re
+from datetime import datetime, timezone
 
 import structlog
 import typer
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
 from app.db import session_factory
 from app.env import settings
 from app.repos import OrganisationRepo, UserRepo
-from app.services.factories import create_onboarding_service
+from app.services.factories import create_incident_import_service, create_onboarding_service
+from app.services.incident_import import ImportCheckpoint, ImportResult, ImportRowError
+from app.services.slack.web_client import SlackWebClient
 from app.utils import setup_logger
+from scripts.tenant_generator import DEFAULT_NOW, SHAPES, GenerationResult, TenantGenerator
 
 setup_logger()
 
@@ -51,7 +54,7 @@ def archive_org_channels(organisation_id: str, prefix: str = "inc-", dry_run: bo
     if not organisation.slack_bot_token:
         raise Exception("Organisation does not have a slack bot token")
 
-    client = WebClient(token=organisation.slack_bot_token)
+    client = SlackWebClient(token=organisation.slack_bot_token)
     auth_response = client.auth_test()
     logger.info("Associated slack workspace", name=auth_response.get("team"))
 
@@ -91,5 +94,97 @@ def onboard(organisation_id: str):
     session.commit()
 
 
+@app.command()
+def import_incidents(
+    organisation_id: str,
+    path: str,
+    creator_email: str = typer.Option(help="User to attribute incidents to when the creator is unknown"),
+    checkpoint: str | None = typer.Option(None, help="Checkpoint file used to resume a failed import"),
+    batch_size: int = 1000,
+):
+    """Import historical incidents from a CSV or NDJSON file, without creating Slack channels"""
+    session = session_factory()
+    organisation_repo = OrganisationRepo(session=session)
+    user_repo = UserRepo(session=session)
+
+    organisation = organisation_repo.get_by_id_or_raise(id=organisation_id)
+    default_creator = user_repo.get_by_email_address(creator_email)
+    if not default_creator:
+        raise typer.BadParameter("Creator does not exist")
+
+    import_service = create_incident_import_service(
+        session=session, organisation=organisation, default_creator=default_creator
+    )
+
+    def report(result: ImportResult):
+        logger.info(
+            "Batch committed",
+            incidents=result.incidents,
+            updates=result.updates,
+            rows_committed=result.rows_committed,
+            incidents_per_second=round(result.incidents_per_second, 1),
+        )
+
+    try:
+        result = import_service.import_file(
+            path=path,
+            checkpoint=ImportCheckpoint(path=checkpoint, source=path),
+            batch_size=batch_size,
+            on_batch=report,
+        )
+    except ImportRowError as e:
+        logger.error("Import failed, fix the row and re-run with the same checkpoint", line=e.line, error=e.message)
+        raise typer.Exit(code=1)
+
+    logger.info(
+        "Import complete",
+        incidents=result.incidents,
+        updates=result.updates,
+        seconds=round(result.elapsed, 2),
+        incidents_per_second=round(result.incidents_per_second, 1),
+    )
+
+
+@app.command(help="Generate an organisation with a large amount of synthetic data")
+def generate_tenant(
+    name: str,
+    shape: str = typer.Option("small", help=f"Size of the organisation, one of {', '.join(SHAPES)}"),
+    seed: int = typer.Option(1, help="Same seed generates the same data"),
+    now: datetime = typer.Option(DEFAULT_NOW, help="When the generated history ends, in UTC"),
+    batch_size: int = 5000,
+):
+    """Use this to reproduce problems that only appear with a lot of data"""
+    if settings.ENV != "development":
+        raise Exception("Will only run on development environment")
+
+    if shape not in SHAPES:
+        raise typer.BadParameter(f"Unknown shape, use one of {', '.join(SHAPES)}")
+
+    session = session_factory()
+    generator = TenantGenerator(
+        session=session,
+        shape=SHAPES[shape],
+        seed=seed,
+        batch_size=batch_size,
+        now=now if now.tzinfo else now.replace(tzinfo=timezone.utc),
+    )
+
+    def report(result: GenerationResult):
+        logger.info(
+            "Batch committed",
+            rows=result.total_rows,
+            rows_per_second=round(result.total_rows / result.elapsed, 1),
+        )
+
+    result = generator.generate(name=name, on_batch=report)
+
+    logger.info(
+        "Generation complete",
+        organisation_id=result.organisation_id,
+        seconds=round(result.elapsed, 2),
+        **dict(result.rows),
+    )
+
+
 if __name__ == "__main__":
     app()
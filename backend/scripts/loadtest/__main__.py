@@ -0,0 +1,167 @@
+"""Load test the API and workers against local Postgres and Redis, with Slack replaced by a local stand-in
+
+    python -m scripts.loadtest run --scenario incident-storm --requests 500 --concurrency 20
+
+Slack calls made while the test runs are only counted when the API and worker were started by the harness, or
+were started with SLACK_API_URL pointing at the stand-in.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import structlog
+import typer
+
+from app.db import session_factory
+from app.utils import setup_logger
+from app.worker import celery
+from scripts.loadtest.celery_monitor import CeleryMonitor
+from scripts.loadtest.fake_slack import FakeSlack, FakeSlackConfig, FakeSlackServer
+from scripts.loadtest.scenarios import SCENARIOS, ScenarioRunner
+from scripts.loadtest.seed import LoadTestTenant, seed_tenant
+from scripts.loadtest.stats import LatencyRecorder, format_table
+
+setup_logger()
+
+app = typer.Typer(no_args_is_help=True)
+logger = structlog.get_logger(logger_name=__name__)
+
+SLACK_TEAM_ID = "TLOADTEST"
+
+
+def _start_processes(slack_url: str, api_port: int, start_worker: bool) -> list[subprocess.Popen]:
+    env = {**os.environ, "SLACK_API_URL": slack_url, "LOG_FORMAT": "json", "CELERY_SEND_SENT_EVENTS": "true"}
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(api_port), "--log-level", "warning"],
+            env=env,
+        )
+    ]
+    if start_worker:
+        processes.append(
+            subprocess.Popen(
+                [sys.executable, "-m", "celery", "-A", "app.worker", "worker", "-E", "--loglevel=WARNING"], env=env
+            )
+        )
+
+    return processes
+
+
+def _wait_for_api(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/health", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.25)
+
+    raise RuntimeError(f"API did not start at {url}")
+
+
+def _wait_for_tasks(monitor: CeleryMonitor, timeout: float) -> None:
+    """Give the worker time to finish the tasks queued by the scenario"""
+    deadline = time.monotonic() + timeout
+    while monitor.names and time.monotonic() < deadline:
+        time.sleep(0.5)
+
+
+async def _run_scenario(
+    scenario: str, api_url: str, tenants: list[LoadTestTenant], total_requests: int, concurrency: int
+) -> LatencyRecorder:
+    recorder = LatencyRecorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=60) as client:
+        runner = ScenarioRunner(client=client, tenants=tenants, recorder=recorder)
+        await SCENARIOS[scenario](runner, total_requests, concurrency)
+    recorder.finish()
+
+    return recorder
+
+
+@app.callback()
+def main():
+    """Load test the API and workers with Slack replaced by a local stand-in"""
+
+
+@app.command(help="Run a load test scenario and report latency percentiles and throughput")
+def run(
+    scenario: str = typer.Option("incident-storm", help=f"One of: {', '.join(SCENARIOS)}"),
+    requests: int = typer.Option(200, help="Total requests made by the scenario"),
+    concurrency: int = typer.Option(10, help="Number of concurrent clients"),
+    tenants: int = typer.Option(1, help="Number of organisations to spread the load over"),
+    slack_latency_ms: float = typer.Option(50.0, help="Latency added to each Slack call"),
+    slack_jitter_ms: float = typer.Option(20.0, help="Random jitter either side of the latency"),
+    slack_rate_limit: float = typer.Option(0.0, help="Fraction of Slack calls rejected with a 429"),
+    slack_port: int = typer.Option(5099, help="Port for the Slack stand-in"),
+    api_url: str = typer.Option("", help="Use an API that's already running instead of starting one"),
+    api_port: int = typer.Option(5098, help="Port for the API started by the harness"),
+    start_worker: bool = typer.Option(True, help="Start a celery worker when starting the API"),
+    drain_timeout: float = typer.Option(60.0, help="Seconds to wait for queued tasks after the scenario"),
+    output: Path | None = typer.Option(None, help="Also write the results to this JSON file"),
+):
+    if scenario not in SCENARIOS:
+        raise typer.BadParameter(f"Unknown scenario {scenario}")
+
+    fake_slack = FakeSlack(
+        FakeSlackConfig(latency_ms=slack_latency_ms, jitter_ms=slack_jitter_ms, rate_limit_ratio=slack_rate_limit),
+        team_id=SLACK_TEAM_ID,
+    )
+    slack_server = FakeSlackServer(fake_slack, port=slack_port)
+    slack_server.start()
+
+    processes: list[subprocess.Popen] = []
+    if not api_url:
+        processes = _start_processes(slack_url=slack_server.url, api_port=api_port, start_worker=start_worker)
+        api_url = f"http://127.0.0.1:{api_port}"
+
+    monitor = CeleryMonitor(celery)
+    try:
+        _wait_for_api(api_url)
+
+        with session_factory() as session:
+            seeded = [seed_tenant(session=session, slack_team_id=SLACK_TEAM_ID) for _ in range(tenants)]
+        logger.info("Seeded tenants", total=len(seeded))
+
+        monitor.start()
+        recorder = asyncio.run(_run_scenario(scenario, api_url, seeded, requests, concurrency))
+        _wait_for_tasks(monitor, timeout=drain_timeout)
+    finally:
+        monitor.stop()
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+        slack_server.stop()
+
+    results = {
+        "scenario": scenario,
+        "endpoints": recorder.summary(),
+        "taskRuntime": monitor.runtime.summary(),
+        "taskWait": monitor.wait.summary(),
+        "slack": fake_slack.stats(),
+    }
+
+    typer.echo(format_table("endpoint", results["endpoints"]))
+    typer.echo("")
+    typer.echo(format_table("task runtime", results["taskRuntime"]))
+    typer.echo("")
+    typer.echo(format_table("task wait", results["taskWait"]))
+    if results["taskRuntime"] and not results["taskWait"]:
+        typer.echo("No task-sent events, set CELERY_SEND_SENT_EVENTS on the API to measure task wait", err=True)
+    typer.echo("")
+    for method, counts in results["slack"].items():
+        typer.echo(f"{method.ljust(30)}{str(counts['calls']).rjust(10)}{str(counts['rateLimited']).rjust(10)}")
+
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    app()
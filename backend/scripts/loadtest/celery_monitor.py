@@ -0,0 +1,74 @@
+import threading
+from typing import Any
+
+from celery import Celery
+
+from scripts.loadtest.stats import LatencyRecorder
+
+
+class CeleryMonitor:
+    """Record task run time and queue wait from task events
+
+    The worker must be started with -E, and wait is only measured for tasks queued with CELERY_SEND_SENT_EVENTS, from
+    when the task was sent until it started, so it includes the time spent in the broker.
+    """
+
+    def __init__(self, app: Celery):
+        self.app = app
+        self.runtime = LatencyRecorder()
+        self.wait = LatencyRecorder()
+        self.names: dict[str, str] = {}
+        self.sent_at: dict[str, float] = {}
+        self.should_stop = threading.Event()
+        self.thread = threading.Thread(target=self._capture, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.should_stop.set()
+        self.runtime.finish()
+        self.wait.finish()
+        if self.thread.is_alive():
+            self.thread.join(timeout=5)
+
+    def _on_sent(self, event: dict[str, Any]) -> None:
+        self.names[event["uuid"]] = event["name"]
+        self.sent_at[event["uuid"]] = event["timestamp"]
+
+    def _on_received(self, event: dict[str, Any]) -> None:
+        self.names[event["uuid"]] = event["name"]
+
+    def _on_started(self, event: dict[str, Any]) -> None:
+        name = self.names.get(event["uuid"])
+        sent_at = self.sent_at.pop(event["uuid"], None)
+        if name and sent_at:
+            self.wait.record(name, max(event["timestamp"] - sent_at, 0))
+
+    def _on_succeeded(self, event: dict[str, Any]) -> None:
+        name = self.names.pop(event["uuid"], None)
+        if name:
+            self.runtime.record(name, event.get("runtime") or 0.0)
+
+    def _on_failed(self, event: dict[str, Any]) -> None:
+        name = self.names.pop(event["uuid"], None)
+        if name:
+            self.runtime.record(name, event.get("runtime") or 0.0, is_error=True)
+
+    def _capture(self) -> None:
+        with self.app.connection() as connection:
+            receiver = self.app.events.Receiver(
+                connection,
+                handlers={
+                    "task-sent": self._on_sent,
+                    "task-received": self._on_received,
+                    "task-started": self._on_started,
+                    "task-succeeded": self._on_succeeded,
+                    "task-failed": self._on_failed,
+                },
+            )
+            while not self.should_stop.is_set():
+                try:
+                    receiver.capture(limit=None, timeout=1, wakeup=False)
+                except TimeoutError:
+                    continue
@@ -0,0 +1,211 @@
+import asyncio
+import collections
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import shortuuid
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class FakeSlackConfig:
+    # added to every call, jitter is uniformly distributed either side
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    # fraction of calls which are rejected with a 429
+    rate_limit_ratio: float = 0.0
+    retry_after: int = 1
+
+
+@dataclass
+class FakeSlackState:
+    """What the app has done to the workspace, kept in memory"""
+
+    channels: dict[str, dict[str, Any]] = field(default_factory=dict)
+    bookmarks: dict[str, dict[str, dict[str, Any]]] = field(default_factory=lambda: collections.defaultdict(dict))
+    calls: collections.Counter = field(default_factory=collections.Counter)
+    rate_limited: collections.Counter = field(default_factory=collections.Counter)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _ts() -> str:
+    return f"{time.time():.6f}"
+
+
+class FakeSlack:
+    """Stand-in for the Slack Web API, covers the methods the app calls"""
+
+    def __init__(self, config: FakeSlackConfig, team_id: str = "TLOADTEST"):
+        self.config = config
+        self.team_id = team_id
+        self.state = FakeSlackState()
+        self.handlers: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+            "auth.test": self.auth_test,
+            "conversations.create": self.conversations_create,
+            "conversations.list": self.conversations_list,
+            "conversations.join": self.ok,
+            "conversations.invite": self.ok,
+            "conversations.setTopic": self.ok,
+            "conversations.archive": self.ok,
+            "chat.postMessage": self.chat_post_message,
+            "chat.postEphemeral": self.chat_post_ephemeral,
+            "chat.update": self.chat_post_message,
+            "bookmarks.add": self.bookmarks_add,
+            "bookmarks.list": self.bookmarks_list,
+            "bookmarks.remove": self.bookmarks_remove,
+            "pins.add": self.ok,
+            "users.info": self.users_info,
+            "views.open": self.ok,
+            "views.update": self.ok,
+            "views.publish": self.ok,
+        }
+
+    def ok(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {"ok": True}
+
+    def auth_test(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {"ok": True, "team_id": self.team_id, "user_id": "UBOT", "bot_id": "BBOT"}
+
+    def conversations_create(self, params: dict[str, Any]) -> dict[str, Any]:
+        name = params.get("name", "")
+        with self.state.lock:
+            if any(channel["name"] == name for channel in self.state.channels.values()):
+                return {"ok": False, "error": "name_taken"}
+            channel = {"id": f"C{shortuuid.uuid()[:10].upper()}", "name": name, "created": int(time.time())}
+            self.state.channels[channel["id"]] = channel
+
+        return {"ok": True, "channel": channel}
+
+    def conversations_list(self, params: dict[str, Any]) -> dict[str, Any]:
+        limit = int(params.get("limit") or 100)
+        offset = int(params.get("cursor") or 0)
+        with self.state.lock:
+            channels = list(self.state.channels.values())
+
+        page = channels[offset : offset + limit]
+        next_cursor = str(offset + limit) if offset + limit < len(channels) else ""
+        return {"ok": True, "channels": page, "response_metadata": {"next_cursor": next_cursor}}
+
+    def chat_post_message(self, params: dict[str, Any]) -> dict[str, Any]:
+        ts = _ts()
+        return {
+            "ok": True,
+            "channel": params.get("channel"),
+            "ts": ts,
+            "message": {"text": params.get("text"), "ts": ts},
+        }
+
+    def chat_post_ephemeral(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {"ok": True, "message_ts": _ts()}
+
+    def bookmarks_add(self, params: dict[str, Any]) -> dict[str, Any]:
+        channel_id = params.get("channel_id", "")
+        bookmark = {
+            "id": f"Bk{shortuuid.uuid()[:10].upper()}",
+            "channel_id": channel_id,
+            "title": params.get("title"),
+            "link": params.get("link"),
+            "emoji": params.get("emoji"),
+        }
+        with self.state.lock:
+            self.state.bookmarks[channel_id][bookmark["id"]] = bookmark
+
+        return {"ok": True, "bookmark": bookmark}
+
+    def bookmarks_list(self, params: dict[str, Any]) -> dict[str, Any]:
+        with self.state.lock:
+            bookmarks = list(self.state.bookmarks[params.get("channel_id", "")].values())
+
+        return {"ok": True, "bookmarks": bookmarks}
+
+    def bookmarks_remove(self, params: dict[str, Any]) -> dict[str, Any]:
+        with self.state.lock:
+            self.state.bookmarks[params.get("channel_id", "")].pop(params.get("bookmark_id", ""), None)
+
+        return {"ok": True}
+
+    def users_info(self, params: dict[str, Any]) -> dict[str, Any]:
+        user_id = params.get("user", "")
+        return {
+            "ok": True,
+            "user": {
+                "id": user_id,
+                "team_id": self.team_id,
+                "name": user_id.lower(),
+                "real_name": f"Load Test {user_id}",
+                "is_bot": False,
+                "profile": {"email": f"{user_id.lower()}@loadtest.incidental.dev"},
+            },
+        }
+
+    async def handle(self, method: str, params: dict[str, Any]) -> JSONResponse:
+        with self.state.lock:
+            self.state.calls[method] += 1
+
+        delay = self.config.latency_ms + random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        await asyncio.sleep(max(delay, 0) / 1000)
+
+        if random.random() < self.config.rate_limit_ratio:
+            with self.state.lock:
+                self.state.rate_limited[method] += 1
+            return JSONResponse(
+                {"ok": False, "error": "ratelimited"},
+                status_code=429,
+                headers={"Retry-After": str(self.config.retry_after)},
+            )
+
+        handler = self.handlers.get(method)
+        if not handler:
+            return JSONResponse({"ok": False, "error": "unknown_method"})
+
+        return JSONResponse(handler(params))
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self.state.lock:
+            return {
+                method: {"calls": count, "rateLimited": self.state.rate_limited[method]}
+                for method, count in sorted(self.state.calls.items())
+            }
+
+
+def create_fake_slack_app(fake_slack: FakeSlack) -> FastAPI:
+    app = FastAPI(openapi_url=None)
+
+    @app.post("/api/{method}")
+    async def api_method(method: str, request: Request):
+        # the sdk sends form encoded bodies for most methods and JSON for the rest
+        if request.headers.get("content-type", "").startswith("application/json"):
+            params = await request.json()
+        else:
+            params = dict(await request.form())
+        params.update(request.query_params)
+
+        return await fake_slack.handle(method=method, params=params)
+
+    return app
+
+
+class FakeSlackServer:
+    """Serve the stand-in from a background thread"""
+
+    def __init__(self, fake_slack: FakeSlack, host: str = "127.0.0.1", port: int = 5099):
+        self.fake_slack = fake_slack
+        self.url = f"http://{host}:{port}/api/"
+        self.server = uvicorn.Server(
+            uvicorn.Config(create_fake_slack_app(fake_slack), host=host, port=port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
@@ -0,0 +1,97 @@
+import asyncio
+import itertools
+import random
+import time
+from typing import Awaitable, Callable
+
+import httpx
+import shortuuid
+
+from scripts.loadtest.seed import LoadTestTenant
+from scripts.loadtest.stats import LatencyRecorder
+
+
+class ScenarioRunner:
+    """Drive the API with a fixed number of concurrent clients, recording latency per endpoint"""
+
+    def __init__(self, client: httpx.AsyncClient, tenants: list[LoadTestTenant], recorder: LatencyRecorder):
+        self.client = client
+        self.tenants = tenants
+        self.recorder = recorder
+        # incidents created so far, updates are spread over these
+        self.incidents: list[tuple[LoadTestTenant, str]] = []
+
+    async def _call(self, name: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(name, time.perf_counter() - start, is_error=True)
+            return None
+
+        self.recorder.record(name, time.perf_counter() - start, is_error=response.status_code >= 400)
+        return response
+
+    async def create_incident(self) -> None:
+        tenant = random.choice(self.tenants)
+        response = await self._call(
+            "POST /incidents",
+            "POST",
+            "/incidents",
+            headers=tenant.headers(),
+            json=tenant.create_incident_payload(name=f"Load test {shortuuid.uuid()[:8]}"),
+        )
+        if response is not None and response.status_code == 200:
+            self.incidents.append((tenant, response.json()["id"]))
+
+    async def create_update(self) -> None:
+        if not self.incidents:
+            await self.create_incident()
+            return
+
+        tenant, incident_id = random.choice(self.incidents)
+        await self._call(
+            "POST /incidents/{id}/updates",
+            "POST",
+            f"/incidents/{incident_id}/updates",
+            headers=tenant.headers(),
+            json=tenant.update_incident_payload(),
+        )
+
+    async def read_status_page(self) -> None:
+        tenant = random.choice(self.tenants)
+        await self._call(
+            "GET /status-pages/public-status",
+            "GET",
+            "/status-pages/public-status",
+            params={"domain": tenant.status_page_domain},
+        )
+
+    async def run(self, action: Callable[[], Awaitable[None]], total_requests: int, concurrency: int) -> None:
+        counter = itertools.count()
+
+        async def worker() -> None:
+            while next(counter) < total_requests:
+                await action()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def incident_storm(self, total_requests: int, concurrency: int) -> None:
+        """Many incidents declared at once, each creates a channel and queues the Slack tasks"""
+        await self.run(self.create_incident, total_requests, concurrency)
+
+    async def update_burst(self, total_requests: int, concurrency: int) -> None:
+        """A few incidents receiving a flood of updates"""
+        await self.run(self.create_incident, max(total_requests // 20, 1), min(concurrency, 5))
+        await self.run(self.create_update, total_requests, concurrency)
+
+    async def status_page_flood(self, total_requests: int, concurrency: int) -> None:
+        """Public status pages being read during an outage"""
+        await self.run(self.read_status_page, total_requests, concurrency)
+
+
+SCENARIOS = {
+    "incident-storm": ScenarioRunner.incident_storm,
+    "update-burst": ScenarioRunner.update_burst,
+    "status-page-flood": ScenarioRunner.status_page_flood,
+}
@@ -0,0 +1,139 @@
+import random
+from dataclasses import dataclass
+from typing import Any
+
+import shortuuid
+from sqlalchemy.orm import Session
+
+from app.env import settings
+from app.models import FieldKind, Form, FormKind, IncidentStatusCategoryEnum, MemberRole, Organisation, StatusPageKind
+from app.repos import FormRepo, IncidentRepo, OrganisationRepo, SeverityRepo, StatusPageRepo, UserRepo
+from app.schemas.actions import (
+    CreateStatusPageComponentSchema,
+    CreateStatusPageItemSchema,
+    CreateStatusPageSchema,
+    CreateUserSchema,
+)
+from app.services.factories import create_onboarding_service
+
+
+@dataclass
+class LoadTestTenant:
+    """Everything the scenarios need to call the API as a member of the organisation"""
+
+    organisation_id: str
+    auth_token: str
+    status_page_domain: str
+    create_incident_fields: dict[FieldKind, str]
+    update_incident_fields: dict[FieldKind, str]
+    severity_ids: list[str]
+    incident_type_ids: list[str]
+    active_status_ids: list[str]
+    status_ids: list[str]
+
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.auth_token}", "x-organisation-id": self.organisation_id}
+
+    def create_incident_payload(self, name: str) -> dict[str, Any]:
+        values = {
+            FieldKind.INCIDENT_NAME: name,
+            FieldKind.INCIDENT_SUMMARY: f"Load test incident {name}",
+            FieldKind.INCIDENT_SEVERITY: random.choice(self.severity_ids),
+            FieldKind.INCIDENT_TYPE: random.choice(self.incident_type_ids),
+            FieldKind.INCIDENT_INITIAL_STATUS: random.choice(self.active_status_ids),
+        }
+        return {form_field_id: values[kind] for kind, form_field_id in self.create_incident_fields.items()}
+
+    def update_incident_payload(self) -> dict[str, Any]:
+        values = {
+            FieldKind.INCIDENT_SUMMARY: f"Load test update {shortuuid.uuid()[:8]}",
+            FieldKind.INCIDENT_SEVERITY: random.choice(self.severity_ids),
+            FieldKind.INCIDENT_STATUS: random.choice(self.status_ids),
+        }
+        return {form_field_id: values[kind] for kind, form_field_id in self.update_incident_fields.items()}
+
+
+def _form_field_ids(form: Form | None, kinds: set[FieldKind]) -> dict[FieldKind, str]:
+    """Form field ID for each of the core fields on the form"""
+    if not form:
+        raise RuntimeError("Organisation has not been set up")
+
+    return {
+        form_field.field.kind: form_field.id
+        for form_field in form.form_fields
+        if form_field.deleted_at is None and form_field.field.kind in kinds
+    }
+
+
+def seed_tenant(session: Session, slack_team_id: str, total_components: int = 10) -> LoadTestTenant:
+    """Create an organisation connected to the fake Slack workspace, with a user and a public status page"""
+    organisation_repo = OrganisationRepo(session=session)
+    user_repo = UserRepo(session=session)
+    form_repo = FormRepo(session=session)
+    incident_repo = IncidentRepo(session=session)
+    severity_repo = SeverityRepo(session=session)
+    status_page_repo = StatusPageRepo(session=session)
+
+    suffix = shortuuid.uuid()[:8].lower()
+    organisation: Organisation = organisation_repo.create_organisation(
+        name=f"Load test {suffix}", slack_team_name="Load test", slack_team_id=f"{slack_team_id}{suffix.upper()}"
+    )
+    organisation.slack_bot_token = f"xoxb-loadtest-{suffix}"
+    create_onboarding_service(session=session).setup_organisation(organisation=organisation)
+
+    user = user_repo.create_user(
+        create_in=CreateUserSchema(
+            name="Load test",
+            email_address=f"loadtest-{suffix}@loadtest.incidental.dev",
+            password=shortuuid.uuid(),
+            slack_user_id=f"U{suffix.upper()}",
+        )
+    )
+    user.is_email_verified = True
+    organisation_repo.add_member_if_not_exists(user=user, organisation=organisation, role=MemberRole.MEMBER)
+
+    status_page = status_page_repo.create(
+        organisation=organisation,
+        create_in=CreateStatusPageSchema(
+            name=f"Load test {suffix}",
+            slug=f"loadtest-{suffix}",
+            page_type=StatusPageKind.PUBLIC,
+            items=[
+                CreateStatusPageItemSchema(component=CreateStatusPageComponentSchema(name=f"Component {idx}"))
+                for idx in range(total_components)
+            ],
+        ),
+    )
+
+    create_form = form_repo.get_form(organisation=organisation, form_type=FormKind.CREATE_INCIDENT)
+    update_form = form_repo.get_form(organisation=organisation, form_type=FormKind.UPDATE_INCIDENT)
+    tenant = LoadTestTenant(
+        organisation_id=organisation.id,
+        auth_token=user.auth_token,
+        status_page_domain=f"{status_page.slug}.{settings.STATUS_PAGE_DOMAIN}",
+        create_incident_fields=_form_field_ids(
+            create_form,
+            {
+                FieldKind.INCIDENT_NAME,
+                FieldKind.INCIDENT_SUMMARY,
+                FieldKind.INCIDENT_SEVERITY,
+                FieldKind.INCIDENT_TYPE,
+                FieldKind.INCIDENT_INITIAL_STATUS,
+            },
+        ),
+        update_incident_fields=_form_field_ids(
+            update_form, {FieldKind.INCIDENT_SUMMARY, FieldKind.INCIDENT_SEVERITY, FieldKind.INCIDENT_STATUS}
+        ),
+        severity_ids=[severity.id for severity in severity_repo.get_all(organisation=organisation)],
+        incident_type_ids=[item.id for item in incident_repo.get_all_incident_types(organisation=organisation)],
+        active_status_ids=[
+            status.id
+            for status in incident_repo.get_incident_statuses_by_category(
+                organisation=organisation, category=IncidentStatusCategoryEnum.ACTIVE
+            )
+        ],
+        status_ids=[status.id for status in incident_repo.get_all_incident_statuses(organisation=organisation)],
+    )
+    session.commit()
+
+    return tenant
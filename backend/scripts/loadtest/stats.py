@@ -0,0 +1,64 @@
+import collections
+import math
+import threading
+import time
+from typing import Any
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class LatencyRecorder:
+    """Latencies and errors grouped by name, safe to share between threads"""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = collections.defaultdict(list)
+        self.errors: collections.Counter = collections.Counter()
+        self.lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.finished_at: float | None = None
+
+    def record(self, name: str, seconds: float, is_error: bool = False) -> None:
+        with self.lock:
+            self.samples[name].append(seconds)
+            if is_error:
+                self.errors[name] += 1
+
+    def finish(self) -> None:
+        self.finished_at = time.perf_counter()
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+
+        results: dict[str, dict[str, Any]] = {}
+        with self.lock:
+            for name, samples in sorted(self.samples.items()):
+                values = sorted(samples)
+                results[name] = {
+                    "count": len(values),
+                    "errors": self.errors[name],
+                    "throughput": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                    "p50": round(percentile(values, 50) * 1000, 2),
+                    "p95": round(percentile(values, 95) * 1000, 2),
+                    "p99": round(percentile(values, 99) * 1000, 2),
+                    "max": round(values[-1] * 1000, 2),
+                }
+
+        return results
+
+
+def format_table(title: str, summary: dict[str, dict[str, Any]]) -> str:
+    """Plain text table, latencies are in milliseconds and throughput per second"""
+    columns = ["count", "errors", "throughput", "p50", "p95", "p99", "max"]
+    name_width = max([len(title), *(len(name) for name in summary)]) + 2
+
+    lines = [title.ljust(name_width) + "".join(column.rjust(12) for column in columns)]
+    for name, row in summary.items():
+        lines.append(name.ljust(name_width) + "".join(str(row[column]).rjust(12) for column in columns))
+
+    return "\n".join(lines)
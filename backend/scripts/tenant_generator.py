@@ -0,0 +1,744 @@
+"""Generate organisations with large amounts of realistic data, used to reproduce scaling problems
+
+Everything below the organisation's configuration is loaded with COPY in batches, so millions of rows take minutes.
+The contents are decided by the seed and the time the history ends at, record IDs are random so the same seed can be
+generated more than once.
+"""
+
+import collections
+import math
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator
+
+import bcrypt
+from sqlalchemy.orm import Session
+
+from app.models import (
+    ComponentStatus,
+    FieldKind,
+    Incident,
+    IncidentFieldValue,
+    IncidentRoleAssignment,
+    IncidentRoleKind,
+    IncidentStatus,
+    IncidentStatusCategoryEnum,
+    IncidentUpdate,
+    InterfaceKind,
+    MemberRole,
+    Organisation,
+    OrganisationMember,
+    StatusPage,
+    StatusPageComponent,
+    StatusPageComponentAffected,
+    StatusPageComponentEvent,
+    StatusPageComponentGroup,
+    StatusPageIncident,
+    StatusPageIncidentStatus,
+    StatusPageIncidentUpdate,
+    StatusPageItem,
+    StatusPageKind,
+    TimestampKind,
+    TimestampValue,
+    User,
+)
+from app.repos import BulkRepo, FieldRepo, IncidentRepo, OrganisationRepo, SeverityRepo, TimestampRepo
+from app.services.factories import create_onboarding_service
+
+# most incidents are low severity, ordered from the most severe
+SEVERITY_WEIGHTS = (1, 4, 12, 20, 12)
+
+ADJECTIVES = ["Elevated", "Intermittent", "Partial", "Complete", "Slow", "Failed", "Delayed", "Missing", "Degraded"]
+SUBJECTS = ["API", "checkout", "login", "database", "queue", "search", "payments", "webhooks", "dashboard", "CDN"]
+PROBLEMS = ["errors", "latency", "timeouts", "outage", "data loss", "retries", "5xx responses", "backlog"]
+UPDATES = [
+    "Investigating reports of {problem}",
+    "Identified the cause as a bad deploy of {subject}",
+    "Rolled back {subject}, monitoring recovery",
+    "Error rates are back to normal",
+    "Customers notified, follow up actions recorded",
+]
+
+# when generated history ends, unless told otherwise
+DEFAULT_NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class TenantShape:
+    incidents: int
+    members: int
+    # updates per incident are geometrically distributed around this mean
+    updates_per_incident: float
+    # mean gap between updates, exponentially distributed
+    update_interval_minutes: float
+    # median time to resolve, log-normally distributed
+    incident_duration_hours: float
+    custom_fields: int
+    # options for each single select custom field, values are picked with a long tail
+    custom_field_options: int
+    status_pages: int
+    components_per_status_page: int
+    components_per_group: int
+    status_page_incidents_per_month: float
+    history_days: int
+
+
+SHAPES: dict[str, TenantShape] = {
+    "small": TenantShape(
+        incidents=1_000,
+        members=20,
+        updates_per_incident=6,
+        update_interval_minutes=30,
+        incident_duration_hours=3,
+        custom_fields=5,
+        custom_field_options=10,
+        status_pages=1,
+        components_per_status_page=20,
+        components_per_group=5,
+        status_page_incidents_per_month=4,
+        history_days=365,
+    ),
+    "medium": TenantShape(
+        incidents=20_000,
+        members=200,
+        updates_per_incident=10,
+        update_interval_minutes=30,
+        incident_duration_hours=4,
+        custom_fields=10,
+        custom_field_options=50,
+        status_pages=3,
+        components_per_status_page=200,
+        components_per_group=10,
+        status_page_incidents_per_month=15,
+        history_days=2 * 365,
+    ),
+    "large": TenantShape(
+        incidents=100_000,
+        members=1_000,
+        updates_per_incident=12,
+        update_interval_minutes=20,
+        incident_duration_hours=4,
+        custom_fields=20,
+        custom_field_options=500,
+        status_pages=5,
+        components_per_status_page=1_000,
+        components_per_group=20,
+        status_page_incidents_per_month=60,
+        history_days=3 * 365,
+    ),
+}
+
+
+@dataclass
+class GenerationResult:
+    organisation_id: str
+    rows: collections.Counter = field(default_factory=collections.Counter)
+    elapsed: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+
+class TenantGenerator:
+    def __init__(
+        self,
+        session: Session,
+        shape: TenantShape,
+        seed: int,
+        batch_size: int = 5_000,
+        now: datetime = DEFAULT_NOW,
+    ):
+        self.session = session
+        self.shape = shape
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.bulk_repo = BulkRepo(session=session)
+        self.incident_repo = IncidentRepo(session=session)
+        # generated history ends here, fixed so the same seed always generates the same data
+        self.now = now
+
+    def generate(self, name: str, on_batch: Callable[[GenerationResult], None] | None = None) -> GenerationResult:
+        started_at = time.perf_counter()
+        organisation = self._create_organisation(name)
+        result = GenerationResult(organisation_id=organisation.id)
+
+        def commit(rows: dict[str, int]) -> None:
+            self.session.commit()
+            result.rows.update(rows)
+            result.elapsed = time.perf_counter() - started_at
+            if on_batch:
+                on_batch(result)
+
+        member_ids = self._create_members(organisation, commit)
+        self._create_incidents(organisation, member_ids, commit)
+        for idx in range(self.shape.status_pages):
+            self._create_status_page(organisation, idx, member_ids, commit)
+
+        result.elapsed = time.perf_counter() - started_at
+        return result
+
+    def _create_organisation(self, name: str) -> Organisation:
+        """Configuration is small, so it's created the same way as for a real organisation"""
+        organisation = OrganisationRepo(session=self.session).create_organisation(name=name)
+        create_onboarding_service(session=self.session).setup_organisation(organisation=organisation)
+
+        field_repo = FieldRepo(session=self.session)
+        for idx in range(self.shape.custom_fields):
+            is_select = idx % 2 == 0
+            field_repo.create_field(
+                organisation=organisation,
+                label=f"Custom field {idx}",
+                interface_kind=InterfaceKind.SINGLE_SELECT if is_select else InterfaceKind.TEXT,
+                kind=FieldKind.USER_DEFINED,
+                available_options=(
+                    [f"Option {it}" for it in range(self.shape.custom_field_options)] if is_select else None
+                ),
+            )
+
+        self.session.commit()
+        return organisation
+
+    def _batches(self, total: int) -> Iterator[range]:
+        for start in range(0, total, self.batch_size):
+            yield range(start, min(start + self.batch_size, total))
+
+    def _random_time(self, days: int) -> datetime:
+        return self.now - timedelta(seconds=self.rng.uniform(0, days * 86400))
+
+    def _long_tail(self, options: list[Any]) -> Any:
+        """Pick an option where the first few are much more common than the rest"""
+        return options[min(int(self.rng.paretovariate(1.2)) - 1, len(options) - 1)]
+
+    def _create_members(self, organisation: Organisation, commit: Callable[[dict[str, int]], None]) -> list[str]:
+        # hashing is slow, every generated user shares a password nobody knows
+        password = bcrypt.hashpw(secrets.token_bytes(16), bcrypt.gensalt()).decode()
+        users: list[tuple] = []
+        members: list[tuple] = []
+
+        for idx in range(self.shape.members):
+            user_id = self.bulk_repo.generate_id(User)
+            created_at = self._random_time(self.shape.history_days)
+            users.append(
+                (
+                    user_id,
+                    f"Member {idx}",
+                    f"member-{idx}-{organisation.slug}@example.com",
+                    password,
+                    True,
+                    secrets.token_urlsafe(32),
+                    False,
+                    False,
+                    "en-gb",
+                    {},
+                    True,
+                    0,
+                    created_at,
+                    created_at,
+                )
+            )
+            members.append(
+                (
+                    self.bulk_repo.generate_id(OrganisationMember),
+                    user_id,
+                    organisation.id,
+                    MemberRole.MEMBER.value,
+                    created_at,
+                    created_at,
+                )
+            )
+
+        self.bulk_repo.copy_rows(
+            User,
+            [
+                "id",
+                "name",
+                "email_address",
+                "password",
+                "is_active",
+                "auth_token",
+                "is_super_admin",
+                "is_billing_user",
+                "language",
+                "settings",
+                "is_email_verified",
+                "login_attempts",
+                "created_at",
+                "updated_at",
+            ],
+            users,
+        )
+        self.bulk_repo.copy_rows(
+            OrganisationMember, ["id", "user_id", "organisation_id", "role", "created_at", "updated_at"], members
+        )
+        commit({"user": len(users), "organisation_member": len(members)})
+
+        return [user[0] for user in users]
+
+    def _status_path(self, statuses: list[IncidentStatus], is_resolved: bool) -> list[IncidentStatus]:
+        """Statuses an incident moves through, in order"""
+        by_category: dict[IncidentStatusCategoryEnum, list[IncidentStatus]] = collections.defaultdict(list)
+        for status in statuses:
+            by_category[status.category].append(status)
+
+        path = by_category[IncidentStatusCategoryEnum.TRIAGE][:1] + by_category[IncidentStatusCategoryEnum.ACTIVE]
+        if is_resolved:
+            path += (
+                by_category[IncidentStatusCategoryEnum.POST_INCIDENT] + by_category[IncidentStatusCategoryEnum.CLOSED]
+            )
+        return path
+
+    def _create_incidents(
+        self, organisation: Organisation, member_ids: list[str], commit: Callable[[dict[str, int]], None]
+    ) -> None:
+        shape = self.shape
+        severities = sorted(SeverityRepo(session=self.session).get_all(organisation), key=lambda it: it.rating)
+        severity_weights = [
+            SEVERITY_WEIGHTS[idx] if idx < len(SEVERITY_WEIGHTS) else 1 for idx in range(len(severities))
+        ]
+        incident_types = self.incident_repo.get_all_incident_types(organisation)
+        statuses = sorted(self.incident_repo.get_all_incident_statuses(organisation), key=lambda it: it.rank)
+        resolved_path = self._status_path(statuses, is_resolved=True)
+        active_path = self._status_path(statuses, is_resolved=False)
+        reporter_role = self.incident_repo.get_incident_role(organisation=organisation, kind=IncidentRoleKind.REPORTER)
+        if not reporter_role:
+            raise ValueError("Could not find role reporter")
+
+        custom_fields = [
+            it
+            for it in FieldRepo(session=self.session).get_all_fields(organisation)
+            if it.kind == FieldKind.USER_DEFINED
+        ]
+        timestamps = {
+            it.kind: it.id for it in TimestampRepo(session=self.session).get_timestamps_for_organisation(organisation)
+        }
+        reference_format = organisation.settings.incident_reference_format
+        # chance of another update is chosen so the geometric distribution has the shape's mean
+        continue_probability = 1 - 1 / max(shape.updates_per_incident, 1)
+        duration_mu = math.log(shape.incident_duration_hours * 3600)
+
+        for batch in self._batches(shape.incidents):
+            reference_ids = self.incident_repo.reserve_reference_ids(organisation=organisation, total=len(batch))
+            incidents: list[tuple] = []
+            role_assignments: list[tuple] = []
+            updates: list[tuple] = []
+            field_values: list[tuple] = []
+            timestamp_values: list[tuple] = []
+
+            for reference_id in reference_ids:
+                incident_id = self.bulk_repo.generate_id(Incident)
+                creator_id = self.rng.choice(member_ids)
+                created_at = self._random_time(shape.history_days)
+                duration = timedelta(seconds=self.rng.lognormvariate(duration_mu, 1.0))
+                is_resolved = created_at + duration < self.now
+                path = resolved_path if is_resolved else active_path
+                severity = self.rng.choices(severities, weights=severity_weights)[0]
+                subject = self.rng.choice(SUBJECTS)
+                problem = self.rng.choice(PROBLEMS)
+
+                # updates are spread over the incident, the last moves it to its final status
+                total_updates = 1
+                while self.rng.random() < continue_probability:
+                    total_updates += 1
+                update_times = sorted(
+                    created_at + timedelta(minutes=self.rng.expovariate(1 / shape.update_interval_minutes) * (idx + 1))
+                    for idx in range(total_updates)
+                )
+                if is_resolved:
+                    update_times[-1] = max(update_times[-1], created_at + duration)
+                update_times = [min(it, self.now) for it in update_times]
+
+                previous_status = path[0]
+                previous_severity = severity
+                for idx, update_time in enumerate(update_times):
+                    position = round((idx + 1) / total_updates * (len(path) - 1))
+                    new_status = path[position] if path[position] is not previous_status else None
+                    # severity occasionally changes while the incident is being investigated
+                    new_severity = (
+                        self.rng.choices(severities, weights=severity_weights)[0] if self.rng.random() < 0.1 else None
+                    )
+                    updates.append(
+                        (
+                            self.bulk_repo.generate_id(IncidentUpdate),
+                            incident_id,
+                            self.rng.choice(member_ids),
+                            self.rng.choice(UPDATES).format(subject=subject, problem=problem),
+                            new_status.id if new_status else None,
+                            new_severity.id if new_severity else None,
+                            previous_status.id if new_status else None,
+                            previous_severity.id if new_severity else None,
+                            update_time,
+                            update_time,
+                        )
+                    )
+                    previous_status = new_status or previous_status
+                    previous_severity = new_severity or previous_severity
+
+                incidents.append(
+                    (
+                        incident_id,
+                        organisation.id,
+                        self.rng.choice(incident_types).id,
+                        previous_status.id,
+                        creator_id,
+                        previous_severity.id,
+                        f"{self.rng.choice(ADJECTIVES)} {subject} {problem}",
+                        reference_format.replace("{id}", str(reference_id)),
+                        reference_id,
+                        None,
+                        None,
+                        None,
+                        created_at,
+                        update_times[-1],
+                    )
+                )
+                role_assignments.append(
+                    (
+                        self.bulk_repo.generate_id(IncidentRoleAssignment),
+                        creator_id,
+                        incident_id,
+                        reporter_role.id,
+                        created_at,
+                        created_at,
+                    )
+                )
+
+                for custom_field in custom_fields:
+                    # not every incident has every field filled in
+                    if self.rng.random() < 0.3:
+                        continue
+                    is_select = custom_field.interface_kind == InterfaceKind.SINGLE_SELECT
+                    field_values.append(
+                        (
+                            self.bulk_repo.generate_id(IncidentFieldValue),
+                            incident_id,
+                            custom_field.id,
+                            None if is_select else f"{subject} {problem}",
+                            self._long_tail(custom_field.available_options) if is_select else None,
+                            None,
+                            created_at,
+                            created_at,
+                        )
+                    )
+
+                timestamp_times = {TimestampKind.REPORTED_AT: created_at, TimestampKind.ACCEPTED_AT: update_times[0]}
+                if is_resolved:
+                    timestamp_times[TimestampKind.RESOLVED_AT] = created_at + duration
+                    timestamp_times[TimestampKind.CLOSED_AT] = update_times[-1]
+                for kind, value in timestamp_times.items():
+                    if kind in timestamps:
+                        timestamp_values.append(
+                            (
+                                self.bulk_repo.generate_id(TimestampValue),
+                                timestamps[kind],
+                                incident_id,
+                                value,
+                                value,
+                                value,
+                            )
+                        )
+
+            self.bulk_repo.copy_rows(
+                Incident,
+                [
+                    "id",
+                    "organisation_id",
+                    "incident_type_id",
+                    "incident_status_id",
+                    "creator_id",
+                    "incident_severity_id",
+                    "name",
+                    "reference",
+                    "reference_id",
+                    "description",
+                    "slack_channel_id",
+                    "slack_channel_name",
+                    "created_at",
+                    "updated_at",
+                ],
+                incidents,
+            )
+            self.bulk_repo.copy_rows(
+                IncidentRoleAssignment,
+                ["id", "user_id", "incident_id", "incident_role_id", "created_at", "updated_at"],
+                role_assignments,
+            )
+            self.bulk_repo.copy_rows(
+                IncidentUpdate,
+                [
+                    "id",
+                    "incident_id",
+                    "creator_id",
+                    "summary",
+                    "new_incident_status_id",
+                    "new_incident_severity_id",
+                    "previous_incident_status_id",
+                    "previous_incident_severity_id",
+                    "created_at",
+                    "updated_at",
+                ],
+                updates,
+            )
+            self.bulk_repo.copy_rows(
+                IncidentFieldValue,
+                [
+                    "id",
+                    "incident_id",
+                    "field_id",
+                    "value_text",
+                    "value_single_select",
+                    "value_multi_select",
+                    "created_at",
+                    "updated_at",
+                ],
+                field_values,
+            )
+            self.bulk_repo.copy_rows(
+                TimestampValue,
+                ["id", "timestamp_id", "incident_id", "value", "created_at", "updated_at"],
+                timestamp_values,
+            )
+            commit(
+                {
+                    "incident": len(incidents),
+                    "incident_role_assignment": len(role_assignments),
+                    "incident_update": len(updates),
+                    "incident_field_value": len(field_values),
+                    "timestamp_value": len(timestamp_values),
+                }
+            )
+
+    def _create_status_page(
+        self, organisation: Organisation, idx: int, member_ids: list[str], commit: Callable[[dict[str, int]], None]
+    ) -> None:
+        shape = self.shape
+        published_at = self.now - timedelta(days=shape.history_days)
+
+        status_page = StatusPage()
+        status_page.organisation_id = organisation.id
+        status_page.name = f"{organisation.name} status {idx}"
+        status_page.page_type = StatusPageKind.PUBLIC
+        status_page.slug = f"{organisation.slug}-{idx}"
+        status_page.published_at = published_at
+        status_page.support_label = "Contact support"
+        self.session.add(status_page)
+        self.session.flush()
+
+        groups: list[tuple] = []
+        components: list[tuple] = []
+        items: list[tuple] = []
+        total_groups = math.ceil(shape.components_per_status_page / shape.components_per_group)
+        for group_rank in range(total_groups):
+            group_id = self.bulk_repo.generate_id(StatusPageComponentGroup)
+            group_item_id = self.bulk_repo.generate_id(StatusPageItem)
+            groups.append((group_id, f"Region {group_rank}", status_page.id, published_at, published_at))
+            items.append((group_item_id, None, status_page.id, None, group_id, group_rank, published_at, published_at))
+
+            first = group_rank * shape.components_per_group
+            for rank, component_idx in enumerate(
+                range(first, min(first + shape.components_per_group, shape.components_per_status_page))
+            ):
+                component_id = self.bulk_repo.generate_id(StatusPageComponent)
+                components.append(
+                    (
+                        component_id,
+                        status_page.id,
+                        f"Service {component_idx}",
+                        False,
+                        True,
+                        published_at,
+                        published_at,
+                        published_at,
+                    )
+                )
+                items.append(
+                    (
+                        self.bulk_repo.generate_id(StatusPageItem),
+                        group_item_id,
+                        status_page.id,
+                        component_id,
+                        None,
+                        rank,
+                        published_at,
+                        published_at,
+                    )
+                )
+
+        self.bulk_repo.copy_rows(
+            StatusPageComponentGroup, ["id", "name", "status_page_id", "created_at", "updated_at"], groups
+        )
+        self.bulk_repo.copy_rows(
+            StatusPageComponent,
+            [
+                "id",
+                "status_page_id",
+                "name",
+                "is_hidden",
+                "is_uptime_shown",
+                "published_at",
+                "created_at",
+                "updated_at",
+            ],
+            components,
+        )
+        self.bulk_repo.copy_rows(
+            StatusPageItem,
+            [
+                "id",
+                "parent_id",
+                "status_page_id",
+                "status_page_component_id",
+                "status_page_component_group_id",
+                "rank",
+                "created_at",
+                "updated_at",
+            ],
+            items,
+        )
+        commit(
+            {
+                "status_page": 1,
+                "status_page_component_group": len(groups),
+                "status_page_component": len(components),
+                "status_page_item": len(items),
+            }
+        )
+
+        component_ids = [component[0] for component in components]
+        total_incidents = round(shape.status_page_incidents_per_month * shape.history_days / 30)
+        outage_statuses = [
+            ComponentStatus.DEGRADED_PERFORMANCE,
+            ComponentStatus.PARTIAL_OUTAGE,
+            ComponentStatus.FULL_OUTAGE,
+        ]
+        duration_mu = math.log(shape.incident_duration_hours * 3600)
+
+        for batch in self._batches(total_incidents):
+            incidents: list[tuple] = []
+            incident_updates: list[tuple] = []
+            affected: list[tuple] = []
+            events: list[tuple] = []
+
+            for _ in batch:
+                incident_id = self.bulk_repo.generate_id(StatusPageIncident)
+                creator_id = self.rng.choice(member_ids)
+                started_at = self._random_time(shape.history_days)
+                ended_at: datetime | None = started_at + timedelta(seconds=self.rng.lognormvariate(duration_mu, 1.0))
+                if ended_at and ended_at > self.now:
+                    ended_at = None
+                status = StatusPageIncidentStatus.RESOLVED if ended_at else StatusPageIncidentStatus.INVESTIGATING
+
+                incidents.append(
+                    (
+                        incident_id,
+                        status_page.id,
+                        creator_id,
+                        f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(SUBJECTS)} {self.rng.choice(PROBLEMS)}",
+                        started_at,
+                        status.value,
+                        started_at,
+                        ended_at or started_at,
+                    )
+                )
+                incident_updates.append(
+                    (
+                        self.bulk_repo.generate_id(StatusPageIncidentUpdate),
+                        incident_id,
+                        creator_id,
+                        "We are investigating",
+                        StatusPageIncidentStatus.INVESTIGATING.value,
+                        started_at,
+                        started_at,
+                        started_at,
+                    )
+                )
+                if ended_at:
+                    incident_updates.append(
+                        (
+                            self.bulk_repo.generate_id(StatusPageIncidentUpdate),
+                            incident_id,
+                            creator_id,
+                            "This incident has been resolved",
+                            StatusPageIncidentStatus.RESOLVED.value,
+                            ended_at,
+                            ended_at,
+                            ended_at,
+                        )
+                    )
+
+                # most incidents affect a handful of components, a few affect a whole region
+                total_affected = min(int(self.rng.paretovariate(1.5)), len(component_ids))
+                for component_id in self.rng.sample(component_ids, k=total_affected):
+                    component_status = self.rng.choices(outage_statuses, weights=(6, 3, 1))[0]
+                    affected.append(
+                        (
+                            self.bulk_repo.generate_id(StatusPageComponentAffected),
+                            incident_id,
+                            component_id,
+                            component_status.value,
+                            started_at,
+                            started_at,
+                        )
+                    )
+                    events.append(
+                        (
+                            self.bulk_repo.generate_id(StatusPageComponentEvent),
+                            incident_id,
+                            component_id,
+                            component_status.value,
+                            started_at,
+                            ended_at,
+                            started_at,
+                            ended_at or started_at,
+                        )
+                    )
+
+            self.bulk_repo.copy_rows(
+                StatusPageIncident,
+                ["id", "status_page_id", "creator_id", "name", "published_at", "status", "created_at", "updated_at"],
+                incidents,
+            )
+            self.bulk_repo.copy_rows(
+                StatusPageIncidentUpdate,
+                [
+                    "id",
+                    "status_page_incident_id",
+                    "creator_id",
+                    "message",
+                    "status",
+                    "published_at",
+                    "created_at",
+                    "updated_at",
+                ],
+                incident_updates,
+            )
+            self.bulk_repo.copy_rows(
+                StatusPageComponentAffected,
+                ["id", "status_page_incident_id", "status_page_component_id", "status", "created_at", "updated_at"],
+                affected,
+            )
+            self.bulk_repo.copy_rows(
+                StatusPageComponentEvent,
+                [
+                    "id",
+                    "status_page_incident_id",
+                    "status_page_component_id",
+                    "status",
+                    "started_at",
+                    "ended_at",
+                    "created_at",
+                    "updated_at",
+                ],
+                events,
+            )
+            commit(
+                {
+                    "status_page_incident": len(incidents),
+                    "status_page_incident_update": len(incident_updates),
+                    "status_page_component_affected": len(affected),
+                    "status_page_component_event": len(events),
+                }
+            )
@@ -5,9 +5,14 @@ from faker import Faker
 from sqlalchemy.orm import Session
 
 from app.db import session_factory
-from app.models import MemberRole, Organisation, User
-from app.repos import OrganisationRepo, UserRepo
-from app.schemas.actions import CreateUserSchema
+from app.models import MemberRole, Organisation, StatusPage, StatusPageKind, User
+from app.repos import OrganisationRepo, StatusPageRepo, UserRepo
+from app.schemas.actions import (
+    CreateStatusPageComponentSchema,
+    CreateStatusPageItemSchema,
+    CreateStatusPageSchema,
+    CreateUserSchema,
+)
 
 test_db: Session = session_factory()
 
@@ -59,3 +64,23 @@ def make_organisation() -> Organisation:
     test_db.commit()
 
     return organisation
+
+
+def make_status_page(organisation: Organisation, total_components: int = 2) -> StatusPage:
+    repo = StatusPageRepo(test_db)
+    id = make_identifier("status-page")
+    status_page = repo.create(
+        organisation=organisation,
+        create_in=CreateStatusPageSchema(
+            name=id,
+            slug=id,
+            page_type=StatusPageKind.PUBLIC,
+            items=[
+                CreateStatusPageItemSchema(component=CreateStatusPageComponentSchema(name=f"Component {idx}"))
+                for idx in range(total_components)
+            ],
+        ),
+    )
+    test_db.commit()
+
+    return status_page
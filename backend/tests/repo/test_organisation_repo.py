@@ -1,8 +1,9 @@
 from faker import Faker
 from sqlalchemy.orm import Session
 
-from app.models import Organisation
-from app.repos import OrganisationRepo
+from app.models import MemberRole, Organisation
+from app.repos import OrganisationRepo, UserRepo
+from tests.factories import make_organisation
 
 
 def test_organisation_repo_create_slug(db: Session, faker: Faker):
@@ -20,3 +21,22 @@ def test_organisation_repo_create_slug(db: Session, faker: Faker):
 
     slugs = set([org.slug for org in orgs])
     assert len(slugs) == n
+
+
+def test_organisation_repo_add_members_if_not_exist(db: Session):
+    organisation = make_organisation()
+    user_repo = UserRepo(session=db)
+    organisation_repo = OrganisationRepo(session=db)
+
+    created = user_repo.create_slack_users(
+        members=[("U01", "First", "first@example.com"), ("U02", "Second", "second@example.com")],
+        password_hash="not-a-real-hash",
+    )
+    # already taken, so skipped
+    assert user_repo.create_slack_users(members=[("U03", "Again", "FIRST@example.com")], password_hash="x") == {}
+
+    organisation_repo.add_members_if_not_exist(created.values(), organisation=organisation, role=MemberRole.MEMBER)
+    organisation_repo.add_members_if_not_exist(created.values(), organisation=organisation, role=MemberRole.MEMBER)
+
+    assert sorted(created) == ["U01", "U02"]
+    assert len(user_repo.get_all_organisation_members(organisation=organisation)) == 2
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.db import engine
+from app.models import (
+    ComponentStatus,
+    StatusPageComponentDailySummary,
+    StatusPageComponentEvent,
+    StatusPageComponentEventArchive,
+    StatusPageIncident,
+    StatusPageIncidentStatus,
+)
+from app.repos import StatusPageRepo
+from app.schemas.actions import CreateStatusPageIncidentSchema
+from app.schemas.models import StatusPageSchema
+from app.schemas.tasks import ArchiveComponentEventsParameters
+from app.tasks.archive_component_events import ArchiveComponentEventsTask
+from app.utils import LIVE_EVENTS_KEY, status_page_channel
+from tests.factories import make_organisation, make_status_page, make_user
+
+
+def test_archive_component_events(db: Session):
+    organisation = make_organisation()
+    user = make_user(organisation=organisation).user
+    status_page = make_status_page(organisation=organisation, total_components=1)
+    component = status_page.status_page_components[0]
+
+    incident = StatusPageIncident()
+    incident.status_page_id = status_page.id
+    incident.creator_id = user.id
+    incident.name = "Old incident"
+    incident.status = "RESOLVED"
+    incident.published_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    db.add(incident)
+    db.flush()
+
+    event = StatusPageComponentEvent()
+    event.status_page_incident_id = incident.id
+    event.status_page_component_id = component.id
+    event.status = ComponentStatus.FULL_OUTAGE
+    event.started_at = datetime(2020, 1, 1, 22, tzinfo=timezone.utc)
+    event.ended_at = datetime(2020, 1, 2, 1, tzinfo=timezone.utc)
+    db.add(event)
+    db.commit()
+
+    repo = StatusPageRepo(session=db)
+    events = repo.get_component_events_ended_before(before=datetime.now(tz=timezone.utc) - timedelta(days=1), limit=10)
+    repo.archive_component_events(events)
+    db.commit()
+
+    assert db.scalar(select(StatusPageComponentEvent).where(StatusPageComponentEvent.id == event.id)) is None
+    archived = db.scalar(select(StatusPageComponentEventArchive).where(StatusPageComponentEventArchive.id == event.id))
+    assert archived and archived.status == ComponentStatus.FULL_OUTAGE
+
+
+def test_archive_component_events_keeps_merged_daily_summary(db: Session):
+    organisation = make_organisation()
+    user = make_user(organisation=organisation).user
+    status_page = make_status_page(organisation=organisation, total_components=1)
+    component = status_page.status_page_components[0]
+
+    incident = StatusPageIncident()
+    incident.status_page_id = status_page.id
+    incident.creator_id = user.id
+    incident.name = "Old incident"
+    incident.status = "RESOLVED"
+    incident.published_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    db.add(incident)
+    db.flush()
+
+    # overlap for an hour, archived in separate batches
+    for started_at, ended_at in [
+        (datetime(2020, 1, 1, 22, tzinfo=timezone.utc), datetime(2020, 1, 2, 1, tzinfo=timezone.utc)),
+        (datetime(2020, 1, 2, 0, tzinfo=timezone.utc), datetime(2020, 1, 2, 2, tzinfo=timezone.utc)),
+    ]:
+        event = StatusPageComponentEvent()
+        event.status_page_incident_id = incident.id
+        event.status_page_component_id = component.id
+        event.status = ComponentStatus.FULL_OUTAGE
+        event.started_at = started_at
+        event.ended_at = ended_at
+        db.add(event)
+    db.commit()
+
+    ArchiveComponentEventsTask(session=db).execute(ArchiveComponentEventsParameters(batch_size=1))
+
+    summaries = db.scalars(
+        select(StatusPageComponentDailySummary)
+        .where(StatusPageComponentDailySummary.status_page_component_id == component.id)
+        .order_by(StatusPageComponentDailySummary.day)
+    ).all()
+    assert [(it.day.isoformat(), it.full_outage_seconds, it.worst_status) for it in summaries] == [
+        ("2020-01-01", 7200, ComponentStatus.FULL_OUTAGE),
+        ("2020-01-02", 7200, ComponentStatus.FULL_OUTAGE),
+    ]
+
+
+def test_create_incident_queues_delta_until_commit(db: Session):
+    organisation = make_organisation()
+    user = make_user(organisation=organisation).user
+    status_page = make_status_page(organisation=organisation, total_components=2)
+    component = status_page.status_page_components[0]
+
+    repo = StatusPageRepo(session=db)
+    incident = repo.create_incident(
+        creator=user,
+        status_page=status_page,
+        create_in=CreateStatusPageIncidentSchema(
+            name="API errors",
+            message="Investigating",
+            status=StatusPageIncidentStatus.INVESTIGATING,
+            affected_components={component.id: ComponentStatus.PARTIAL_OUTAGE},
+        ),
+    )
+
+    [(channel, type, delta, _)] = db.info[LIVE_EVENTS_KEY]
+    assert channel == status_page_channel(status_page.id)
+    assert type == "incident.created"
+    assert delta["incident"]["id"] == incident.id
+    assert [(it["statusPageComponentId"], it["status"]) for it in delta["events"]] == [
+        (component.id, ComponentStatus.PARTIAL_OUTAGE.value)
+    ]
+
+    db.rollback()
+
+
+def test_load_item_trees_queries_do_not_grow_with_items(db: Session):
+    organisation = make_organisation()
+    repo = StatusPageRepo(session=db)
+    statements: list[str] = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def count_serialize_statements(total_components: int) -> tuple[int, StatusPageSchema]:
+        status_page = make_status_page(organisation=organisation, total_components=total_components)
+        db.expire_all()
+        statements.clear()
+
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            repo.load_item_trees([status_page])
+            schema = StatusPageSchema.model_validate(status_page)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+        return len(statements), schema
+
+    few_count, _ = count_serialize_statements(2)
+    many_count, schema = count_serialize_statements(50)
+
+    assert many_count == few_count
+    assert len(schema.status_page_items) == 50
+    assert schema.status_page_items[0].status_page_component.name == "Component 0"
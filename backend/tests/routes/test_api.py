@@ -49,3 +49,46 @@ def test_login_wrong_password():
 
     assert response.status_code == 422
     assert response.json()["detail"] == "Could not login, please try again"
+
+
+def test_metrics_records_route_template():
+    organisation = make_organisation()
+    make_user_result = make_user(organisation=organisation)
+    auth_in = AuthUserSchema(
+        email_address=make_user_result.user.email_address,
+        password=make_user_result.password,
+    )
+    client.post("/users/auth", json=auth_in.model_dump())
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="POST",route="/users/auth",status="200"}' in response.text
+    assert 'db_queries_per_request_count{route="/users/auth"}' in response.text
+
+
+def test_read_only_route_authenticates_on_read_session():
+    organisation = make_organisation()
+    make_user_result = make_user(organisation=organisation)
+
+    response = client.get(
+        "/severities/search",
+        headers={"Authorization": f"Bearer {make_user_result.user.auth_token}", "x-organisation-id": organisation.id},
+    )
+
+    assert response.status_code == 200
+
+
+def test_read_only_route_rejects_other_organisation():
+    make_user_result = make_user(organisation=make_organisation())
+    other_organisation = make_organisation()
+
+    response = client.get(
+        "/severities/search",
+        headers={
+            "Authorization": f"Bearer {make_user_result.user.auth_token}",
+            "x-organisation-id": other_organisation.id,
+        },
+    )
+
+    assert response.status_code == 403
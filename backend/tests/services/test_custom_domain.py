@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.env import settings
+from app.models import StatusPage
+from app.services.custom_domain import CustomDomainService
+from app.services.vercel.client import AsyncVercelClient, VercelClient
+
+
+class FakeVercel:
+    """Stand-in for the Vercel API's domain config endpoint, tracking how many requests are in flight"""
+
+    def __init__(self, configured: set[str], failing: frozenset[str] = frozenset()):
+        self.configured = configured
+        self.failing = failing
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        domain = request.url.path.split("/")[3]
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+
+        if domain in self.failing:
+            return httpx.Response(500, json={"error": {"code": "internal_server_error"}})
+
+        return httpx.Response(
+            200,
+            json={
+                "configuredBy": "CNAME" if domain in self.configured else None,
+                "nameservers": [],
+                "serviceType": "external",
+                "cnames": [],
+                "aValues": [],
+                "conflicts": [],
+                "acceptedChallenges": [],
+                "misconfigured": domain not in self.configured,
+            },
+        )
+
+
+def test_domains_are_checked_concurrently_within_the_limit():
+    domains = [f"status{idx}.example.com" for idx in range(20)]
+    fake_vercel = FakeVercel(configured={domains[0], domains[1]}, failing={domains[2]})
+    service = CustomDomainService(client=VercelClient(token="test"))
+
+    async def check() -> dict[str, bool | None]:
+        async with AsyncVercelClient(
+            token="test", base_url="http://vercel.test", transport=httpx.MockTransport(fake_vercel)
+        ) as client:
+            return await service.check_domains_are_configured(client=client, domains=domains, concurrency=5)
+
+    results = asyncio.run(check())
+
+    assert fake_vercel.most_in_flight == 5
+    assert results[domains[0]] is True and results[domains[1]] is True
+    assert results[domains[2]] is None
+    assert [results[domain] for domain in domains[3:]] == [False] * 17
+
+
+def test_unconfigured_domains_are_checked_less_often():
+    service = CustomDomainService(client=VercelClient(token="test"))
+    status_page = StatusPage(custom_domain="status.example.com", custom_domain_check_attempts=0)
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    delays = []
+    for _ in range(12):
+        service.record_check(status_page, is_configured=False, now=now)
+        assert status_page.custom_domain_next_check_at is not None
+        delays.append(status_page.custom_domain_next_check_at - now)
+
+    assert delays[0] == timedelta(seconds=settings.CUSTOM_DOMAIN_CHECK_MIN_SECONDS)
+    assert delays[1] == delays[0] * 2
+    assert delays[-1] == timedelta(seconds=settings.CUSTOM_DOMAIN_CHECK_MAX_SECONDS)
+
+    service.record_check(status_page, is_configured=True, now=now)
+    assert status_page.is_custom_domain_verified
+    assert status_page.custom_domain_next_check_at is None
+
+
+def test_failed_checks_are_tried_again_at_the_same_delay():
+    service = CustomDomainService(client=VercelClient(token="test"))
+    status_page = StatusPage(custom_domain="status.example.com", custom_domain_check_attempts=3)
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    service.record_check(status_page, is_configured=None, now=now)
+
+    assert status_page.custom_domain_check_attempts == 3
+    assert status_page.custom_domain_next_check_at == now + timedelta(
+        seconds=settings.CUSTOM_DOMAIN_CHECK_MIN_SECONDS * 2**2
+    )
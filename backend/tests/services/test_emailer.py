@@ -0,0 +1,219 @@
+import json
+from collections import deque
+from typing import Sequence
+
+import httpx
+import pytest
+
+from app.services import emailer as emailer_module
+from app.services.emailer import (
+    OUTBOX_KEY,
+    PROCESSING_KEY,
+    Emailer,
+    EmailMessage,
+    EmailTransportBase,
+    FileTransport,
+    SendgridTransport,
+)
+
+
+class FakeRedis:
+    """Just the list commands the outbox uses"""
+
+    def __init__(self):
+        self.lists: dict[str, deque[bytes]] = {}
+
+    def delete(self, *keys):
+        for key in keys:
+            self.lists.pop(key, None)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, deque()).extend(it.encode() if isinstance(it, str) else it for it in values)
+
+    def lpush(self, key, *values):
+        self.lists.setdefault(key, deque()).extendleft(it.encode() if isinstance(it, str) else it for it in values)
+
+    def lmove(self, source, destination, src, dest):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        item = items.popleft() if src == "LEFT" else items.pop()
+        destination_items = self.lists.setdefault(destination, deque())
+        destination_items.appendleft(item) if dest == "LEFT" else destination_items.append(item)
+        return item
+
+    def lock(self, name, timeout, blocking):
+        return FakeLock()
+
+    def pipeline(self, transaction):
+        return FakePipeline(self)
+
+
+class FakeLock:
+    def acquire(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands: list = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((getattr(self.redis, name), args))
+
+    def execute(self):
+        return [command(*args) for command, args in self.commands]
+
+
+def create_message(to_address: str, template_id: str = "d-template") -> EmailMessage:
+    return EmailMessage(to_address=to_address, template_id=template_id, template_vars={"name": to_address})
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    delays: list[float] = []
+    monkeypatch.setattr(emailer_module.time, "sleep", delays.append)
+    return delays
+
+
+def create_transport(handler) -> tuple[SendgridTransport, list[dict]]:
+    payloads: list[dict] = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return handler(request)
+
+    client = httpx.Client(base_url="https://sendgrid.test", transport=httpx.MockTransport(record))
+    return SendgridTransport(client=client), payloads
+
+
+def test_sendgrid_batches_recipients_by_template():
+    transport, payloads = create_transport(lambda request: httpx.Response(202))
+    messages = [create_message(f"user-{idx}@example.com") for idx in range(30)]
+    messages.append(create_message("other@example.com", template_id="d-other"))
+
+    transport.send_batch(messages)
+
+    assert len(payloads) == 2
+    personalizations = {it["template_id"]: it["personalizations"] for it in payloads}
+    assert len(personalizations["d-template"]) == 30
+    assert personalizations["d-other"] == [
+        {"to": [{"email": "other@example.com"}], "dynamic_template_data": {"name": "other@example.com"}}
+    ]
+
+
+def test_sendgrid_retries_rate_limited_requests(no_sleep):
+    responses = iter([httpx.Response(429, headers={"retry-after": "5"}), httpx.Response(503), httpx.Response(202)])
+    transport, payloads = create_transport(lambda request: next(responses))
+
+    transport.send_batch([create_message("user@example.com")])
+
+    assert len(payloads) == 3
+    assert no_sleep == [5, 2]
+
+
+def test_sendgrid_does_not_retry_rejected_requests(no_sleep):
+    transport, payloads = create_transport(lambda request: httpx.Response(400))
+
+    transport.send_batch([create_message("user@example.com")])
+
+    assert len(payloads) == 1
+    assert no_sleep == []
+
+
+def test_sendgrid_sends_rejected_batches_one_at_a_time():
+    def handler(request: httpx.Request) -> httpx.Response:
+        personalizations = json.loads(request.content)["personalizations"]
+        addresses = [it["to"][0]["email"] for it in personalizations]
+        return httpx.Response(400 if "not-an-address" in addresses else 202)
+
+    transport, payloads = create_transport(handler)
+    messages = [create_message("a@example.com"), create_message("not-an-address"), create_message("b@example.com")]
+
+    assert transport.send_batch(messages) == []
+    # the batch, then each email alone
+    assert [len(it["personalizations"]) for it in payloads] == [3, 1, 1, 1]
+
+
+def test_sendgrid_returns_emails_which_could_not_be_sent(no_sleep):
+    transport, payloads = create_transport(lambda request: httpx.Response(503))
+    messages = [create_message("a@example.com"), create_message("b@example.com")]
+
+    assert transport.send_batch(messages) == messages
+
+
+class FlakyTransport(EmailTransportBase):
+    def __init__(self):
+        self.sent: list[str] = []
+        self.calls = 0
+
+    def send_batch(self, messages: Sequence[EmailMessage]) -> list[EmailMessage]:
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionRefusedError()
+        self.sent.extend(it.to_address for it in messages)
+        return []
+
+
+def test_flush_puts_emails_back_when_sending_fails(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(emailer_module, "_get_redis", lambda: redis)
+    addresses = [f"user-{idx}@example.com" for idx in range(5)]
+    redis.rpush(OUTBOX_KEY, *[create_message(it).model_dump_json() for it in addresses])
+    transport = FlakyTransport()
+    emailer = Emailer(transport=transport)
+
+    with pytest.raises(ConnectionRefusedError):
+        emailer.flush(batch_size=2)
+    assert len(redis.lists[OUTBOX_KEY]) == 5
+    assert not redis.lists.get(PROCESSING_KEY)
+
+    assert emailer.flush(batch_size=2) == 5
+    assert transport.sent == addresses
+    assert not redis.lists.get(OUTBOX_KEY)
+    assert not redis.lists.get(PROCESSING_KEY)
+
+
+class FailingTransport(EmailTransportBase):
+    """Fails to send anything to a failing address, in a different order to how they were given"""
+
+    def send_batch(self, messages: Sequence[EmailMessage]) -> list[EmailMessage]:
+        return [it for it in reversed(messages) if it.to_address.startswith("failing")]
+
+
+def test_flush_puts_failed_emails_back_at_the_front_until_dropped(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(emailer_module, "_get_redis", lambda: redis)
+    monkeypatch.setattr(emailer_module.settings, "EMAIL_MAX_FLUSH_ATTEMPTS", 2)
+    addresses = ["failing-1@example.com", "user@example.com", "failing-2@example.com", "later@example.com"]
+    redis.rpush(OUTBOX_KEY, *[create_message(it).model_dump_json() for it in addresses])
+    emailer = Emailer(transport=FailingTransport())
+
+    assert emailer.flush(batch_size=3) == 1
+    queued = [EmailMessage.model_validate_json(it) for it in redis.lists[OUTBOX_KEY]]
+    assert [it.to_address for it in queued] == ["failing-1@example.com", "failing-2@example.com", "later@example.com"]
+    assert [it.flush_attempts for it in queued] == [1, 1, 0]
+
+    # the second failure drops them
+    assert emailer.flush(batch_size=3) == 1
+    assert not redis.lists.get(OUTBOX_KEY)
+    assert not redis.lists.get(PROCESSING_KEY)
+
+
+def test_file_transport_appends_messages(tmp_path):
+    path = tmp_path / "emails.jsonl"
+    transport = FileTransport(path=str(path))
+
+    transport.send_batch([create_message("a@example.com")])
+    transport.send_batch([create_message("b@example.com"), create_message("c@example.com")])
+
+    lines = path.read_text().splitlines()
+    assert [EmailMessage.model_validate_json(it).to_address for it in lines] == [
+        "a@example.com",
+        "b@example.com",
+        "c@example.com",
+    ]
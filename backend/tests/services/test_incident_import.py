@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import FieldKind, InterfaceKind
+from app.repos import FieldRepo, IncidentRepo
+from app.services.factories import create_incident_import_service, create_onboarding_service
+from app.services.incident_import import ImportCheckpoint, ImportRowError
+from tests.factories import make_organisation, make_user
+
+
+def _write_rows(path, rows):
+    with open(path, "w") as fp:
+        for row in rows:
+            fp.write(json.dumps(row) + "\n")
+
+
+def test_import_incidents_allocates_sequential_references(db: Session, tmp_path):
+    organisation = make_organisation()
+    creator = make_user(organisation=organisation).user
+    create_onboarding_service(session=db).setup_organisation(organisation=organisation)
+    db.commit()
+
+    source = tmp_path / "incidents.ndjson"
+    _write_rows(
+        source,
+        [
+            {
+                "name": f"Historical incident {idx}",
+                "severity": "SEV-2",
+                "status": "Closed",
+                "created_at": "2021-03-01T10:00:00+00:00",
+                "timestamps": {"Reported At": "2021-03-01T10:00:00+00:00"},
+                "updates": [
+                    {"created_at": "2021-03-01T11:00:00+00:00", "status": "Fixing", "summary": "Fix deployed"},
+                    {"created_at": "2021-03-01T12:00:00+00:00", "status": "Closed"},
+                ],
+            }
+            for idx in range(5)
+        ],
+    )
+
+    import_service = create_incident_import_service(session=db, organisation=organisation, default_creator=creator)
+    checkpoint = ImportCheckpoint(path=str(tmp_path / "checkpoint.json"), source=str(source))
+    result = import_service.import_file(path=str(source), checkpoint=checkpoint, batch_size=2)
+
+    assert result.incidents == 5
+    assert result.updates == 10
+    assert checkpoint.load() == 5
+
+    incidents = IncidentRepo(session=db).get_all_incidents(organisation=organisation)
+    assert sorted(it.reference_id for it in incidents) == [1, 2, 3, 4, 5]
+    assert all(it.slack_channel_id is None for it in incidents)
+
+
+def test_import_incidents_resumes_from_checkpoint(db: Session, tmp_path):
+    organisation = make_organisation()
+    creator = make_user(organisation=organisation).user
+    create_onboarding_service(session=db).setup_organisation(organisation=organisation)
+    db.commit()
+
+    source = tmp_path / "incidents.ndjson"
+    rows = [
+        {"name": f"Incident {idx}", "severity": "SEV-3", "status": "Closed", "created_at": "2022-01-01T00:00:00Z"}
+        for idx in range(4)
+    ]
+    _write_rows(source, rows)
+
+    checkpoint = ImportCheckpoint(path=str(tmp_path / "checkpoint.json"), source=str(source))
+    checkpoint.save(rows_committed=3)
+
+    import_service = create_incident_import_service(session=db, organisation=organisation, default_creator=creator)
+    result = import_service.import_file(path=str(source), checkpoint=checkpoint)
+
+    assert result.incidents == 1
+    assert result.rows_committed == 4
+
+
+@pytest.mark.parametrize(
+    "value,message",
+    [
+        ("Mobile", "Unknown option 'Mobile' for field 'Platform'"),
+        (["Web"], "Field 'Platform' takes a single option"),
+    ],
+)
+def test_import_incidents_rejects_invalid_select_values(db: Session, tmp_path, value, message):
+    organisation = make_organisation()
+    creator = make_user(organisation=organisation).user
+    create_onboarding_service(session=db).setup_organisation(organisation=organisation)
+    FieldRepo(session=db).create_field(
+        organisation=organisation,
+        label="Platform",
+        interface_kind=InterfaceKind.SINGLE_SELECT,
+        kind=FieldKind.USER_DEFINED,
+        available_options=["Web", "API"],
+    )
+    db.commit()
+
+    source = tmp_path / "incidents.ndjson"
+    row = {"name": "Incident", "severity": "SEV-3", "status": "Closed", "created_at": "2022-01-01T00:00:00Z"}
+    _write_rows(source, [row, row | {"fields": {"Platform": value}}])
+
+    import_service = create_incident_import_service(session=db, organisation=organisation, default_creator=creator)
+    checkpoint = ImportCheckpoint(path=str(tmp_path / "checkpoint.json"), source=str(source))
+    with pytest.raises(ImportRowError) as e:
+        import_service.import_file(path=str(source), checkpoint=checkpoint)
+
+    assert e.value.line == 2
+    assert e.value.message == message
@@ -0,0 +1,23 @@
+from app.schemas.models import IncidentSchema
+from app.services.live_stream import SERIALIZED_LIVE_EVENTS_KEY, _serialize_pending_events
+from app.utils import LIVE_EVENTS_KEY
+
+
+class FakeSession:
+    def __init__(self):
+        self.info: dict = {}
+
+    def flush(self):
+        pass
+
+
+def test_events_which_cannot_be_serialized_do_not_stop_the_commit():
+    session = FakeSession()
+    session.info[LIVE_EVENTS_KEY] = [
+        ("incident:inc_1", "incident.updated", {"id": "inc_1"}, IncidentSchema),
+    ]
+
+    _serialize_pending_events(session)  # type: ignore
+
+    assert not session.info.get(SERIALIZED_LIVE_EVENTS_KEY)
+    assert LIVE_EVENTS_KEY not in session.info
@@ -0,0 +1,40 @@
+from sqlalchemy.orm import Session
+
+from app.repos import FieldRepo, FormRepo, IncidentRepo, SeverityRepo, TimestampRepo
+from app.services.factories import create_onboarding_service
+from app.services.onboarding import load_seed_data
+from tests.factories import make_organisation
+
+
+def test_setup_organisation_creates_seed_data(db: Session):
+    organisation = make_organisation()
+    seed_data = load_seed_data()
+
+    create_onboarding_service(session=db).setup_organisation(organisation=organisation)
+    db.commit()
+
+    severities = SeverityRepo(session=db).get_all(organisation=organisation)
+    assert [it.name for it in sorted(severities, key=lambda it: it.rating)] == [it.name for it in seed_data.severities]
+
+    statuses = IncidentRepo(session=db).get_all_incident_statuses(organisation=organisation)
+    assert [it.name for it in statuses] == [it.name for it in seed_data.statuses]
+
+    forms = FormRepo(session=db).search_forms(organisation=organisation)
+    assert sorted(len(form.form_fields) for form in forms) == sorted(len(it.fields) for it in seed_data.forms)
+
+
+def test_setup_organisation_is_idempotent(db: Session):
+    organisation = make_organisation()
+    onboarding_service = create_onboarding_service(session=db)
+
+    onboarding_service.setup_organisation(organisation=organisation)
+    db.commit()
+    onboarding_service.setup_organisation(organisation=organisation)
+    db.commit()
+
+    seed_data = load_seed_data()
+    assert len(FieldRepo(session=db).get_all_fields(organisation=organisation)) == len(seed_data.fields)
+    assert len(IncidentRepo(session=db).get_all_incident_roles(organisation=organisation)) == len(seed_data.roles)
+    assert len(TimestampRepo(session=db).get_timestamps_for_organisation(organisation=organisation)) == len(
+        seed_data.timestamps
+    )
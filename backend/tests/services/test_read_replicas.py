@@ -0,0 +1,24 @@
+from app.db import engine
+from app.services.read_replicas import ReplicaRouter
+
+
+def test_choose_replica_within_lag_limit():
+    # the primary reports no replay lag, so it stands in for an up to date replica
+    router = ReplicaRouter(engines=[engine], max_lag_seconds=5, check_seconds=5)
+
+    replica = router.choose()
+
+    assert replica is not None
+    assert replica.lag == 0
+
+
+def test_skip_replica_behind_limit():
+    router = ReplicaRouter(engines=[engine], max_lag_seconds=-1, check_seconds=5)
+
+    assert router.choose() is None
+
+
+def test_no_replicas_configured():
+    router = ReplicaRouter(engines=[], max_lag_seconds=5, check_seconds=5)
+
+    assert router.choose() is None
@@ -0,0 +1,37 @@
+from app.schemas.slack import SlackCommandDataSchema
+from app.services.slack.commands.base import parse_command
+from app.services.slack.commands.create_incident import CreateIncidentCommand
+from app.services.slack.commands.router import HANDLERS_BY_TRIGGER
+from app.services.slack.commands.update_status import UpdateStatusCommand
+
+
+def _command(text: str | None) -> SlackCommandDataSchema:
+    return SlackCommandDataSchema(
+        token="token",
+        team_id="T1",
+        team_domain="example",
+        channel_id="C1",
+        channel_name="general",
+        user_id="U1",
+        user_name="user",
+        command="/inc",
+        text=text,
+        response_url="https://hooks.slack.com/commands/1",
+        trigger_id="1.2.3",
+        api_app_id="A1",
+    )
+
+
+def test_parse_command():
+    params = parse_command(_command("role lead <@U2|user>"))
+
+    assert params is not None
+    assert params.trigger_word == "role"
+    assert params.parameters == ["lead", "<@U2|user>"]
+    assert parse_command(_command(None)) is None
+
+
+def test_handlers_by_trigger():
+    assert HANDLERS_BY_TRIGGER[("status", True)] is UpdateStatusCommand
+    assert HANDLERS_BY_TRIGGER[(None, False)] is CreateIncidentCommand
+    assert ("status", False) not in HANDLERS_BY_TRIGGER
@@ -0,0 +1,10 @@
+import uuid
+
+from app.services.slack.events import claim_event
+
+
+def test_claim_event_only_once():
+    event_id = f"Ev{uuid.uuid4().hex}"
+
+    assert claim_event(event_id)
+    assert not claim_event(event_id)
@@ -0,0 +1,34 @@
+from app.models import FieldKind, FormKind
+from app.schemas.slack import SlackInteractionSchema
+from app.services.slack.forms.definition import FormDefinition, FormFieldDefinition, validate_submission
+
+DEFINITION = FormDefinition(
+    id="frm_1",
+    organisation_id="org_1",
+    type=FormKind.CREATE_INCIDENT,
+    fields=(
+        FormFieldDefinition(id="ff_name", label="Name", kind=FieldKind.INCIDENT_NAME, is_required=True),
+        FormFieldDefinition(id="ff_summary", label="Summary", kind=FieldKind.INCIDENT_SUMMARY, is_required=False),
+        FormFieldDefinition(id="ff_status", label="Status", kind=FieldKind.INCIDENT_INITIAL_STATUS, is_required=True),
+    ),
+)
+
+
+def _interaction(values: dict) -> SlackInteractionSchema:
+    return SlackInteractionSchema(
+        payload={"type": "view_submission", "view": {"id": "V1", "state": {"values": values}}}
+    )
+
+
+def test_validate_submission_valid():
+    interaction = _interaction(
+        {"block-ff_name": {"ff_name": {"value": "Outage"}}, "block-ff_summary": {"ff_summary": {}}}
+    )
+
+    assert validate_submission(definition=DEFINITION, interaction=interaction) == {}
+
+
+def test_validate_submission_blank_required_field():
+    interaction = _interaction({"block-ff_name": {"ff_name": {"value": "   "}}})
+
+    assert validate_submission(definition=DEFINITION, interaction=interaction) == {"block-ff_name": "Name is required"}
@@ -0,0 +1,60 @@
+import json
+from types import SimpleNamespace
+
+from app.models import FieldKind, IncidentSeverity, RequirementTypeEnum
+from app.services.slack.renderer.form import (
+    INCIDENTS_ACTION_ID,
+    USERS_ACTION_ID,
+    FormRenderer,
+    RenderContext,
+    create_incidents_select_element,
+    create_users_select_element,
+)
+
+
+def _form():
+    severity_field = SimpleNamespace(
+        id="ff_severity",
+        label="Severity",
+        description=None,
+        default_value=None,
+        requirement_type=RequirementTypeEnum.REQUIRED,
+        field=SimpleNamespace(kind=FieldKind.INCIDENT_SEVERITY),
+    )
+    return SimpleNamespace(id="frm_1", name="Update incident", form_fields=[severity_field])
+
+
+def test_compiled_form_is_filled_in_for_incident():
+    severities = [IncidentSeverity(id="sev_1", name="Major"), IncidentSeverity(id="sev_2", name="Minor")]
+    renderer = FormRenderer(severities=severities, incident_types=[], incident_statuses=[])
+    compiled = renderer.compile(form=_form())
+    incident = SimpleNamespace(id="inc_1", incident_severity_id="sev_2")
+
+    modal = renderer.apply_context(compiled=compiled, context=RenderContext.model_construct(incident=incident))
+
+    assert modal["blocks"][0]["element"]["initial_option"]["text"]["text"] == "Minor"
+    assert json.loads(modal["private_metadata"]) == {"form_id": "frm_1", "incident_id": "inc_1"}
+    # the compiled form can be reused for another incident
+    assert "initial_option" not in compiled.modal["blocks"][0]["element"]
+
+
+def test_large_selects_load_options_externally():
+    severities = [IncidentSeverity(id=f"sev_{idx}", name=f"Severity {idx}") for idx in range(150)]
+    renderer = FormRenderer(severities=severities, incident_types=[], incident_statuses=[])
+
+    element = renderer.compile(form=_form()).modal["blocks"][0]["element"]
+
+    assert element["type"] == "external_select"
+    assert "options" not in element
+
+
+def test_user_and_incident_selects_load_options_externally():
+    incident = SimpleNamespace(id="inc_1", reference="INC-12", name="Database down")
+
+    users_element = create_users_select_element()
+    incidents_element = create_incidents_select_element(initial_incident=incident)
+
+    assert users_element == {"type": "external_select", "action_id": USERS_ACTION_ID, "min_query_length": 0}
+    assert incidents_element["type"] == "external_select"
+    assert incidents_element["action_id"] == INCIDENTS_ACTION_ID
+    assert incidents_element["initial_option"]["text"]["text"] == "INC-12 Database down"
@@ -0,0 +1,18 @@
+from app.services.slack.options import MAX_OPTIONS, create_option, filter_options
+
+
+def test_filter_options_prefix_matches_first():
+    options = [create_option(name=name, value=name) for name in ["Database", "Web", "Data warehouse", "Backup data"]]
+
+    assert [it["value"] for it in filter_options(options, query=" DATA")] == [
+        "Database",
+        "Data warehouse",
+        "Backup data",
+    ]
+
+
+def test_filter_options_limited():
+    options = [create_option(name=f"Option {idx}", value=str(idx)) for idx in range(500)]
+
+    assert len(filter_options(options, query="")) == MAX_OPTIONS
+    assert len(filter_options(options, query="option")) == MAX_OPTIONS
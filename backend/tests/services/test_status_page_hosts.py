@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.env import settings
+from app.models import StatusPage
+from app.repos import StatusPageRepo
+from app.services import status_page_hosts as status_page_hosts_module
+from app.services.status_page_hosts import (
+    StatusPageHostCache,
+    normalise_host,
+    register_host_invalidation,
+    status_page_hosts,
+)
+from tests.factories import make_organisation, make_status_page
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def test_normalise_host():
+    assert normalise_host(" Status.Example.COM.:443 ") == "status.example.com"
+
+
+def test_unknown_hosts_are_cached(monkeypatch):
+    lookups: list[str] = []
+
+    def get_id_by_host(self, host):
+        lookups.append(host)
+        return "sp_1" if host == "status.example.com" else None
+
+    monkeypatch.setattr(StatusPageRepo, "get_id_by_host", get_id_by_host)
+    monkeypatch.setattr(status_page_hosts_module, "_get_redis", lambda: redis)
+    redis = FakeRedis()
+    cache = StatusPageHostCache(ttl_seconds=60, not_found_ttl_seconds=60, local_ttl_seconds=60)
+
+    for _ in range(2):
+        assert cache.get_status_page_id(host="Status.Example.com") == "sp_1"
+        assert cache.get_status_page_id(host="random.example.net") is None
+    # another process only has the shared cache
+    other = StatusPageHostCache(ttl_seconds=60, not_found_ttl_seconds=60, local_ttl_seconds=60)
+    assert other.get_status_page_id(host="random.example.net") is None
+
+    assert lookups == ["status.example.com", "random.example.net"]
+
+    cache.invalidate({"random.example.net"})
+    assert cache.get_status_page_id(host="random.example.net") is None
+    assert lookups[-1] == "random.example.net" and len(lookups) == 3
+
+
+def test_old_and_new_hosts_are_invalidated(db: Session, monkeypatch):
+    register_host_invalidation()
+    invalidated: set[str] = set()
+    monkeypatch.setattr(status_page_hosts, "invalidate", invalidated.update)
+    status_page = db.get_one(StatusPage, make_status_page(organisation=make_organisation(), total_components=0).id)
+    old_slug = status_page.slug
+
+    # expired after committing, so neither the slug nor the custom domain are loaded when they're changed
+    db.commit()
+    invalidated.clear()
+    status_page.slug = "new"
+    status_page.custom_domain = "status.example.com"
+    db.commit()
+
+    assert invalidated == {
+        old_slug,
+        "new",
+        normalise_host(f"{old_slug}.{settings.STATUS_PAGE_DOMAIN}"),
+        normalise_host(f"new.{settings.STATUS_PAGE_DOMAIN}"),
+        "status.example.com",
+    }
+
+    invalidated.clear()
+    db.commit()
+    status_page.deleted_at = datetime.now(tz=timezone.utc)
+    db.commit()
+
+    assert invalidated == {"new", normalise_host(f"new.{settings.STATUS_PAGE_DOMAIN}"), "status.example.com"}
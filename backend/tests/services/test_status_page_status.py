@@ -0,0 +1,36 @@
+from app.models import ComponentStatus, StatusPage
+from app.repos import StatusPageRepo
+from app.schemas.resources import StatusPageCurrentStatusSchema
+from app.services import status_page_status
+from app.services.status_page_status import CurrentStatusCache, create_etag, etag_matches
+
+
+def test_etag_matches_any_listed_etag():
+    etag = create_etag(status_page_id="sp_1", version=3)
+
+    assert etag_matches(etag=etag, if_none_match=etag)
+    assert etag_matches(etag=etag, if_none_match=f'"sp_1.2", W/{etag}')
+    assert etag_matches(etag=etag, if_none_match="*")
+    assert not etag_matches(etag=etag, if_none_match='"sp_1.2"')
+    assert not etag_matches(etag=etag, if_none_match=None)
+
+
+def test_current_status_is_cached_for_each_version(monkeypatch):
+    calls: list[str] = []
+
+    def get_current_status(session, status_page):
+        calls.append(status_page.id)
+        return StatusPageCurrentStatusSchema(
+            status=ComponentStatus.PARTIAL_OUTAGE, components={"sp_com_1": ComponentStatus.PARTIAL_OUTAGE}, incidents=[]
+        )
+
+    monkeypatch.setattr(status_page_status, "get_current_status", get_current_status)
+    monkeypatch.setattr(StatusPageRepo, "get_by_id_or_raise", lambda self, id: StatusPage(id=id))
+    cache = CurrentStatusCache(ttl_seconds=60)
+
+    first = cache.get(session=None, status_page_id="sp_1", version=1)  # type: ignore
+    assert cache.get(session=None, status_page_id="sp_1", version=1) == first  # type: ignore
+    cache.get(session=None, status_page_id="sp_1", version=2)  # type: ignore
+
+    assert calls == ["sp_1", "sp_1"]
+    assert first == b'{"status":"PARTIAL_OUTAGE","components":{"sp_com_1":"PARTIAL_OUTAGE"},"incidents":[]}'
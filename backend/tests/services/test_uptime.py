@@ -0,0 +1,123 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.models import ComponentStatus
+from app.services.uptime import (
+    calculate_daily_uptimes,
+    calculate_long_range_uptimes,
+    calculate_uptime_report,
+    get_utc_days,
+)
+
+START = datetime(2024, 3, 1, tzinfo=timezone.utc)
+END = START + timedelta(days=10)
+PERIOD = (END - START).total_seconds()
+
+
+def test_overlapping_events_are_only_counted_once():
+    events = [
+        ("com_1", ComponentStatus.FULL_OUTAGE, START + timedelta(hours=1), START + timedelta(hours=3)),
+        ("com_1", ComponentStatus.FULL_OUTAGE, START + timedelta(hours=2), START + timedelta(hours=4)),
+    ]
+
+    report = calculate_uptime_report(component_ids=["com_1", "com_2"], events=events, start=START, end=END)
+
+    assert report.components["com_1"].downtime_seconds == 3 * 3600
+    assert report.components["com_1"].uptime == pytest.approx(1 - 3 * 3600 / PERIOD)
+    assert report.components["com_2"].uptime == 1.0
+
+
+def test_worst_status_wins_while_events_overlap():
+    events = [
+        ("com_1", ComponentStatus.PARTIAL_OUTAGE, START, START + timedelta(hours=4)),
+        ("com_1", ComponentStatus.FULL_OUTAGE, START + timedelta(hours=1), START + timedelta(hours=2)),
+        ("com_1", ComponentStatus.OPERATIONAL, START, START + timedelta(hours=8)),
+    ]
+
+    component = calculate_uptime_report(component_ids=["com_1"], events=events, start=START, end=END).components[
+        "com_1"
+    ]
+
+    assert component.seconds_by_status == {
+        ComponentStatus.PARTIAL_OUTAGE: 3 * 3600,
+        ComponentStatus.FULL_OUTAGE: 3600,
+    }
+    assert component.downtime_seconds == pytest.approx(3600 + 0.3 * 3 * 3600)
+
+
+def test_ongoing_events_are_clipped_to_the_period():
+    events = [("com_1", ComponentStatus.FULL_OUTAGE, END - timedelta(hours=1), None)]
+
+    component = calculate_uptime_report(component_ids=["com_1"], events=events, start=START, end=END).components[
+        "com_1"
+    ]
+
+    assert component.downtime_seconds == 3600
+    assert component.meets_target(0.99)
+    assert not component.meets_target(0.999)
+
+
+def test_days_are_bucketed_in_the_timezone():
+    # 23:00 UTC on the 2nd is the morning of the 3rd in Sydney
+    started_at = START + timedelta(days=1, hours=23)
+    events = [("com_1", ComponentStatus.DEGRADED_PERFORMANCE, started_at, started_at + timedelta(minutes=30))]
+
+    utc = calculate_uptime_report(component_ids=["com_1"], events=events, start=START, end=END)
+    sydney = calculate_uptime_report(
+        component_ids=["com_1"], events=events, start=START, end=END, tz=ZoneInfo("Australia/Sydney")
+    )
+
+    utc_days = dict(zip(utc.days, utc.components["com_1"].worst_status_by_day))
+    sydney_days = dict(zip(sydney.days, sydney.components["com_1"].worst_status_by_day))
+    assert utc_days[date(2024, 3, 2)] == ComponentStatus.DEGRADED_PERFORMANCE
+    assert utc_days[date(2024, 3, 3)] == ComponentStatus.OPERATIONAL
+    assert sydney_days[date(2024, 3, 3)] == ComponentStatus.DEGRADED_PERFORMANCE
+    assert sydney_days[date(2024, 3, 2)] == ComponentStatus.OPERATIONAL
+    # the period starts during the 1st in Sydney and ends during the 11th
+    assert sydney.days[0] == date(2024, 3, 1) and sydney.days[-1] == date(2024, 3, 11)
+
+
+def test_totals_without_days():
+    events = [("com_1", ComponentStatus.FULL_OUTAGE, START + timedelta(hours=1), START + timedelta(hours=3))]
+
+    report = calculate_uptime_report(component_ids=["com_1"], events=events, start=START, end=END, by_day=False)
+
+    assert report.days == []
+    assert report.components["com_1"].worst_status_by_day == []
+    assert report.uptimes["com_1"] == pytest.approx(1 - 7200 / PERIOD)
+
+
+def test_daily_uptimes_merge_events_on_each_day():
+    events = [
+        ("com_1", ComponentStatus.FULL_OUTAGE, START + timedelta(hours=22), START + timedelta(hours=25)),
+        ("com_1", ComponentStatus.FULL_OUTAGE, START + timedelta(hours=24), START + timedelta(hours=26)),
+    ]
+
+    uptimes = calculate_daily_uptimes(events, days=[date(2024, 3, 1), date(2024, 3, 2)])
+
+    assert uptimes[("com_1", date(2024, 3, 1))].seconds_by_status == {ComponentStatus.FULL_OUTAGE: 2 * 3600}
+    assert uptimes[("com_1", date(2024, 3, 2))].seconds_by_status == {ComponentStatus.FULL_OUTAGE: 2 * 3600}
+
+
+def test_utc_days_of_an_event_ending_at_midnight():
+    assert get_utc_days(START + timedelta(hours=20), START + timedelta(days=1)) == [date(2024, 3, 1)]
+
+
+def test_long_range_uptimes_include_summarised_days():
+    summarised_until = START + timedelta(days=5)
+    summaries = [("com_1", {ComponentStatus.FULL_OUTAGE: 3600, ComponentStatus.PARTIAL_OUTAGE: 1000})]
+    events = [("com_1", ComponentStatus.FULL_OUTAGE, summarised_until, summarised_until + timedelta(hours=1))]
+
+    uptimes = calculate_long_range_uptimes(
+        component_ids=["com_1", "com_2"],
+        summaries=summaries,
+        events=events,
+        start=START,
+        summarised_until=summarised_until,
+        end=END,
+    )
+
+    assert uptimes["com_1"] == pytest.approx(1 - (2 * 3600 + 300) / PERIOD)
+    assert uptimes["com_2"] == 1.0
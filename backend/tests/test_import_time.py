@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+# cumulative import time in seconds for a fresh process, generous enough for slower CI machines
+API_IMPORT_BUDGET = 4.0
+WORKER_IMPORT_BUDGET = 4.0
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds of every module imported by a new interpreter importing module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def _slowest(times: dict[str, int], total: int = 15) -> str:
+    slowest = sorted(times.items(), key=lambda it: it[1], reverse=True)[:total]
+    return "\n".join(f"{us / 1_000_000:.3f}s {name}" for name, us in slowest)
+
+
+def test_api_import_time_within_budget():
+    times = _import_times("app.main")
+
+    assert times["app.main"] / 1_000_000 < API_IMPORT_BUDGET, _slowest(times)
+
+
+def test_worker_import_time_within_budget():
+    times = _import_times("app.tasks.celerytasks")
+
+    assert times["app.tasks.celerytasks"] / 1_000_000 < WORKER_IMPORT_BUDGET, _slowest(times)
+
+
+def test_worker_does_not_import_fastapi():
+    times = _import_times("app.tasks.celerytasks")
+
+    assert "fastapi" not in times
+
+
+def test_optional_dependencies_are_imported_lazily():
+    times = _import_times("app.main")
+
+    assert "pyotp" not in times
@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app import metrics
+from app.profiling import RequestProfile, _profile, enable_sql_profiling
+
+
+def test_failed_statements_are_not_left_pending():
+    engine = create_engine("sqlite://")
+    enable_sql_profiling(engine)
+    metrics.instrument_engine(engine, name="test")
+    profile = RequestProfile()
+    token = _profile.set(profile)
+
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("select * from missing_table"))
+            connection.execute(text("select 1"))
+
+            assert not connection.info.get("profiled_queries")
+            assert not connection.info.get("query_start_time")
+    finally:
+        _profile.reset(token)
+
+    assert [query.statement for query in profile.queries] == ["select 1"]